@@ -0,0 +1,131 @@
+# core/batch_stats.py
+"""
+Векторный расчет статов для перебора билдов (планировщик прокачки).
+Те же формулы, что в core.calculations.compute_stats, но над массивами:
+миллион билдов считается за доли секунды и без создания Unit.
+NumPy - необязательная зависимость: без него модуль импортируется, но evaluate_builds падает.
+"""
+from typing import Dict, Mapping
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from core.calculations import WEAPON_SKILLS
+
+ATTRIBUTES = ("strength", "endurance", "agility", "wisdom", "psych")
+SKILLS = ("strike_power", "medicine", "willpower", "luck", "acrobatics", "shields", "tough_skin", "speed",
+          "light_weapon", "medium_weapon", "heavy_weapon", "firearms",
+          "eloquence", "forging", "engineering", "programming")
+MODIFIERS = ("power_all", "power_attack", "power_block", "power_evade", "damage_deal", "damage_take",
+             "heal_efficiency", "initiative", "power_light", "power_medium", "power_heavy", "power_ranged",
+             "power_firearms")
+MAX_SPEED_DICE = 4
+
+
+def evaluate_builds(attributes: Mapping[str, "np.ndarray"] = None, skills: Mapping[str, "np.ndarray"] = None,
+                    rolls_hp=0, rolls_sp=0,
+                    implants_hp_pct=0, talents_hp_pct=0, implants_sp_pct=0, talents_sp_pct=0,
+                    base_speed_min=1, base_speed_max=4) -> Dict[str, "np.ndarray"]:
+    """
+    attributes/skills: имя -> массив значений (отсутствующие = 0). Скаляры растягиваются.
+    rolls_hp/rolls_sp: суммы бросков уровней в том же виде, что и в stats_fingerprint: sum(5 + d5).
+    Возвращает: max_hp, max_sp, max_stagger, speed_dice_count, speed_min/speed_max (N x 4, пустые слоты = 0)
+    и по колонке на каждый модификатор из MODIFIERS.
+    """
+    if np is None:
+        raise ImportError("evaluate_builds требует numpy")
+    attributes = attributes or {}
+    skills = skills or {}
+
+    unknown = (set(attributes) - set(ATTRIBUTES)) | (set(skills) - set(SKILLS))
+    if unknown:
+        raise ValueError(f"Неизвестные характеристики: {sorted(unknown)}")
+
+    inputs = [np.asarray(attributes.get(k, 0), dtype=np.int64) for k in ATTRIBUTES]
+    inputs += [np.asarray(skills.get(k, 0), dtype=np.int64) for k in SKILLS]
+    inputs += [np.asarray(v, dtype=np.int64) for v in (rolls_hp, rolls_sp)]
+    inputs += [np.asarray(v, dtype=np.float64) for v in (implants_hp_pct, talents_hp_pct,
+                                                          implants_sp_pct, talents_sp_pct)]
+    inputs += [np.asarray(v, dtype=np.int64) for v in (base_speed_min, base_speed_max)]
+    inputs = np.broadcast_arrays(*inputs)
+    n_attr, n_skill = len(ATTRIBUTES), len(SKILLS)
+    attr = dict(zip(ATTRIBUTES, inputs[:n_attr]))
+    skill = dict(zip(SKILLS, inputs[n_attr:n_attr + n_skill]))
+    rolls_h, rolls_s, imp_hp, tal_hp, imp_sp, tal_sp, spd_min, spd_max = inputs[n_attr + n_skill:]
+    shape = rolls_h.shape
+    zeros = np.zeros(shape, dtype=np.int64)
+
+    mods = {k: zeros.copy() for k in MODIFIERS}
+    mods["heal_efficiency"] = np.zeros(shape, dtype=np.float64)
+
+    # === 1. АТРИБУТЫ ===
+    mods["power_attack"] += attr["strength"] // 5
+
+    endurance = attr["endurance"]
+    hp_flat = (endurance // 3) * 5
+    hp_pct = np.minimum(endurance * 2, 100)
+    mods["power_block"] += endurance // 5
+
+    agility = attr["agility"]
+    mods["initiative"] += agility // 3
+    mods["power_evade"] += agility // 5
+
+    psych = attr["psych"]
+    sp_flat = (psych // 3) * 5
+    sp_pct = np.minimum(psych * 2, 100)
+
+    # === 2. НАВЫКИ ===
+    mods["damage_deal"] += skill["strike_power"] // 3
+
+    med = skill["medicine"]
+    mods["heal_efficiency"] += np.where(med // 3 != 0, med * 10 / 100.0, 0.0)
+
+    stg_pct = np.minimum(skill["willpower"], 50)
+
+    mod_acro = np.trunc((skill["acrobatics"] / 3) * 0.8).astype(np.int64)
+    mods["power_evade"] += np.maximum(mod_acro, 0)
+
+    shields = skill["shields"]
+    mod_shields = np.where(shields >= 3, np.ceil((shields / 3) * 0.8), 0).astype(np.int64)
+    mods["power_block"] += np.maximum(mod_shields, 0)
+
+    for k in WEAPON_SKILLS:
+        mods[f"power_{k.split('_')[0]}"] += skill[k] // 3
+
+    # === 3. КУБИКИ СКОРОСТИ ===
+    spd = skill["speed"]
+    dice_count = 1 + (spd >= 10) + (spd >= 20) + (spd >= 30)
+    global_init_bonus = mods["initiative"]
+
+    speed_min = np.zeros(shape + (MAX_SPEED_DICE,), dtype=np.int64)
+    speed_max = np.zeros(shape + (MAX_SPEED_DICE,), dtype=np.int64)
+    for i in range(MAX_SPEED_DICE):
+        skill_bonus = np.clip(spd - i * 10, 0, 10) // 2
+        if i == 3: skill_bonus = np.where(spd >= 30, 5, skill_bonus)
+        present = dice_count > i
+        speed_min[..., i] = np.where(present, spd_min + global_init_bonus + skill_bonus, 0)
+        speed_max[..., i] = np.where(present, spd_max + global_init_bonus + skill_bonus, 0)
+
+    # Кожа
+    m_skin = np.trunc((skill["tough_skin"] / 3) * 1.2).astype(np.int64)
+    mods["damage_take"] -= np.maximum(m_skin, 0)
+
+    # === ИТОГОВЫЕ СТАТЫ (порядок умножений как в compute_stats - результаты совпадают до единицы) ===
+    raw_h = 20 + rolls_h + hp_flat
+    step2 = raw_h * (1 + hp_pct / 100.0) * (1 + imp_hp / 100.0)
+    max_hp = np.trunc(step2 * (1 + tal_hp / 100.0)).astype(np.int64)
+
+    raw_s = 20 + rolls_s + sp_flat
+    step2_s = raw_s * (1 + sp_pct / 100.0) * (1 + imp_sp / 100.0)
+    max_sp = np.trunc(step2_s * (1 + tal_sp / 100.0)).astype(np.int64)
+
+    max_stagger = np.trunc((max_hp // 2) * (1 + stg_pct / 100.0)).astype(np.int64)
+
+    result = {
+        "max_hp": max_hp, "max_sp": max_sp, "max_stagger": max_stagger,
+        "speed_dice_count": dice_count.astype(np.int64), "speed_min": speed_min, "speed_max": speed_max,
+    }
+    result.update(mods)
+    return result
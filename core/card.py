@@ -1,6 +1,7 @@
+import copy
 from dataclasses import dataclass, field
 from typing import List, Dict
-from core.dice import Dice
+from core.dice import Dice, freeze_scripts, thaw_scripts
 
 @dataclass
 class Card:
@@ -13,6 +14,49 @@ class Card:
     flags: List[str] = field(default_factory=list)
     scripts: Dict[str, List[Dict]] = field(default_factory=dict)
 
+    # === НЕИЗМЕНЯЕМОСТЬ (общие экземпляры из Library) ===
+    def __setattr__(self, name, value):
+        if self.__dict__.get("_frozen"):
+            raise AttributeError(f"Card '{self.name}' is frozen, use copy() to edit it")
+        object.__setattr__(self, name, value)
+        if name == "scripts":
+            # Скрипты компилируются при каждом присваивании (в т.ч. в __init__), бой читает только compiled
+            from logic.card_scripts import compile_scripts
+            object.__setattr__(self, "compiled", compile_scripts(value))
+
+    @property
+    def is_frozen(self) -> bool:
+        return self.__dict__.get("_frozen", False)
+
+    def freeze(self) -> 'Card':
+        """Запрещает изменение карты. Списки превращаются в кортежи, scripts - в MappingProxyType."""
+        if self.is_frozen: return self
+        for d in self.dice_list:
+            d.freeze()
+        self.dice_list = tuple(self.dice_list)
+        self.flags = tuple(self.flags)
+        # Содержимое то же, compiled не пересобираем
+        object.__setattr__(self, "scripts", freeze_scripts(self.scripts))
+        object.__setattr__(self, "_frozen", True)
+        return self
+
+    def copy(self) -> 'Card':
+        """Изменяемая глубокая копия (для редактора и экспериментов)."""
+        c = copy.deepcopy(self)
+        c.__dict__.pop("_frozen", None)
+        c.dice_list = [d.copy() for d in c.dice_list]
+        c.flags = list(c.flags)
+        c.scripts = thaw_scripts(c.scripts)
+        return c
+
+    # MappingProxyType не сериализуется: в pickle/deepcopy scripts идут обычным dict
+    def __getstate__(self):
+        return {**self.__dict__, "scripts": thaw_scripts(self.scripts)}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if state.get("_frozen"): self.__dict__["scripts"] = freeze_scripts(state["scripts"])
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -20,8 +64,8 @@ class Card:
             "tier": self.tier,
             "type": self.card_type,
             "description": self.description,
-            "flags": self.flags,
-            "scripts": self.scripts,
+            "flags": list(self.flags),
+            "scripts": thaw_scripts(self.scripts),
             "dice": [d.to_dict() for d in self.dice_list]
         }
 
@@ -36,4 +80,4 @@ class Card:
             flags=data.get("flags", []),
             scripts=data.get("scripts", {}),
             dice_list=[Dice.from_dict(d) for d in data.get("dice", [])]
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,73 @@
+# core/card_cache.py
+import os
+import pickle
+from typing import Dict, List, Optional, Tuple
+
+from core.card import Card
+
+# Меняем при любом изменении формата Card/Dice, чтобы старый кэш выбросился
+CACHE_VERSION = 2
+CACHE_PATH = "data/cache/cards.pickle"
+
+
+class CardCache:
+    """
+    Скомпилированный кэш карт: путь к JSON -> (mtime_ns, size, [Card]).
+    Весь кэш читается одним pickle.load; пересобираются только файлы,
+    у которых поменялись mtime или размер.
+    """
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+        self.entries: Dict[str, Tuple[int, int, List[Card]]] = {}
+        self.dirty = False
+
+    @staticmethod
+    def _key(filepath: str) -> str:
+        return os.path.abspath(filepath)
+
+    def load(self) -> 'CardCache':
+        try:
+            with open(self.path, 'rb') as f:
+                version, entries = pickle.load(f)
+            if version == CACHE_VERSION:
+                self.entries = entries
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            # Битый кэш не должен ломать загрузку - просто пересоберем
+            print(f"Кэш карт пропущен ({e})")
+        return self
+
+    def get(self, filepath: str, stat: os.stat_result) -> Optional[List[Card]]:
+        entry = self.entries.get(self._key(filepath))
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        return None
+
+    def put(self, filepath: str, stat: os.stat_result, cards: List[Card]):
+        self.entries[self._key(filepath)] = (stat.st_mtime_ns, stat.st_size, cards)
+        self.dirty = True
+
+    def prune(self, folder: str, filepaths: List[str]):
+        """Выкидывает записи о файлах папки folder, которых больше нет."""
+        folder = self._key(folder)
+        alive = {self._key(p) for p in filepaths}
+        for key in list(self.entries):
+            if os.path.dirname(key) == folder and key not in alive:
+                del self.entries[key]
+                self.dirty = True
+
+    def save(self):
+        if not self.dirty: return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                pickle.dump((CACHE_VERSION, self.entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+            # Атомарная замена: параллельные процессы никогда не увидят недописанный файл
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except Exception as e:
+            print(f"Не удалось записать кэш карт: {e}")
+            if os.path.exists(tmp): os.remove(tmp)
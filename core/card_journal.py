@@ -0,0 +1,91 @@
+# core/card_journal.py
+import json
+import os
+from typing import List
+
+
+class CardJournal:
+    """
+    Журнал правок файла карт: рядом с pack.json лежит pack.json.journal,
+    по одной JSON-строке на каждое сохранение. Сохранение = дозапись одной строки,
+    поэтому стоит одинаково для файла на 10 и на 10 000 карт.
+    Периодически журнал сворачивается в канонический JSON (атомарно через os.replace).
+    """
+
+    COMPACT_BYTES = 256 * 1024  # Сворачиваем, когда журнал разрастается больше этого
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.path = filepath + ".journal"
+
+    # === ЧТЕНИЕ ===
+    def read(self) -> List[dict]:
+        """Записи журнала по порядку. Недописанная при падении последняя строка пропускается."""
+        if not os.path.exists(self.path): return []
+        entries = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line: continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"Журнал {self.path}: пропущена битая запись")
+        return entries
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    # === ЗАПИСЬ ===
+    def append(self, card_dict: dict):
+        line = json.dumps(card_dict, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with open(self.path, 'ab') as f:
+            # Если прошлая запись оборвалась на полуслове - начинаем с новой строки
+            if f.tell() > 0:
+                with open(self.path, 'rb') as r:
+                    r.seek(-1, os.SEEK_END)
+                    if r.read(1) != b"\n": line = "\n" + line
+            f.write(line.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+    # === СВЕРТКА ===
+    @staticmethod
+    def read_canonical(filepath: str) -> dict:
+        if not os.path.exists(filepath): return {"cards": []}
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+        # Поддержка старого формата (список) и нового (dict)
+        if isinstance(content, list):
+            return {"cards": content}
+        content.setdefault("cards", [])
+        return content
+
+    @staticmethod
+    def write_canonical(filepath: str, data: dict):
+        tmp = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, filepath)
+
+    @staticmethod
+    def merge(cards: List[dict], entries: List[dict]) -> List[dict]:
+        """Применяет записи журнала к списку карт: по id заменяет, новые - в конец."""
+        merged = {c.get("id") or c.get("name"): c for c in cards}
+        for e in entries:
+            merged[e.get("id") or e.get("name")] = e
+        return list(merged.values())
+
+    def compact(self):
+        """
+        Переносит журнал в канонический JSON. Если упадем между os.replace и удалением журнала,
+        повторное применение тех же записей ничего не изменит.
+        """
+        entries = self.read()
+        if not entries: return
+        data = self.read_canonical(self.filepath)
+        data["cards"] = self.merge(data["cards"], entries)
+        self.write_canonical(self.filepath, data)
+        os.remove(self.path)
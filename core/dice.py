@@ -1,7 +1,24 @@
+import copy
 from dataclasses import dataclass, field
-from typing import List, Dict
+from types import MappingProxyType
+from typing import Any, List, Dict, Mapping
 from core.enums import DiceType
 
+
+def freeze_scripts(value: Any) -> Any:
+    """scripts -> только чтение: словари в MappingProxyType, списки в кортежи (рекурсивно)."""
+    if isinstance(value, Mapping): return MappingProxyType({k: freeze_scripts(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)): return tuple(freeze_scripts(v) for v in value)
+    return value
+
+
+def thaw_scripts(value: Any) -> Any:
+    """Обратно в обычные dict/list (для правки, JSON и pickle)."""
+    if isinstance(value, Mapping): return {k: thaw_scripts(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)): return [thaw_scripts(v) for v in value]
+    return value
+
+
 @dataclass
 class Dice:
     min_val: int
@@ -9,12 +26,42 @@ class Dice:
     dtype: DiceType
     scripts: Dict[str, List[Dict]] = field(default_factory=dict)
 
+    def __setattr__(self, name, value):
+        if self.__dict__.get("_frozen"):
+            raise AttributeError("Dice is frozen, use copy() to edit it")
+        object.__setattr__(self, name, value)
+        if name == "scripts":
+            # Скрипты компилируются при каждом присваивании (в т.ч. в __init__), бой читает только compiled
+            from logic.card_scripts import compile_scripts
+            object.__setattr__(self, "compiled", compile_scripts(value))
+
+    def freeze(self) -> 'Dice':
+        if self.__dict__.get("_frozen"): return self
+        # Содержимое то же, compiled не пересобираем
+        object.__setattr__(self, "scripts", freeze_scripts(self.scripts))
+        object.__setattr__(self, "_frozen", True)
+        return self
+
+    def copy(self) -> 'Dice':
+        d = copy.deepcopy(self)
+        d.__dict__.pop("_frozen", None)
+        d.scripts = thaw_scripts(d.scripts)
+        return d
+
+    # MappingProxyType не сериализуется: в pickle/deepcopy scripts идут обычным dict
+    def __getstate__(self):
+        return {**self.__dict__, "scripts": thaw_scripts(self.scripts)}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if state.get("_frozen"): self.__dict__["scripts"] = freeze_scripts(state["scripts"])
+
     def to_dict(self):
         return {
             "type": self.dtype.value.lower(),
             "base_min": self.min_val,
             "base_max": self.max_val,
-            "scripts": self.scripts
+            "scripts": thaw_scripts(self.scripts)
         }
 
     @classmethod
@@ -1,19 +1,93 @@
-import heapq
-from collections import defaultdict
+from bisect import insort
+from itertools import count
+from typing import Callable, Dict, List, Tuple
+
+# === ИМЕНА СОБЫТИЙ ===
+# Жизненный цикл боя. В ClashSystem: ROLL/CLASH_WIN/CLASH_LOSE/HIT получают RollContext,
+# COMBAT_START/COMBAT_END - юнита.
+ON_COMBAT_START = "on_combat_start"
+ON_ROLL = "on_roll"
+ON_CLASH_WIN = "on_clash_win"
+ON_CLASH_LOSE = "on_clash_lose"
+ON_HIT = "on_hit"
+ON_COMBAT_END = "on_combat_end"
+ON_ROUND_END = "on_round_end"
+BEFORE_ROLL = "BEFORE_ROLL"  # Бросок в CombatEngine (до модификаторов)
+
+LIFECYCLE_EVENTS = (ON_COMBAT_START, ON_ROLL, ON_CLASH_WIN, ON_CLASH_LOSE, ON_HIT, ON_COMBAT_END, ON_ROUND_END)
+
+
+class Subscription:
+    """Квиток подписки: его возвращает subscribe, по нему же отписываются."""
+    __slots__ = ("event_type", "callback", "priority", "seq", "once", "active")
+
+    def __init__(self, event_type, callback, priority, seq, once):
+        self.event_type = event_type
+        self.callback = callback
+        self.priority = priority
+        self.seq = seq
+        self.once = once
+        self.active = True
+
+    def __lt__(self, other: 'Subscription'):
+        # При равном приоритете - в порядке подписки
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
 
 class EventManager:
+    """
+    Шина событий с приоритетами (меньше = раньше срабатывает).
+    Подписчики лежат уже отсортированными, а для emit держится готовый кортеж колбэков,
+    который пересобирается только при подписке/отписке. Emit = один проход по кортежу.
+    """
+
     def __init__(self):
-        self.listeners = defaultdict(list)
+        self.listeners: Dict[str, List[Subscription]] = {}
+        self._snapshots: Dict[str, Tuple[Callable, ...]] = {}
+        self._seq = count()
+
+    def subscribe(self, event_type, callback, priority=100, once=False) -> Subscription:
+        if not callable(callback):
+            raise TypeError(f"Обработчик события {event_type} должен быть вызываемым: {callback!r}")
+        sub = Subscription(event_type, callback, priority, next(self._seq), once)
+        insort(self.listeners.setdefault(event_type, []), sub)
+        self._snapshots.pop(event_type, None)
+        return sub
+
+    def once(self, event_type, callback, priority=100) -> Subscription:
+        """Подписка на одно срабатывание: после первого вызова снимается сама."""
+        return self.subscribe(event_type, callback, priority, once=True)
+
+    def unsubscribe(self, sub: Subscription) -> bool:
+        if not sub.active: return False
+        sub.active = False
+        subs = self.listeners.get(sub.event_type, [])
+        if sub in subs: subs.remove(sub)
+        if not subs: self.listeners.pop(sub.event_type, None)
+        self._snapshots.pop(sub.event_type, None)
+        return True
+
+    def has_listeners(self, event_type) -> bool:
+        return event_type in self.listeners
+
+    def _snapshot(self, event_type) -> Tuple[Callable, ...]:
+        subs = self.listeners.get(event_type)
+        if not subs:
+            snap = ()
+        else:
+            snap = tuple(self._wrap_once(s) if s.once else s.callback for s in subs)
+        self._snapshots[event_type] = snap
+        return snap
 
-    def subscribe(self, event_type, callback, priority=100):
-        # priority: меньше = раньше срабатывает
-        heapq.heappush(self.listeners[event_type], (priority, callback))
+    def _wrap_once(self, sub: Subscription) -> Callable:
+        def fire(context):
+            if self.unsubscribe(sub): sub.callback(context)
+        return fire
 
     def emit(self, event_type, context):
-        if event_type in self.listeners:
-            # Создаем копию списка, чтобы избежать проблем если во время итерации кто-то отпишется
-            # (хотя heapq неудобно копировать, здесь упростим перебором)
-            sorted_listeners = sorted(self.listeners[event_type], key=lambda x: x[0])
-            for _, callback in sorted_listeners:
-                callback(context)
-        return context
\ No newline at end of file
+        # Снимок неизменяем, поэтому отписка во время рассылки безопасна (сработает со следующего emit)
+        snap = self._snapshots.get(event_type)
+        if snap is None: snap = self._snapshot(event_type)
+        for callback in snap:
+            callback(context)
+        return context
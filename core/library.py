@@ -1,111 +1,193 @@
-import copy
 import json
 import os
 import glob
-from core.models import Card
+from typing import Dict, List, Optional
+from core.models import Card, DiceType
+from core.card_cache import CardCache
+from core.card_journal import CardJournal
 
 
 class Library:
-    _cards = {}  # Тут хранятся ВСЕ карты (из всех файлов) для игры
+    _cards: Dict[str, Card] = {}  # Тут хранятся ВСЕ карты (из всех файлов) для игры, ключ - id
+
+    # Вторичные индексы (dict вместо set, чтобы сохранялся порядок регистрации)
+    _by_name: Dict[str, str] = {}
+    _by_tier: Dict[int, Dict[str, None]] = {}
+    _by_type: Dict[str, Dict[str, None]] = {}
+    _by_dice_type: Dict[DiceType, Dict[str, None]] = {}
+    _by_status: Dict[str, Dict[str, None]] = {}
+
+    _UNKNOWN = Card("Unknown").freeze()
+
+    @staticmethod
+    def _index_keys(card: Card):
+        """Все (индекс, значение), под которыми карта должна находиться."""
+        yield "_by_tier", card.tier
+        yield "_by_type", card.card_type
+        for dtype in {d.dtype for d in card.dice_list}:
+            yield "_by_dice_type", dtype
+
+        statuses = set()
+        script_groups = list(card.scripts.values())
+        for d in card.dice_list:
+            script_groups.extend(d.scripts.values())
+        for group in script_groups:
+            for s in group:
+                if s.get("script_id") == "apply_status" and s.get("params", {}).get("status"):
+                    statuses.add(s["params"]["status"])
+        for st in statuses:
+            yield "_by_status", st
+
+    @classmethod
+    def _unindex(cls, card_id: str):
+        old = cls._cards.pop(card_id, None)
+        if old is None: return
+        if cls._by_name.get(old.name) == card_id:
+            del cls._by_name[old.name]
+        for index_name, value in cls._index_keys(old):
+            bucket = getattr(cls, index_name).get(value)
+            if bucket is not None:
+                bucket.pop(card_id, None)
+                if not bucket: del getattr(cls, index_name)[value]
 
     @classmethod
     def register(cls, card: Card):
-        """Просто добавляет карту в оперативную память"""
-        key = card.id if card.id and card.id != "unknown" else card.name
-        cls._cards[key] = card
+        """
+        Добавляет карту в оперативную память. Ключ - всегда id (если id нет, им становится имя).
+        Карта вызывающего не меняется: незамороженная (например, из редактора) регистрируется замороженной копией.
+        """
+        if not card.is_frozen or not card.id or card.id == "unknown":
+            card = card.copy()
+            if not card.id or card.id == "unknown": card.id = card.name
+
+        cls._unindex(card.id)
+        card.freeze()
+
+        cls._cards[card.id] = card
+        cls._by_name[card.name] = card.id
+        for index_name, value in cls._index_keys(card):
+            getattr(cls, index_name).setdefault(value, {})[card.id] = None
 
     @classmethod
-    def get_card(cls, key: str) -> Card:
-        if key in cls._cards:
-            return copy.deepcopy(cls._cards[key])
-        for card in cls._cards.values():
-            if card.name == key:
-                return copy.deepcopy(card)
-        return Card("Unknown", 0, [])
+    def clear(cls):
+        for index in (cls._cards, cls._by_name, cls._by_tier, cls._by_type, cls._by_dice_type, cls._by_status):
+            index.clear()
+
+    @classmethod
+    def get_card(cls, key: str, mutable: bool = False) -> Card:
+        """
+        Карта по id или имени за O(1). Возвращает общий неизменяемый экземпляр;
+        mutable=True - отдельная копия, которую можно править.
+        """
+        card = cls._cards.get(key)
+        if card is None:
+            card_id = cls._by_name.get(key)
+            card = cls._cards.get(card_id) if card_id else None
+        if card is None:
+            card = cls._UNKNOWN
+        return card.copy() if mutable else card
 
     @classmethod
     def get_all_cards(cls):
         return list(cls._cards.values())
 
+    @classmethod
+    def find(cls, tier: Optional[int] = None, card_type: Optional[str] = None,
+             dice_type: Optional[DiceType] = None, status: Optional[str] = None) -> List[Card]:
+        """Фильтр по индексам (все условия через И)."""
+        buckets = []
+        for index, value in ((cls._by_tier, tier), (cls._by_type, card_type),
+                             (cls._by_dice_type, dice_type), (cls._by_status, status)):
+            if value is not None:
+                buckets.append(index.get(value, {}))
+        if not buckets:
+            return cls.get_all_cards()
+
+        buckets.sort(key=len)
+        first, rest = buckets[0], buckets[1:]
+        return [cls._cards[cid] for cid in first if all(cid in b for b in rest)]
+
     # === ЗАГРУЗКА (ЧИТАЕТ ВСЮ ПАПКУ) ===
     @classmethod
-    def load_all(cls, path="data/cards"):
+    def load_all(cls, path="data/cards", use_cache=True):
         if not os.path.exists(path):
             os.makedirs(path, exist_ok=True)
             return
 
-        if os.path.isdir(path):
-            files = glob.glob(os.path.join(path, "*.json"))
-            print(f"--- Загрузка карт из папки {path} ---")
-            for filepath in files:
-                cls._load_single_file(filepath)
-        else:
-            cls._load_single_file(path)
+        files = sorted(glob.glob(os.path.join(path, "*.json"))) if os.path.isdir(path) else [path]
+        cache = CardCache().load() if use_cache else None
+
+        parsed = 0
+        for filepath in files:
+            stat = os.stat(filepath)
+            cards = cache.get(filepath, stat) if cache else None
+            if cards is None:
+                cards = cls._load_single_file(filepath)
+                parsed += 1
+                if cache is not None and cards is not None:
+                    cache.put(filepath, stat, cards)
+            for card in cards or []:
+                cls.register(card)
+
+            # Несвернутые правки из журнала поверх канонического файла
+            for card_data in CardJournal(filepath).read():
+                card = cls._parse_card(card_data, filepath)
+                if card: cls.register(card)
+
+        if cache is not None:
+            if os.path.isdir(path): cache.prune(path, files)
+            cache.save()
+
+        if parsed:
+            print(f"--- Карты из {path}: {len(files)} файлов, перечитано {parsed} ---")
+
+    @staticmethod
+    def _parse_card(card_data: dict, filepath: str) -> Optional[Card]:
+        """Одна битая карта (например, неизвестный script_id) не должна ронять весь файл."""
+        try:
+            return Card.from_dict(card_data)
+        except ValueError as e:
+            print(f" Ошибка {filepath}, карта {card_data.get('id') or card_data.get('name')}: {e}")
+            return None
 
     @classmethod
-    def _load_single_file(cls, filepath):
+    def _load_single_file(cls, filepath) -> Optional[List[Card]]:
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 data = json.load(f)
 
             cards_list = data.get("cards", []) if isinstance(data, dict) else data
-
-            count = 0
-            for card_data in cards_list:
-                card = Card.from_dict(card_data)
-                cls.register(card)
-                count += 1
-            print(f"✔ {os.path.basename(filepath)}: {count} шт.")
+            cards = [c.freeze() for c in (cls._parse_card(card_data, filepath) for card_data in cards_list) if c]
+            print(f"✔ {os.path.basename(filepath)}: {len(cards)} шт.")
+            return cards
         except Exception as e:
             print(f" Ошибка {filepath}: {e}")
+            return None
 
-    # === СОХРАНЕНИЕ (ПИШЕТ ТОЛЬКО ОДНУ КАРТУ) ===
+    # === СОХРАНЕНИЕ (ДОПИСЫВАЕТ ОДНУ КАРТУ В ЖУРНАЛ) ===
     @classmethod
     def save_card(cls, card: Card, filename="custom_cards.json"):
         """
         Сохраняет конкретную карту в конкретный файл.
-        Не перезаписывает всю библиотеку!
+        Правка дописывается в журнал (O(1) от размера файла), канонический JSON
+        пересобирается только при свертке журнала.
         """
         folder = "data/cards"
         filepath = os.path.join(folder, filename)
         os.makedirs(folder, exist_ok=True)
 
-        # 1. Читаем текущий файл (если он есть)
-        current_data = {"cards": []}
-        if os.path.exists(filepath):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = json.load(f)
-                    # Поддержка старого формата (список) и нового (dict)
-                    if isinstance(content, list):
-                        current_data["cards"] = content
-                    else:
-                        current_data = content
-            except Exception as e:
-                print(f"Ошибка чтения файла сохранения: {e}")
-
-        # 2. Ищем, есть ли карта с таким ID внутри этого файла
-        card_dict = card.to_dict()
-        found = False
-
-        for i, existing in enumerate(current_data["cards"]):
-            if existing.get("id") == card.id:
-                # Если нашли - обновляем
-                current_data["cards"][i] = card_dict
-                found = True
-                break
-
-        if not found:
-            # Если не нашли - добавляем в конец
-            current_data["cards"].append(card_dict)
-
-        # 3. Записываем обратно только в этот файл
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(current_data, f, ensure_ascii=False, indent=2)
+        # Канонический файл должен существовать, иначе load_all не найдет журнал
+        if not os.path.exists(filepath):
+            CardJournal.write_canonical(filepath, {"cards": []})
+
+        journal = CardJournal(filepath)
+        journal.append(card.to_dict())
+        if journal.size() > CardJournal.COMPACT_BYTES:
+            journal.compact()
 
         print(f" Карта '{card.name}' сохранена в {filename}")
 
-        # 4. Не забываем обновить карту в памяти, чтобы сразу играть ей
+        # Не забываем обновить карту в памяти, чтобы сразу играть ей
         cls.register(card)
 
 
@@ -0,0 +1,51 @@
+# core/rng.py
+import hashlib
+import os
+import random
+from typing import List, Optional, Tuple
+
+
+class RngStream(random.Random):
+    """
+    random.Random с детерминированным порождением дочерних потоков (по мотивам numpy SeedSequence).
+    Поток задается парой (entropy, spawn_key): дочерний поток i имеет ключ spawn_key + (i,),
+    а его сид - хеш от всей пары, поэтому соседние потоки не коррелируют.
+    """
+
+    def __init__(self, entropy: Optional[int] = None, spawn_key: Tuple[int, ...] = ()):
+        if entropy is None:
+            entropy = int.from_bytes(os.urandom(16), "little")
+        self.entropy = entropy
+        self.spawn_key = tuple(spawn_key)
+        self._spawned = 0
+        super().__init__(self._derive_seed())
+
+    def _derive_seed(self, spawn_key: Optional[Tuple[int, ...]] = None) -> int:
+        key = self.spawn_key if spawn_key is None else spawn_key
+        payload = repr((self.entropy, key)).encode()
+        return int.from_bytes(hashlib.blake2b(payload, digest_size=16).digest(), "little")
+
+    def child(self, index: int) -> 'RngStream':
+        """Дочерний поток с фиксированным номером (например, номер боя)."""
+        return RngStream(self.entropy, self.spawn_key + (index,))
+
+    def reset_to_child(self, index: int):
+        """
+        Переводит этот же объект в начало дочернего потока index (ключ потока не меняется).
+        Ссылки на него (ClashSystem, политики) остаются рабочими - так бой пересинхронизируется по раундам.
+        """
+        random.Random.seed(self, self._derive_seed(self.spawn_key + (index,)))
+
+    def spawn(self, n: int) -> List['RngStream']:
+        """Следующие n еще не выданных дочерних потоков."""
+        children = [self.child(self._spawned + i) for i in range(n)]
+        self._spawned += n
+        return children
+
+    # Стандартный pickle у random.Random теряет entropy/spawn_key
+    def __reduce__(self):
+        return self.__class__, (self.entropy, self.spawn_key), (self.getstate(), self._spawned)
+
+    def __setstate__(self, state):
+        mt_state, self._spawned = state
+        self.setstate(mt_state)
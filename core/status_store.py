@@ -0,0 +1,146 @@
+# core/status_store.py
+from itertools import count
+from types import MappingProxyType
+from typing import Dict, List, Mapping
+
+from core.zobrist import zobrist_key
+
+# Общий счетчик версий: номер версии уникален для всех хранилищ процесса,
+# поэтому копия/восстановленный снимок не совпадет по version с другим составом
+_versions = count(1)
+
+
+class StatusStore:
+    """
+    Хранилище статус-эффектов юнита.
+    Наложения с одинаковой оставшейся длительностью сливаются в одну корзину
+    (duration -> amount), поэтому память и стоимость тика зависят от числа разных
+    длительностей, а не от того, сколько раз статус накладывали.
+    Рядом лежит готовая сумма стаков по каждому статусу для get()/view.
+    version меняется при каждом появлении/исчезновении статуса (для кэшей по составу);
+    одинаковая version у двух хранилищ - только у копий с одинаковым составом.
+    zhash - Zobrist-хеш всех корзин (name, duration, amount), обновляется вместе с ними.
+    """
+
+    __slots__ = ("_buckets", "_totals", "_view", "version", "zhash")
+
+    def __init__(self):
+        self._buckets: Dict[str, Dict[int, int]] = {}
+        self._totals: Dict[str, int] = {}
+        self._view = MappingProxyType(self._totals)
+        self.version = 0
+        self.zhash = 0
+
+    # === ЧТЕНИЕ ===
+    @property
+    def view(self) -> Mapping[str, int]:
+        """Read-only словарь name -> сумма стаков (только ненулевые). Без копирования."""
+        return self._view
+
+    def get(self, name: str) -> int:
+        return self._totals.get(name, 0)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._totals
+
+    def __len__(self) -> int:
+        return len(self._totals)
+
+    def keys(self):
+        return self._totals.keys()
+
+    def instances(self, name: str) -> List[Dict]:
+        """Корзины статуса в старом формате [{"amount", "duration"}], от коротких к длинным."""
+        buckets = self._buckets.get(name, {})
+        return [{"amount": buckets[d], "duration": d} for d in sorted(buckets)]
+
+    # === ИЗМЕНЕНИЕ ===
+    def add(self, name: str, amount: int, duration: int = 1):
+        if amount <= 0: return
+        buckets = self._buckets.get(name)
+        if buckets is None:
+            buckets = self._buckets[name] = {}
+            self.version = next(_versions)
+        old = buckets.get(duration, 0)
+        if old: self.zhash ^= zobrist_key("status", name, duration, old)
+        buckets[duration] = old + amount
+        self.zhash ^= zobrist_key("status", name, duration, old + amount)
+        self._totals[name] = self._totals.get(name, 0) + amount
+
+    def remove(self, name: str, amount: int = None):
+        buckets = self._buckets.get(name)
+        if buckets is None: return
+
+        if amount is None or amount >= self._totals[name]:
+            self._drop(name)
+            return
+        if amount <= 0: return
+
+        # Удаляем, начиная с самых коротких по длительности
+        rem = amount
+        for d in sorted(buckets):
+            have = buckets[d]
+            self.zhash ^= zobrist_key("status", name, d, have)
+            if have > rem:
+                buckets[d] = have - rem
+                self.zhash ^= zobrist_key("status", name, d, have - rem)
+                break
+            del buckets[d]
+            rem -= have
+            if rem == 0: break
+
+        self._totals[name] -= amount
+
+    def tick(self, name: str):
+        """Конец раунда: -1 к длительности каждой корзины, истекшие (duration <= 1) удаляются."""
+        buckets = self._buckets.get(name)
+        if buckets is None: return
+
+        expired = sum(a for d, a in buckets.items() if d <= 1)
+        if expired >= self._totals[name]:
+            self._drop(name)
+            return
+
+        for d, a in buckets.items():
+            self.zhash ^= zobrist_key("status", name, d, a)
+        buckets = self._buckets[name] = {d - 1: a for d, a in buckets.items() if d > 1}
+        for d, a in buckets.items():
+            self.zhash ^= zobrist_key("status", name, d, a)
+        self._totals[name] -= expired
+
+    def clear(self):
+        self._buckets.clear()
+        self._totals.clear()
+        self.version = next(_versions)
+        self.zhash = 0
+
+    def _drop(self, name: str):
+        for d, a in self._buckets[name].items():
+            self.zhash ^= zobrist_key("status", name, d, a)
+        del self._buckets[name]
+        del self._totals[name]
+        self.version = next(_versions)
+
+    # === КОПИРОВАНИЕ / PICKLE (MappingProxyType не копируется) ===
+    def copy(self) -> 'StatusStore':
+        """Независимая копия за O(число корзин) - для снимков состояния без deepcopy."""
+        store = StatusStore.__new__(StatusStore)
+        store._buckets = {name: dict(b) for name, b in self._buckets.items()}
+        store._totals = dict(self._totals)
+        store._view = MappingProxyType(store._totals)
+        store.version = self.version
+        store.zhash = self.zhash
+        return store
+
+    def __getstate__(self):
+        return self._buckets, self._totals, self.version
+
+    def __setstate__(self, state):
+        # Версия из другого процесса могла бы совпасть с местной - берем новую
+        self._buckets, self._totals, _ = state
+        self.version = next(_versions)
+        self._view = MappingProxyType(self._totals)
+        self.zhash = 0
+        for name, buckets in self._buckets.items():
+            for d, a in buckets.items():
+                self.zhash ^= zobrist_key("status", name, d, a)
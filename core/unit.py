@@ -8,12 +8,43 @@ except ImportError:
     Card = Any
 
 from core.resistances import Resistances
+from core.status_store import StatusStore
+from core.zobrist import ZobristDict, zobrist_key
 # Импортируем наши новые миксины
-from core.unit_mixins import UnitStatusMixin, UnitCombatMixin, UnitLifecycleMixin
+from core.unit_mixins import UnitStatusMixin, UnitCombatMixin, UnitLifecycleMixin, UnitStateMixin
+
+
+class _HashedField:
+    """
+    Поле, входящее в Zobrist-хеш юнита (см. UnitStateMixin.state_hash): при записи
+    XOR старого ключа и XOR нового. Только __set__ - чтение идет напрямую из __dict__, без накладных расходов.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __set__(self, unit, value):
+        d = unit.__dict__
+        z = d.get("_zhash", 0)
+        if self.name in d: z ^= zobrist_key(self.name, d[self.name])
+        d["_zhash"] = z ^ zobrist_key(self.name, value)
+        d[self.name] = value
+
+
+class _HashedDict:
+    """Поле-словарь с собственным хешем: любой присвоенный dict оборачивается в ZobristDict."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __set__(self, unit, value):
+        if not (isinstance(value, ZobristDict) and value.tag == self.name):
+            value = ZobristDict(self.name, value)
+        unit.__dict__[self.name] = value
 
 
 @dataclass
-class Unit(UnitStatusMixin, UnitCombatMixin, UnitLifecycleMixin):
+class Unit(UnitStatusMixin, UnitCombatMixin, UnitLifecycleMixin, UnitStateMixin):
     # === ОСНОВНАЯ ИНФОРМАЦИЯ ===
     name: str
     level: int = 1
@@ -73,7 +104,7 @@ class Unit(UnitStatusMixin, UnitCombatMixin, UnitLifecycleMixin):
     level_rolls: Dict[str, Dict[str, int]] = field(default_factory=dict)
 
     # === ВНУТРЕННЕЕ СОСТОЯНИЕ ===
-    _status_effects: Dict[str, List[Dict]] = field(default_factory=dict)
+    _status_effects: StatusStore = field(default_factory=StatusStore)
     delayed_queue: List[dict] = field(default_factory=list)
     resources: Dict[str, int] = field(default_factory=dict)
     modifiers: Dict[str, int] = field(default_factory=dict)
@@ -84,6 +115,12 @@ class Unit(UnitStatusMixin, UnitCombatMixin, UnitLifecycleMixin):
         from core.calculations import recalculate_unit_stats
         return recalculate_unit_stats(self)
 
+    def __getstate__(self):
+        # Таблица хуков (logic.hooks) - кэш со ссылками на реестры, в копии/pickle не нужна
+        state = self.__dict__.copy()
+        state.pop("_hooks", None)
+        return state
+
     # === СЕРИАЛИЗАЦИЯ (TO/FROM DICT) ===
     # Это чисто технический код для сохранения/загрузки, ему здесь самое место
 
@@ -158,4 +195,11 @@ class Unit(UnitStatusMixin, UnitCombatMixin, UnitLifecycleMixin):
         u.active_buffs = data.get("active_buffs", {})
 
         u.recalculate_stats()
-        return u
\ No newline at end of file
+        return u
+
+
+# Дескрипторы ставятся после @dataclass: значения по умолчанию уже зашиты в __init__
+for _name in ("current_hp", "current_sp", "current_stagger"):
+    setattr(Unit, _name, _HashedField(_name))
+for _name in ("cooldowns", "active_buffs"):
+    setattr(Unit, _name, _HashedDict(_name))
@@ -1,38 +1,123 @@
 # core/unit_library.py
 import os
 import json
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, NamedTuple, Optional, Tuple
 from core.unit import Unit
 
 
+class UnitHeader(NamedTuple):
+    """Легкая шапка персонажа: хватает для списков выбора без сборки Unit."""
+    name: str
+    level: int
+    rank: int
+    avatar: Optional[str]
+    path: str
+
+
+class UnitRoster(MutableMapping):
+    """
+    Словарь name -> Unit, который собирает Unit только при первом обращении.
+    У каждой сессии свой ростер (свои объекты юнитов), а распарсенные файлы общие.
+    """
+
+    def __init__(self, headers: Dict[str, UnitHeader]):
+        self._headers = dict(headers)
+        self._units: Dict[str, Unit] = {}
+
+    def __getitem__(self, name: str) -> Unit:
+        unit = self._units.get(name)
+        if unit is None:
+            header = self._headers[name]  # KeyError, если такого нет
+            unit = Unit.from_dict(UnitLibrary.read_unit_data(header.path))
+            self._units[name] = unit
+        return unit
+
+    def __setitem__(self, name: str, unit: Unit):
+        self._units[name] = unit
+        if name not in self._headers:
+            self._headers[name] = UnitHeader(unit.name, unit.level, unit.rank, unit.avatar, "")
+
+    def __delitem__(self, name: str):
+        del self._headers[name]
+        self._units.pop(name, None)
+
+    def __iter__(self):
+        return iter(self._headers)
+
+    def __len__(self):
+        return len(self._headers)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._units
+
+    @property
+    def headers(self) -> Dict[str, UnitHeader]:
+        return dict(self._headers)
+
+
 class UnitLibrary:
     _roster = {}
     DATA_PATH = "data/units"
 
+    # Общий для всех сессий кэш: путь -> (mtime_ns, size, текст файла, шапка)
+    _files: Dict[str, Tuple[int, int, str, UnitHeader]] = {}
+
+    @classmethod
+    def _read_file(cls, path: str) -> Tuple[int, int, str, UnitHeader]:
+        stat = os.stat(path)
+        cached = cls._files.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached
+
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        data = json.loads(text)
+        header = UnitHeader(data.get("name", "Unknown"), data.get("level", 1), data.get("rank", 9),
+                            data.get("avatar"), path)
+        entry = (stat.st_mtime_ns, stat.st_size, text, header)
+        cls._files[path] = entry
+        return entry
+
     @classmethod
-    def load_all(cls):
-        """Загружает всех персонажей из JSON файлов в папке."""
-        cls._roster = {}
+    def read_unit_data(cls, path: str) -> dict:
+        """Свежий dict юнита (json.loads каждый раз, чтобы сессии не делили списки/словари)."""
+        return json.loads(cls._read_file(path)[2])
+
+    @classmethod
+    def load_all(cls, max_workers: int = 8):
+        """
+        Читает шапки всех персонажей (в пуле потоков, повторно - только измененные файлы).
+        Возвращает ленивый ростер: полный Unit собирается при первом обращении.
+        """
         if not os.path.exists(cls.DATA_PATH):
             os.makedirs(cls.DATA_PATH, exist_ok=True)
             print(f"Created directory: {cls.DATA_PATH}")
-            return {}
+            cls._roster = UnitRoster({})
+            return cls._roster
 
-        files = [f for f in os.listdir(cls.DATA_PATH) if f.endswith('.json')]
-        print(f"Loading units from {cls.DATA_PATH}...")
+        paths = [os.path.join(cls.DATA_PATH, f) for f in sorted(os.listdir(cls.DATA_PATH)) if f.endswith('.json')]
 
-        for filename in files:
-            path = os.path.join(cls.DATA_PATH, filename)
+        def safe_read(path):
             try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    unit = Unit.from_dict(data)
-                    cls._roster[unit.name] = unit
-                    print(f"✔ Loaded: {unit.name}")
+                return cls._read_file(path)
             except Exception as e:
-                print(f"❌ Error loading {filename}: {e}")
+                print(f"❌ Error loading {os.path.basename(path)}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            entries = list(pool.map(safe_read, paths))
 
+        headers = {e[3].name: e[3] for e in entries if e}
+        cls._roster = UnitRoster(headers)
+        print(f"Loaded {len(headers)} unit headers from {cls.DATA_PATH}")
         return cls._roster
 
+    @classmethod
+    def get_headers(cls) -> Dict[str, UnitHeader]:
+        return cls._roster.headers if isinstance(cls._roster, UnitRoster) else {}
+
     @classmethod
     def save_unit(cls, unit: Unit):
         """Сохраняет одного персонажа в файл."""
@@ -49,6 +134,7 @@ class UnitLibrary:
                 json.dump(unit.to_dict(), f, indent=4, ensure_ascii=False)
             print(f"💾 Saved unit: {unit.name} -> {path}")
             # Обновляем кэш
+            cls._read_file(path)
             cls._roster[unit.name] = unit
             return True
         except Exception as e:
@@ -57,4 +143,4 @@ class UnitLibrary:
 
     @classmethod
     def get_roster(cls):
-        return cls._roster
\ No newline at end of file
+        return cls._roster
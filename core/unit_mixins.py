@@ -1,31 +1,26 @@
 import random
-from typing import Dict, List, Tuple, Any, TYPE_CHECKING
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple, Any, TYPE_CHECKING
+
+from core.status_store import StatusStore
+from core.zobrist import zobrist_key
 
 if TYPE_CHECKING:
     from core.unit import Unit
+    from core.card import Card
 
 
 class UnitStatusMixin:
     """
     Отвечает только за хранение и модификацию статус-эффектов (Strength, Bleed и т.д.).
+    Сами наложения и суммы стаков живут в StatusStore (self._status_effects).
     """
 
-    def _ensure_status_storage(self):
-        if not hasattr(self, "_status_effects"): self._status_effects = {}
-        if not hasattr(self, "delayed_queue"): self.delayed_queue = []
-
     @property
-    def statuses(self) -> Dict[str, int]:
-        self._ensure_status_storage()
-        summary = {}
-        for name, instances in self._status_effects.items():
-            total = sum(i["amount"] for i in instances)
-            if total > 0:
-                summary[name] = total
-        return summary
+    def statuses(self) -> Mapping[str, int]:
+        """Read-only вид name -> сумма стаков. Не копирует: если меняете статусы в цикле - берите list()."""
+        return self._status_effects.view
 
     def add_status(self, name: str, amount: int, duration: int = 1, delay: int = 0):
-        self._ensure_status_storage()
         if amount <= 0: return
 
         if delay > 0:
@@ -34,44 +29,17 @@ class UnitStatusMixin:
             })
             return
 
-        if name not in self._status_effects:
-            self._status_effects[name] = []
-
-        self._status_effects[name].append({"amount": amount, "duration": duration})
+        self._status_effects.add(name, amount, duration)
 
     def get_status(self, name: str) -> int:
-        self._ensure_status_storage()
-        if name not in self._status_effects: return 0
-        return sum(i["amount"] for i in self._status_effects[name])
+        return self._status_effects.get(name)
 
     def remove_status(self, name: str, amount: int = None):
-        self._ensure_status_storage()
-        if name not in self._status_effects: return
-
-        if amount is None:
-            del self._status_effects[name]
-            return
-
-        # Удаляем, начиная с самых коротких по длительности
-        items = sorted(self._status_effects[name], key=lambda x: x["duration"])
-        rem = amount
-        new_items = []
-
-        for item in items:
-            if rem <= 0:
-                new_items.append(item)
-                continue
-            if item["amount"] > rem:
-                item["amount"] -= rem
-                rem = 0
-                new_items.append(item)
-            else:
-                rem -= item["amount"]
+        self._status_effects.remove(name, amount)
 
-        if not new_items:
-            del self._status_effects[name]
-        else:
-            self._status_effects[name] = new_items
+    def clear_statuses(self):
+        self._status_effects.clear()
+        self.delayed_queue = []
 
 
 class UnitCombatMixin:
@@ -79,8 +47,9 @@ class UnitCombatMixin:
     Боевая логика: броски инициативы, проверки состояния (смерть, стаггер).
     """
 
-    def roll_speed_dice(self):
-        """Генерация активных слотов на раунд."""
+    def roll_speed_dice(self, rng=None):
+        """Генерация активных слотов на раунд. rng - поток случайных чисел (по умолчанию модуль random)."""
+        rng = rng or random
         self.active_slots = []
 
         if self.is_dead():
@@ -89,7 +58,7 @@ class UnitCombatMixin:
         # 1. Основные кубики (расчитанные из статов)
         for (d_min, d_max) in self.computed_speed_dice:
             mod = self.get_status("haste") - self.get_status("slow") - self.get_status("bind")
-            val = max(1, random.randint(d_min, d_max) + mod)
+            val = max(1, rng.randint(d_min, d_max) + mod)
             self.active_slots.append({
                 'speed': val, 'card': None, 'target_slot': None, 'is_aggro': False
             })
@@ -103,7 +72,7 @@ class UnitCombatMixin:
                 d_min, d_max = self.base_speed_min, self.base_speed_max
 
             mod = self.get_status("haste") - self.get_status("slow") - self.get_status("bind")
-            val = max(1, random.randint(d_min, d_max) + mod)
+            val = max(1, rng.randint(d_min, d_max) + mod)
 
             self.active_slots.append({
                 'speed': val, 'card': None, 'target_slot': None, 'is_aggro': False,
@@ -153,4 +122,75 @@ class UnitLifecycleMixin:
 
         # 3. Если умер — все баффы спадают
         if self.is_dead():
-            self.active_buffs.clear()
\ No newline at end of file
+            self.active_buffs.clear()
+
+
+class CombatState(NamedTuple):
+    """
+    Снимок боевого состояния юнита (все, что меняется по ходу боя).
+    Билд (атрибуты, навыки, таланты) не входит - он в бою не меняется.
+    Внутренние контейнеры снимка не отдаются наружу: restore() каждый раз копирует их заново.
+    """
+    current_hp: int
+    current_sp: int
+    current_stagger: int
+    statuses: StatusStore
+    delayed_queue: Tuple[Tuple[str, int, int, int], ...]
+    memory: Dict[str, Any]
+    cooldowns: Dict[str, int]
+    active_buffs: Dict[str, int]
+    resources: Dict[str, int]
+    active_slots: Tuple[Dict, ...]
+    current_card: Optional['Card']
+
+
+def slot_key(i: int, slot: Dict) -> int:
+    card = slot.get('card')
+    return zobrist_key("slot", i, slot.get('speed'), card.id if card else None, card.name if card else None,
+                       slot.get('target_unit', 0), slot.get('target_slot'), bool(slot.get('is_aggro')),
+                       bool(slot.get('stunned')))
+
+
+class UnitStateMixin:
+    """
+    Снимок/откат боевого состояния для перебора ходов (ИИ, решатели).
+    Стоимость - O(размера состояния), без deepcopy: карты и прочие неизменяемые объекты не копируются.
+    """
+
+    def state_hash(self) -> int:
+        """
+        64-битный Zobrist-хеш боевого состояния (те же поля, что в CombatState).
+        HP/SP/выдержка, статусы, кулдауны и баффы поддерживаются инкрементально;
+        слоты, отложенные статусы и память (единицы записей) досчитываются здесь.
+        """
+        h = self.__dict__.get("_zhash", 0) ^ self._status_effects.zhash
+        h ^= self.cooldowns.zhash ^ self.active_buffs.zhash
+        for i, d in enumerate(self.delayed_queue):
+            h ^= zobrist_key("delayed", i, d["name"], d["amount"], d["duration"], d["delay"])
+        for k, v in self.memory.items():
+            h ^= zobrist_key("memory", k, repr(v))
+        for i, slot in enumerate(self.active_slots):
+            h ^= slot_key(i, slot)
+        return h
+
+    def snapshot(self) -> CombatState:
+        return CombatState(
+            self.current_hp, self.current_sp, self.current_stagger,
+            self._status_effects.copy(),
+            tuple((d["name"], d["amount"], d["duration"], d["delay"]) for d in self.delayed_queue),
+            dict(self.memory), dict(self.cooldowns), dict(self.active_buffs), dict(self.resources),
+            tuple(dict(slot) for slot in self.active_slots),
+            self.current_card,
+        )
+
+    def restore(self, state: CombatState):
+        self.current_hp, self.current_sp, self.current_stagger = state[:3]
+        self._status_effects = state.statuses.copy()
+        self.delayed_queue = [{"name": n, "amount": a, "duration": d, "delay": dl}
+                              for n, a, d, dl in state.delayed_queue]
+        self.memory = dict(state.memory)
+        self.cooldowns = dict(state.cooldowns)
+        self.active_buffs = dict(state.active_buffs)
+        self.resources = dict(state.resources)
+        self.active_slots = [dict(slot) for slot in state.active_slots]
+        self.current_card = state.current_card
@@ -0,0 +1,78 @@
+# core/zobrist.py
+"""
+Zobrist-хеширование боевого состояния.
+Каждой паре (поле, значение) соответствует случайный 64-битный ключ, хеш состояния - XOR ключей.
+Изменение поля = XOR старого ключа и XOR нового, т.е. O(1) без пересчета всего юнита.
+Ключи детерминированы (blake2b, а не hash()), поэтому совпадают между процессами и запусками.
+"""
+import hashlib
+from functools import lru_cache
+
+MASK64 = (1 << 64) - 1
+
+
+@lru_cache(maxsize=1 << 16)
+def zobrist_key(*parts) -> int:
+    """64-битный ключ для кортежа (поле, значение...). Части должны быть хешируемыми."""
+    return int.from_bytes(hashlib.blake2b(repr(parts).encode(), digest_size=8).digest(), "little")
+
+
+def combine(*hashes: int) -> int:
+    """Хеш упорядоченного набора хешей (например, P1 и P2: их перестановка дает другой ключ)."""
+    h = 0
+    for x in hashes:
+        h = ((h ^ x) * 0x9E3779B97F4A7C15 + 0x632BE59BD9B4E019) & MASK64
+    return h
+
+
+class ZobristDict(dict):
+    """
+    dict со встроенным хешем содержимого (zhash), который обновляется на каждой записи.
+    tag отличает словари разных полей (cooldowns и active_buffs с одинаковыми ключами).
+    """
+
+    def __init__(self, tag: str, *args, **kwargs):
+        super().__init__()
+        self.tag = tag
+        self.zhash = 0
+        self.update(*args, **kwargs)
+
+    def _key(self, k, v) -> int:
+        return zobrist_key(self.tag, k, v)
+
+    def __setitem__(self, k, v):
+        if k in self: self.zhash ^= self._key(k, dict.__getitem__(self, k))
+        dict.__setitem__(self, k, v)
+        self.zhash ^= self._key(k, v)
+
+    def __delitem__(self, k):
+        self.zhash ^= self._key(k, dict.__getitem__(self, k))
+        dict.__delitem__(self, k)
+
+    def pop(self, k, *default):
+        if k in self: self.zhash ^= self._key(k, dict.__getitem__(self, k))
+        return dict.pop(self, k, *default)
+
+    def popitem(self):
+        k, v = dict.popitem(self)
+        self.zhash ^= self._key(k, v)
+        return k, v
+
+    def setdefault(self, k, default=None):
+        if k not in self: self[k] = default
+        return dict.__getitem__(self, k)
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def clear(self):
+        dict.clear(self)
+        self.zhash = 0
+
+    def copy(self) -> 'ZobristDict':
+        return ZobristDict(self.tag, self)
+
+    def __reduce__(self):
+        # pickle/deepcopy: собираем заново через update, хеш пересчитается
+        return self.__class__, (self.tag, dict(self))
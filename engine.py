@@ -1,7 +1,7 @@
 # engine.py
-import random
-from core.events import EventManager
+from core.events import EventManager, BEFORE_ROLL
 from core.models import Unit, Dice
+from core.rng import RngStream
 from logic.modifiers import RollContext
 from logic.passives import PASSIVE_REGISTRY
 from logic.talents import TALENT_REGISTRY
@@ -10,20 +10,23 @@ from logic.talents import TALENT_REGISTRY
 class CombatEngine:
     def __init__(self, seed=None):
         self.events = EventManager()
-        self.rng = random.Random(seed)
+        self.rng = RngStream(seed)
 
     def initialize_unit(self, unit: Unit):
-        """Подключает пассивки и таланты юнита к событиям"""
+        """Подключает пассивки и таланты юнита к событиям. Возвращает подписки (для отписки)."""
+        subs = []
 
         # Passives
         for pid in unit.passives:
             if pid in PASSIVE_REGISTRY:
-                self.events.subscribe("BEFORE_ROLL", PASSIVE_REGISTRY[pid])
+                subs.append(self.events.subscribe(BEFORE_ROLL, PASSIVE_REGISTRY[pid].on_roll))
 
         # Talents
         for pid in unit.talents:
             if pid in TALENT_REGISTRY:
-                self.events.subscribe("BEFORE_ROLL", TALENT_REGISTRY[pid])
+                subs.append(self.events.subscribe(BEFORE_ROLL, TALENT_REGISTRY[pid].on_roll))
+
+        return subs
 
     def roll_attack(self, attacker: Unit, defender: Unit, min_d: int, max_d: int):
         # 1. Базовый рандом
@@ -35,6 +38,6 @@ class CombatEngine:
         ctx.log.append(f"[Base Roll] {base_roll}")
 
         # 3. Запуск событий (Пассивки меняют ctx)
-        self.events.emit("BEFORE_ROLL", ctx)
+        self.events.emit(BEFORE_ROLL, ctx)
 
         return ctx
\ No newline at end of file
@@ -0,0 +1,492 @@
+# logic/batch_engine.py
+"""
+Пакетный движок: K независимых дуэлей одной пары юнитов в виде массивов (struct-of-arrays).
+Все бои продвигаются одновременно - бросок, сравнение, таблица взаимодействий и урон
+считаются векторно по всем боям сразу, поэтому на одном ядре это на порядки быстрее BattleSession.
+
+Правила те же, что у ClashSystem + BattleSession с RandomCardPolicy и авто-целями (слот i -> слот i).
+Поддерживается не все: статусы strength/bleed/paralysis/self_control, скрипты apply_status/restore_hp,
+таланты из SUPPORTED_TALENTS. Все остальное (и другие политики) - через скалярный движок:
+simulate_matchup_batched сам откатывается на logic.simulation.simulate_matchup.
+
+Поток случайных чисел - numpy.random.Generator, поэтому отдельные бои не совпадают
+с BattleSession при том же seed; совпадает распределение исходов.
+"""
+import copy
+from typing import List, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from core.enums import DiceType
+from core.models import Card, Unit
+from logic.battle import BattleSession, CardPolicy, RandomCardPolicy
+from logic.talents import TALENT_REGISTRY
+from logic.simulation import FightRow, MatchupStats, _resolve_unit, simulate_matchup, summarize
+
+SUPPORTED_STATUSES = ("strength", "bleed", "paralysis", "self_control")
+STRENGTH, BLEED, PARALYSIS, SELF_CONTROL = range(len(SUPPORTED_STATUSES))
+
+# Таланты, чьи хуки повторены ниже. berserker_rage - только пока ярость не активна
+SUPPORTED_TALENTS = {"calm_mind", "naked_defense", "vengeful_payback", "berserker_rage"}
+
+DTYPES = (DiceType.SLASH, DiceType.PIERCE, DiceType.BLUNT, DiceType.BLOCK, DiceType.EVADE)
+SLASH, PIERCE, BLUNT, BLOCK, EVADE = range(len(DTYPES))
+NO_DIE = -1
+
+# Триггеры кубика, которые реально вызывает ClashMechanicsMixin
+DIE_TRIGGERS = ("on_roll", "on_hit", "on_clash_win")
+ON_ROLL, ON_HIT, ON_CLASH_WIN = range(len(DIE_TRIGGERS))
+
+# Скрипт = строка таблицы с полями ниже (to_target: 1 - цель, 0 - владелец карты)
+OP_NONE, OP_STATUS, OP_HEAL = 0, 1, 2
+KIND, STATUS, AMOUNT, DURATION, DELAY, TO_TARGET = range(6)
+OP_FIELDS = 6
+
+
+def _compile_op(script_data: dict) -> Optional[tuple]:
+    """Скрипт карты -> строка таблицы. None - не поддерживается (нужен скалярный движок)."""
+    script_id = script_data.get("script_id")
+    params = script_data.get("params", {})
+    if script_id == "apply_status":
+        status = params.get("status")
+        if not status: return (OP_NONE, 0, 0, 0, 0, 0)
+        if status not in SUPPORTED_STATUSES: return None
+        # Длительность 0 в StatusStore истекает так же, как 1
+        return (OP_STATUS, SUPPORTED_STATUSES.index(status), params.get("stack", 1),
+                max(1, int(params.get("duration", 1))), int(params.get("delay", 0)),
+                int(params.get("target", "target") == "target"))
+    if script_id == "restore_hp":
+        return (OP_HEAL, 0, params.get("amount", 0), 0, 0, int(params.get("target", "self") != "self"))
+    return None
+
+
+def unsupported_reason(p1: Unit, p2: Unit, p1_deck: Sequence[Card], p2_deck: Sequence[Card]) -> Optional[str]:
+    """Почему этот бой нельзя посчитать пакетно (None - можно)."""
+    for unit in (p1, p2):
+        if unit.passives: return f"{unit.name}: пассивки"
+        extra = set(unit.talents) - SUPPORTED_TALENTS
+        if extra: return f"{unit.name}: таланты {sorted(extra)}"
+        if unit.active_buffs: return f"{unit.name}: активные баффы"
+    for deck in (p1_deck, p2_deck):
+        if not deck: return "пустая колода"
+        for card in deck:
+            scripts = [s for trig in ("on_use",) for s in card.scripts.get(trig, [])]
+            scripts += [s for d in card.dice_list for trig in DIE_TRIGGERS for s in d.scripts.get(trig, [])]
+            if any(_compile_op(s) is None for s in scripts):
+                return f"карта {card.name}: неподдерживаемый скрипт"
+    return None
+
+
+class _Tables:
+    """Колоды обеих сторон, упакованные в массивы [сторона, карта, кубик, ...]."""
+
+    def __init__(self, decks: Sequence[Sequence[Card]]):
+        n_cards = max(len(d) for d in decks)
+        n_dice = max(1, max(len(c.dice_list) for d in decks for c in d))
+
+        def n_ops(scripts_list):
+            return max([1] + [len(s) for s in scripts_list])
+
+        n_die_ops = n_ops([d.scripts.get(t, []) for deck in decks for c in deck for d in c.dice_list
+                           for t in DIE_TRIGGERS])
+        n_use_ops = n_ops([c.scripts.get("on_use", []) for deck in decks for c in deck])
+
+        self.n_cards = np.array([len(d) for d in decks])
+        self.n_dice = n_dice
+        self.dtype = np.full((2, n_cards, n_dice), NO_DIE, dtype=np.int64)
+        self.dmin = np.zeros((2, n_cards, n_dice), dtype=np.int64)
+        self.dmax = np.zeros((2, n_cards, n_dice), dtype=np.int64)
+        self.die_ops = np.zeros((2, n_cards, n_dice, len(DIE_TRIGGERS), n_die_ops, OP_FIELDS), dtype=np.int64)
+        self.use_ops = np.zeros((2, n_cards, n_use_ops, OP_FIELDS), dtype=np.int64)
+
+        for s, deck in enumerate(decks):
+            for c, card in enumerate(deck):
+                for k, script in enumerate(card.scripts.get("on_use", [])):
+                    self.use_ops[s, c, k] = _compile_op(script)
+                for j, die in enumerate(card.dice_list):
+                    self.dtype[s, c, j] = DTYPES.index(die.dtype)
+                    self.dmin[s, c, j] = die.min_val
+                    self.dmax[s, c, j] = die.max_val
+                    for t, trig in enumerate(DIE_TRIGGERS):
+                        for k, script in enumerate(die.scripts.get(trig, [])):
+                            self.die_ops[s, c, j, t, k] = _compile_op(script)
+
+        # Есть ли вообще скрипты на триггер (чтобы не гонять пустые таблицы)
+        self.has_die_ops = [bool(self.die_ops[..., t, :, KIND].any()) for t in range(len(DIE_TRIGGERS))]
+
+        ops = np.concatenate([self.die_ops.reshape(-1, OP_FIELDS), self.use_ops.reshape(-1, OP_FIELDS)])
+        statuses = ops[ops[:, KIND] == OP_STATUS]
+        # Длительности и задержки: размеры осей корзин статусов (vengeful_payback дает силу на 2 хода)
+        self.max_duration = int(max([2] + list(statuses[:, DURATION])))
+        self.max_delay = int(max([1] + list(statuses[:, DELAY])))
+
+
+class BatchBattle:
+    """
+    K боев p1 против p2. Состояние - массивы [сторона, бой]; статусы - корзины
+    [сторона, статус, бой, длительность] (как в StatusStore, только по всем боям сразу).
+    """
+
+    def __init__(self, p1: Unit, p2: Unit, p1_deck: Sequence[Card], p2_deck: Sequence[Card],
+                 n_fights: int, rng: "np.random.Generator"):
+        if np is None:
+            raise ImportError("BatchBattle требует numpy")
+        reason = unsupported_reason(p1, p2, p1_deck, p2_deck)
+        if reason: raise ValueError(f"Бой не поддерживается пакетным движком: {reason}")
+
+        self.rng = rng
+        self.k = n_fights
+        self.tables = _Tables([list(p1_deck), list(p2_deck)])
+
+        units = [copy.deepcopy(p1), copy.deepcopy(p2)]
+        for u in units:
+            BattleSession.reset_unit(u)
+            # naked_defense срабатывает на каждом on_combat_start и идемпотентен - применяем один раз
+            if "naked_defense" in u.talents:
+                TALENT_REGISTRY["naked_defense"].on_combat_start(u, None)
+
+        def per_side(fn, dtype=np.int64):
+            return np.array([fn(u) for u in units], dtype=dtype)
+
+        self.max_hp = per_side(lambda u: u.max_hp)
+        self.max_stagger = per_side(lambda u: u.max_stagger)
+        self.speed_dice = [np.array(u.computed_speed_dice, dtype=np.int64).reshape(-1, 2) for u in units]
+        self.damage_deal = per_side(lambda u: u.modifiers.get("damage_deal", 0))
+        self.damage_take = per_side(lambda u: u.modifiers.get("damage_take", 0))
+        self.heal_eff = per_side(lambda u: 1.0 + u.modifiers.get("heal_efficiency", 0.0), np.float64)
+        # Бонус к кубику по типу (как в _create_roll_context)
+        self.power = np.array([[u.modifiers.get("power_attack", 0) + u.modifiers.get("power_medium", 0)] * 3 +
+                               [u.modifiers.get("power_block", 0), u.modifiers.get("power_evade", 0)]
+                               for u in units], dtype=np.int64)
+        self.hp_res = np.array([[u.hp_resists.slash, u.hp_resists.pierce, u.hp_resists.blunt, 1.0, 1.0]
+                                for u in units], dtype=np.float64)
+        self.stagger_res = np.array([[u.stagger_resists.slash, u.stagger_resists.pierce,
+                                      u.stagger_resists.blunt, 1.0, 1.0] for u in units], dtype=np.float64)
+        self.calm_mind = per_side(lambda u: "calm_mind" in u.talents, bool)
+        self.vengeful = per_side(lambda u: "vengeful_payback" in u.talents, bool)
+
+        k = n_fights
+        self.hp = np.repeat(self.max_hp[:, None], k, axis=1)
+        self.stagger = np.repeat(self.max_stagger[:, None], k, axis=1)
+        self.st = np.zeros((2, len(SUPPORTED_STATUSES), k, self.tables.max_duration), dtype=np.int64)
+        self.pending = np.zeros((2, len(SUPPORTED_STATUSES), k, self.tables.max_delay, self.tables.max_duration),
+                                dtype=np.int64)
+        self.memory = np.zeros((2, k), dtype=np.int64)  # vengeful_payback: учтенные десятки HP
+        self.rounds = np.zeros(k, dtype=np.int64)
+        self.staggers = np.zeros((2, k), dtype=np.int64)
+        self.active = np.ones(k, dtype=bool)
+
+    # === СТАТУСЫ (s, f - массивы сторон и номеров боев, пары уникальны) ===
+    def _get(self, s, f, sid):
+        return self.st[s, sid, f].sum(axis=-1)
+
+    def _add(self, s, f, sid, amount, duration, delay=0):
+        ok = amount > 0
+        if not ok.all():
+            s, f, amount = s[ok], f[ok], amount[ok]
+            sid = sid[ok] if np.ndim(sid) else sid
+            duration = duration[ok] if np.ndim(duration) else duration
+            delay = delay[ok] if np.ndim(delay) else delay
+        if np.ndim(delay) == 0 and delay == 0:
+            self.st[s, sid, f, np.asarray(duration) - 1] += amount
+            return
+        delay = np.broadcast_to(delay, s.shape)
+        duration = np.broadcast_to(duration, s.shape)
+        sid = np.broadcast_to(sid, s.shape)
+        now = delay <= 0
+        self.st[s[now], sid[now], f[now], duration[now] - 1] += amount[now]
+        later = ~now
+        self.pending[s[later], sid[later], f[later], delay[later] - 1, duration[later] - 1] += amount[later]
+
+    def _remove(self, s, f, sid, amount):
+        """Как StatusStore.remove: сначала съедаются самые короткие наложения."""
+        buckets = self.st[s, sid, f]
+        cum = np.cumsum(buckets, axis=-1)
+        left = np.maximum(cum - amount[:, None], 0)
+        left[:, 1:] -= left[:, :-1].copy()
+        self.st[s, sid, f] = np.where((amount > 0)[:, None], left, buckets)
+
+    # === СКРИПТЫ ===
+    def _run_ops(self, ops, f, src):
+        """ops: [n, S, поля] - скрипты для каждого из n боев; src - сторона владельца карты."""
+        for k in range(ops.shape[1]):
+            o = ops[:, k]
+            sel = o[:, KIND] != OP_NONE
+            if not sel.any(): continue
+            o, ff, ss = o[sel], f[sel], src[sel]
+            unit = np.where(o[:, TO_TARGET] == 1, 1 - ss, ss)
+
+            st = o[:, KIND] == OP_STATUS
+            if st.any():
+                self._add(unit[st], ff[st], o[st, STATUS], o[st, AMOUNT], o[st, DURATION], o[st, DELAY])
+
+            heal = o[:, KIND] == OP_HEAL
+            if heal.any():
+                u, fh = unit[heal], ff[heal]
+                amt = np.trunc(o[heal, AMOUNT] * self.heal_eff[u]).astype(np.int64)
+                self.hp[u, fh] = np.minimum(self.max_hp[u], self.hp[u, fh] + amt)
+
+    def _die_ops(self, trigger, f, s, card, j):
+        if not self.tables.has_die_ops[trigger]: return
+        self._run_ops(self.tables.die_ops[s, card, j, trigger], f, s)
+
+    # === БРОСОК (_create_roll_context) ===
+    def _roll(self, f, s, card, j):
+        t = self.tables
+        dtype = t.dtype[s, card, j]
+        val = self.rng.integers(t.dmin[s, card, j], t.dmax[s, card, j] + 1) + self.power[s, dtype]
+        attack = dtype < BLOCK
+
+        strength = self._get(s, f, STRENGTH)
+        val += np.where(attack, strength, 0)
+
+        bleed = np.where(attack, self._get(s, f, BLEED), 0)
+        if bleed.any():
+            self.hp[s, f] -= bleed
+            self._remove(s, f, BLEED, bleed // 2)
+
+        paralysis = self._get(s, f, PARALYSIS) > 0
+        if paralysis.any():
+            val -= 3 * paralysis
+            self._remove(s, f, PARALYSIS, paralysis.astype(np.int64))
+
+        self._die_ops(ON_ROLL, f, s, card, j)
+        return val, dtype
+
+    # === УРОН ===
+    def _direct(self, f, target, amount, dtype, kind):
+        """_deal_direct_damage: kind 0 - HP, 1 - Stagger."""
+        if kind == 0:
+            res = self.hp_res[target, dtype] * np.where(self.stagger[target, f] <= 0, 2.0, 1.0)
+            dmg = np.trunc(amount * res).astype(np.int64)
+            self.hp[target, f] -= np.where(amount > 0, dmg, 0)
+        else:
+            dmg = np.trunc(amount * self.stagger_res[target, dtype]).astype(np.int64)
+            self.stagger[target, f] -= np.where(amount > 0, dmg, 0)
+
+    def _apply_damage(self, f, s, val, dtype, card, j):
+        """_apply_damage: on_hit (крит самообладания, calm_mind, скрипты), затем HP и стаггер."""
+        target = 1 - s
+        mult = np.ones(len(f), dtype=np.int64)
+
+        sc = self._get(s, f, SELF_CONTROL)
+        has_sc = sc > 0
+        if has_sc.any():
+            crit = has_sc & (self.rng.integers(1, 101, len(f)) <= np.minimum(100, sc * 5))
+            mult = np.where(crit, 2, 1)
+            if crit.any():
+                self._remove(s[crit], f[crit], SELF_CONTROL, np.full(crit.sum(), 20))
+
+        calm = self.calm_mind[s]
+        if calm.any():
+            gain = calm & (self._get(s, f, SELF_CONTROL) < 100)
+            self._add(s[gain], f[gain], SELF_CONTROL, np.ones(gain.sum(), dtype=np.int64), 1)
+
+        self._die_ops(ON_HIT, f, s, card, j)
+
+        total = np.maximum(0, val + self.damage_deal[s] - self.damage_take[target]) * mult
+        self._direct(f, target, total, dtype, 0)
+        standing = self.stagger[target, f] > 0
+        stg = np.trunc(total * self.stagger_res[target, dtype]).astype(np.int64)
+        self.stagger[target, f] -= np.where(standing, stg, 0)
+
+    def _interaction(self, f, w, wv, wt, lt, diff, card, j):
+        """_resolve_clash_interaction для победителя w (остальные массивы - по тем же боям)."""
+        w_atk = wt < BLOCK
+        l_blk = lt == BLOCK
+
+        full = w_atk & ~l_blk
+        if full.any():
+            self._apply_damage(f[full], w[full], wv[full], wt[full], card[full], j)
+        chip = w_atk & l_blk
+        if chip.any():
+            self._direct(f[chip], 1 - w[chip], diff[chip], wt[chip], 0)
+        parry = wt == BLOCK
+        if parry.any():
+            self._direct(f[parry], 1 - w[parry], diff[parry], wt[parry], 1)
+
+    def _can_act(self, s, f):
+        return (self.hp[s, f] > 0) & (self.stagger[s, f] > 0)
+
+    # === СЦЕНАРИИ ===
+    def _one_sided(self, f, s, card):
+        target = 1 - s
+        self._run_ops(self.tables.use_ops[s, card], f, s)
+        going = np.ones(len(f), dtype=bool)
+        for j in range(self.tables.n_dice):
+            going &= self._can_act(s, f) & (self.hp[target, f] > 0) & (self.tables.dtype[s, card, j] != NO_DIE)
+            if not going.any(): break
+            g = np.nonzero(going)[0]
+            val, dtype = self._roll(f[g], s[g], card[g], j)
+            hit = dtype < BLOCK
+            if hit.any():
+                h = g[hit]
+                self._apply_damage(f[h], s[h], val[hit], dtype[hit], card[h], j)
+
+    def _clash(self, f, a, card_a, card_d):
+        d = 1 - a
+        t = self.tables
+        self._run_ops(t.use_ops[a, card_a], f, a)
+        self._run_ops(t.use_ops[d, card_d], f, d)
+
+        going = np.ones(len(f), dtype=bool)
+        for j in range(t.n_dice):
+            atk_ok = self._can_act(a, f)
+            def_ok = self._can_act(d, f)
+            going &= atk_ok | def_ok
+            has_a = going & atk_ok & (t.dtype[a, card_a, j] != NO_DIE)
+            has_d = going & def_ok & (t.dtype[d, card_d, j] != NO_DIE)
+            going &= has_a | has_d
+            if not going.any(): break
+
+            n = len(f)
+            val_a = np.zeros(n, dtype=np.int64)
+            val_d = np.zeros(n, dtype=np.int64)
+            typ_a = np.full(n, NO_DIE)
+            typ_d = np.full(n, NO_DIE)
+            ia = np.nonzero(has_a)[0]
+            if len(ia): val_a[ia], typ_a[ia] = self._roll(f[ia], a[ia], card_a[ia], j)
+            idd = np.nonzero(has_d)[0]
+            if len(idd): val_d[idd], typ_d[idd] = self._roll(f[idd], d[idd], card_d[idd], j)
+
+            both = has_a & has_d
+            for win, wv, lv, wt, lt, ws, wcard in ((both & (val_a > val_d), val_a, val_d, typ_a, typ_d, a, card_a),
+                                                  (both & (val_d > val_a), val_d, val_a, typ_d, typ_a, d, card_d)):
+                if not win.any(): continue
+                i = np.nonzero(win)[0]
+                self._die_ops(ON_CLASH_WIN, f[i], ws[i], wcard[i], j)
+                self._interaction(f[i], ws[i], wv[i], wt[i], lt[i], wv[i] - lv[i], wcard[i], j)
+
+            # Кубик без ответа: атакующий бьет, защитный пропускается
+            for alone, val, typ, src, scard in ((has_a & ~has_d, val_a, typ_a, a, card_a),
+                                               (has_d & ~has_a, val_d, typ_d, d, card_d)):
+                hit = alone & (typ >= 0) & (typ < BLOCK)
+                if not hit.any(): continue
+                i = np.nonzero(hit)[0]
+                self._apply_damage(f[i], src[i], val[i], typ[i], scard[i], j)
+
+    # === РАУНД ===
+    def _play_round(self, live):
+        n = len(live)
+        stunned = self.stagger[:, live] <= 0  # [2, n]
+        n_slots = [len(sd) for sd in self.speed_dice]
+        pairs = min(n_slots)
+
+        # Скорость и карты (RandomCardPolicy) для слотов, которые могут сыграть: i < min(слотов)
+        speed = np.zeros((2, n, pairs), dtype=np.int64)
+        cards = np.zeros((2, n, pairs), dtype=np.int64)
+        for s in (0, 1):
+            if pairs:
+                sd = self.speed_dice[s][:pairs]
+                speed[s] = np.maximum(1, self.rng.integers(sd[:, 0], sd[:, 1] + 1, size=(n, pairs)))
+                cards[s] = self.rng.integers(0, self.tables.n_cards[s], size=(n, pairs))
+
+        # Сколько пар слотов реально сходится: у оглушенного один пустой слот
+        n_pairs = np.where(stunned.any(axis=0), 1, pairs)
+        slot = np.arange(pairs)
+        has_action = (~stunned[:, :, None]) & (slot[None, None, :] < n_pairs[None, :, None])  # [2, n, pairs]
+
+        # Порядок действий: скорость + случайный тай-брейк, по убыванию
+        score = np.where(has_action, speed + self.rng.random((2, n, pairs)), -np.inf)
+        flat = score.transpose(1, 0, 2).reshape(n, 2 * pairs)
+        order = np.argsort(-flat, axis=1, kind="stable")
+
+        executed = np.zeros((2, n, pairs), dtype=bool)
+        rows = np.arange(n)
+        for r in range(2 * pairs):
+            ev = order[:, r]
+            side, idx = ev // pairs, ev % pairs
+            opp = 1 - side
+            f = live
+            valid = np.isfinite(flat[rows, ev]) & ~executed[side, rows, idx] & self._can_act(side, f)
+            if not valid.any(): continue
+
+            partner_ready = ~stunned[opp, rows] & ~executed[opp, rows, idx]
+            executed[side[valid], rows[valid], idx[valid]] = True
+            clash = valid & partner_ready
+            executed[opp[clash], rows[clash], idx[clash]] = True
+
+            opp_staggered = self.stagger[opp, f] <= 0
+            one = (valid & ~partner_ready) | (clash & opp_staggered)
+            full = clash & ~opp_staggered
+            if one.any():
+                i = np.nonzero(one)[0]
+                self._one_sided(f[i], side[i], cards[side[i], i, idx[i]])
+            if full.any():
+                i = np.nonzero(full)[0]
+                self._clash(f[i], side[i], cards[side[i], i, idx[i]], cards[opp[i], i, idx[i]])
+
+        # Конец хода: выход из стаггера, подсчет новых стаггеров
+        for s in (0, 1):
+            rec = live[stunned[s]]
+            self.stagger[s, rec] = self.max_stagger[s]
+            self.staggers[s, live] += (self.stagger[s, live] <= 0) & ~stunned[s]
+
+        for s in (0, 1):
+            self._end_round(s, live)
+        self.rounds[live] += 1
+
+    def _end_round(self, s, live):
+        side = np.full(len(live), s)
+        # vengeful_payback (on_round_end)
+        if self.vengeful[s]:
+            chunks = (self.max_hp[s] - self.hp[s, live]) // 10
+            diff = chunks - self.memory[s, live]
+            self._add(side, live, STRENGTH, np.maximum(diff, 0), 2)
+            self.memory[s, live] = chunks
+
+        # StatusManager.process_turn_end: self_control -20, затем -1 к длительности
+        sc = self._get(side, live, SELF_CONTROL) > 0
+        if sc.any():
+            self._remove(side[sc], live[sc], SELF_CONTROL, np.full(sc.sum(), 20))
+        # Сдвиг корзин длительности и отложенных статусов - по всем боям сразу, без копий:
+        # у завершенных боев статусы больше ни на что не влияют
+        st, pend = self.st[s], self.pending[s]
+        st[..., :-1] = st[..., 1:]
+        st[..., -1] = 0
+        st += pend[:, :, 0]
+        pend[:, :, :-1] = pend[:, :, 1:]
+        pend[:, :, -1] = 0
+
+    def run(self, max_rounds: int = 100):
+        while True:
+            self.active &= (self.hp[0] > 0) & (self.hp[1] > 0) & (self.rounds < max_rounds)
+            live = np.nonzero(self.active)[0]
+            if not len(live): break
+            self._play_round(live)
+
+        p1_dead, p2_dead = self.hp[0] <= 0, self.hp[1] <= 0
+        winner = np.where(p2_dead & ~p1_dead, 1, np.where(p1_dead & ~p2_dead, 2, 0))
+        return winner, self.rounds, np.maximum(self.hp[0], 0), np.maximum(self.hp[1], 0), \
+            self.staggers[0], self.staggers[1]
+
+    def rows(self, max_rounds: int = 100) -> List[FightRow]:
+        return list(zip(*(a.tolist() for a in self.run(max_rounds))))
+
+
+def simulate_matchup_batched(p1: Union[Unit, str], p2: Union[Unit, str],
+                             p1_policy: CardPolicy, p2_policy: Optional[CardPolicy] = None,
+                             n_fights: int = 1000, max_rounds: int = 100,
+                             seed: Optional[int] = None, batch_size: int = 100_000) -> MatchupStats:
+    """
+    То же, что simulate_matchup, но пакетным движком в одном процессе.
+    Если бой не поддерживается (не RandomCardPolicy, лишние таланты/скрипты, нет numpy) -
+    откатывается на simulate_matchup.
+    """
+    p1 = _resolve_unit(p1)
+    p2 = _resolve_unit(p2)
+    if p2_policy is None: p2_policy = p1_policy
+
+    policies_ok = type(p1_policy) is RandomCardPolicy and type(p2_policy) is RandomCardPolicy
+    if np is None or not policies_ok or unsupported_reason(p1, p2, p1_policy.deck, p2_policy.deck):
+        return simulate_matchup(p1, p2, p1_policy, p2_policy, n_fights=n_fights, max_rounds=max_rounds, seed=seed)
+
+    rng = np.random.default_rng(seed)
+    rows = []
+    for start in range(0, n_fights, batch_size):
+        size = min(batch_size, n_fights - start)
+        rows.extend(BatchBattle(p1, p2, p1_policy.deck, p2_policy.deck, size, rng).rows(max_rounds))
+    return summarize(rows)
@@ -0,0 +1,260 @@
+# logic/battle.py
+import random
+from dataclasses import dataclass
+from typing import List, Optional
+
+from core.models import Unit, Card
+from core.rng import RngStream
+from core.zobrist import combine
+from logic.clash import ClashSystem
+from logic.combat_log import LOG_FULL
+from logic.statuses import StatusManager
+from logic.hooks import get_hooks
+
+
+# ==========================================
+# ПОЛИТИКИ (кто какую карту и цель выбирает)
+# ==========================================
+class CardPolicy:
+    """
+    Базовая политика выбора карт. По умолчанию ничего не назначает
+    (карты выставляет человек через UI).
+    """
+
+    def choose_card(self, unit: Unit, opponent: Unit, slot_idx: int, rng=random) -> Optional[Card]:
+        return None
+
+    def assign_cards(self, unit: Unit, opponent: Unit, rng=random):
+        for i, slot in enumerate(unit.active_slots):
+            if slot.get('stunned'): continue
+            card = self.choose_card(unit, opponent, i, rng)
+            if card is not None:
+                slot['card'] = card
+
+
+class RandomCardPolicy(CardPolicy):
+    """Случайная карта из колоды на каждый слот."""
+
+    def __init__(self, deck: List[Card]):
+        self.deck = list(deck)
+
+    def choose_card(self, unit: Unit, opponent: Unit, slot_idx: int, rng=random) -> Optional[Card]:
+        if not self.deck: return None
+        return rng.choice(self.deck)
+
+
+class TargetPolicy:
+    """
+    Базовая политика выбора целей. По умолчанию оставляет авто-назначение
+    из roll_phase (слот i бьет в слот i).
+    """
+
+    def choose_target(self, unit: Unit, opponent: Unit, slot_idx: int) -> int:
+        return unit.active_slots[slot_idx].get('target_slot', -1)
+
+    def assign_targets(self, unit: Unit, opponent: Unit):
+        for i, slot in enumerate(unit.active_slots):
+            if slot.get('stunned'): continue
+            slot['target_slot'] = self.choose_target(unit, opponent, i)
+
+
+class MirrorTargetPolicy(TargetPolicy):
+    """Слот i атакует слот i противника (если такой есть)."""
+
+    def choose_target(self, unit: Unit, opponent: Unit, slot_idx: int) -> int:
+        return slot_idx if slot_idx < len(opponent.active_slots) else -1
+
+
+# ==========================================
+# РЕЗУЛЬТАТ БОЯ
+# ==========================================
+@dataclass
+class BattleResult:
+    winner: int  # 1 - P1, 2 - P2, 0 - ничья / лимит раундов
+    rounds: int
+    p1_hp: int
+    p2_hp: int
+    p1_staggers: int = 0
+    p2_staggers: int = 0
+
+
+# ==========================================
+# СЕССИЯ БОЯ (без Streamlit)
+# ==========================================
+class BattleSession:
+    """
+    Полный цикл раунда: бросок скорости -> планирование -> ClashSystem -> конец раунда.
+    Ничего не знает про st.session_state, поэтому годится и для UI, и для скриптов.
+    """
+
+    def __init__(self, p1: Unit, p2: Unit,
+                 p1_policy: Optional[CardPolicy] = None, p2_policy: Optional[CardPolicy] = None,
+                 p1_targets: Optional[TargetPolicy] = None, p2_targets: Optional[TargetPolicy] = None,
+                 rng=None, log_level: int = LOG_FULL, sync_rounds: bool = False):
+        self.p1 = p1
+        self.p2 = p2
+        self.p1_policy = p1_policy
+        self.p2_policy = p2_policy
+        self.p1_targets = p1_targets
+        self.p2_targets = p2_targets
+
+        # Один поток случайных чисел на весь бой: скорость, кубики, выбор карт
+        self.rng = rng or random
+        # Раунд r начинается с потока rng.child(r) (нужен RngStream): расхождение в одном раунде
+        # не сдвигает случайные числа следующих - для сравнения вариантов на общих случайных числах
+        if sync_rounds and not isinstance(self.rng, RngStream):
+            raise ValueError(f"sync_rounds требует rng типа RngStream, передан {type(self.rng).__name__}")
+        self.sync_rounds = sync_rounds
+        self.clash = ClashSystem(self.rng, log_level=log_level)
+        self.round = 0
+        self.staggers = {1: 0, 2: 0}
+        self.turn_message = ""
+
+    # === 1. БРОСОК СКОРОСТИ ===
+    def _roll_unit(self, unit: Unit):
+        if unit.is_staggered():
+            # Если юнит в стаггере, он получает "пустой" слот и метку stunned
+            # Скорость 0, чтобы враги всегда были быстрее
+            unit.active_slots = [{
+                'speed': 0,
+                'card': None,
+                'target_slot': -1,
+                'is_aggro': False,
+                'stunned': True  # Метка: этот ход пропущен из-за стаггера
+            }]
+        else:
+            unit.roll_speed_dice(self.rng)
+
+    def roll_phase(self):
+        """Бросок кубиков скорости. Если юнит в стаггере - он пропускает ход."""
+        p1, p2 = self.p1, self.p2
+
+        p1.recalculate_stats()
+        p2.recalculate_stats()
+
+        self._roll_unit(p1)
+        self._roll_unit(p2)
+
+        # Авто-назначение целей (если не стаггер)
+        max_len = max(len(p1.active_slots), len(p2.active_slots))
+        for i in range(max_len):
+            if i < len(p1.active_slots) and not p1.active_slots[i].get('stunned'):
+                p1.active_slots[i]['target_slot'] = i if i < len(p2.active_slots) else -1
+
+            if i < len(p2.active_slots) and not p2.active_slots[i].get('stunned'):
+                p2.active_slots[i]['target_slot'] = i if i < len(p1.active_slots) else -1
+
+    # === 2. ПЛАНИРОВАНИЕ ===
+    def plan_phase(self):
+        """Политики выставляют цели и карты. Без политик слоты остаются как есть (ручной режим)."""
+        for unit, opp, targets, policy in ((self.p1, self.p2, self.p1_targets, self.p1_policy),
+                                           (self.p2, self.p1, self.p2_targets, self.p2_policy)):
+            if targets: targets.assign_targets(unit, opp)
+            if policy: policy.assign_cards(unit, opp, self.rng)
+
+    # === 3. БОЙ И КОНЕЦ РАУНДА ===
+    def execute_turn(self) -> List[dict]:
+        p1, p2 = self.p1, self.p2
+        was_staggered = {1: p1.is_staggered(), 2: p2.is_staggered()}
+
+        report = self.clash.resolve_turn(p1, p2)
+
+        msg = []
+
+        # Мы восстанавливаем стаггер ТОЛЬКО если юнит провел ЭТОТ ход в состоянии оглушения.
+        for unit in (p1, p2):
+            if unit.active_slots and unit.active_slots[0].get('stunned'):
+                unit.current_stagger = unit.max_stagger
+                msg.append(f"✨ {unit.name} recovered from Stagger!")
+
+        # Обычное сообщение, если никто не восстанавливался
+        if not msg:
+            if p1.is_staggered(): msg.append(f"{p1.name} is Staggered!")
+            if p2.is_staggered(): msg.append(f"{p2.name} is Staggered!")
+
+        self.turn_message = " ".join(msg) if msg else "Turn Complete."
+
+        report.extend(self.end_round(p1, "P1"))
+        report.extend(self.end_round(p2, "P2"))
+
+        for side, unit in ((1, p1), (2, p2)):
+            if unit.is_staggered() and not was_staggered[side]:
+                self.staggers[side] += 1
+
+        p1.active_slots = []
+        p2.active_slots = []
+        self.round += 1
+        return report
+
+    @staticmethod
+    def end_round(unit: Unit, prefix: str) -> List[dict]:
+        logs = []
+
+        # 1-2. Passives / Talents Round End
+        for handler in get_hooks(unit).ability("on_round_end"):
+            handler(unit, logs.append)
+
+        # 3. Statuses Round End
+        logs.extend(StatusManager.process_turn_end(unit))
+
+        # 4. Кулдауны
+        unit.tick_cooldowns()
+
+        if logs:
+            return [{"round": "End", "rolls": f"{prefix} End", "details": ", ".join(logs)}]
+        return []
+
+    # === СНИМОК (перебор ходов без deepcopy) ===
+    def snapshot(self) -> tuple:
+        return self.round, dict(self.staggers), self.p1.snapshot(), self.p2.snapshot()
+
+    def restore(self, state: tuple):
+        self.round, staggers, p1_state, p2_state = state
+        self.staggers = dict(staggers)
+        self.p1.restore(p1_state)
+        self.p2.restore(p2_state)
+
+    def state_hash(self) -> int:
+        """Ключ позиции для таблицы транспозиций (P1 и P2 не переставляются)."""
+        return combine(self.round, self.p1.state_hash(), self.p2.state_hash())
+
+    # === ПОЛНЫЙ БОЙ ===
+    def play_round(self) -> List[dict]:
+        if self.sync_rounds: self.rng.reset_to_child(self.round)
+        self.roll_phase()
+        self.plan_phase()
+        return self.execute_turn()
+
+    def is_over(self) -> bool:
+        return self.p1.is_dead() or self.p2.is_dead()
+
+    def run(self, max_rounds: int = 100) -> BattleResult:
+        """Крутит раунды до смерти одного из бойцов (или до лимита)."""
+        while not self.is_over() and self.round < max_rounds:
+            self.play_round()
+
+        winner = 0
+        if self.p2.is_dead() and not self.p1.is_dead():
+            winner = 1
+        elif self.p1.is_dead() and not self.p2.is_dead():
+            winner = 2
+
+        return BattleResult(
+            winner=winner, rounds=self.round,
+            p1_hp=self.p1.current_hp, p2_hp=self.p2.current_hp,
+            p1_staggers=self.staggers[1], p2_staggers=self.staggers[2]
+        )
+
+    @staticmethod
+    def reset_unit(unit: Unit):
+        """Полное лечение и сброс боевого состояния."""
+        unit.recalculate_stats()
+        unit.current_hp = unit.max_hp
+        unit.current_stagger = unit.max_stagger
+        unit.current_sp = unit.max_sp
+        unit.clear_statuses()
+        unit.memory = {}
+        unit.active_slots = []
+        # Сброс кулдаунов
+        unit.cooldowns = {}
+        unit.active_buffs = {}
@@ -1,44 +1,85 @@
 # logic/card_scripts.py
-from typing import TYPE_CHECKING
+from collections import namedtuple
+from functools import partial
+from typing import Callable, Dict, List, TYPE_CHECKING
+from logic.combat_log import STATUS, HEAL
 
 if TYPE_CHECKING:
     from logic.modifiers import RollContext
 
 
-def apply_status(context: 'RollContext', params: dict):
-    status_name = params.get("status")
-    stack = params.get("stack", 1)
-    target_type = params.get("target", "target")
+# === РЕАЛИЗАЦИИ (параметры уже разобраны) ===
+def _apply_status(status_name, stack, target_type, duration, delay, context: 'RollContext'):
+    unit_to_affect = context.target if target_type == "target" else context.source
+    if not unit_to_affect or not status_name: return
 
-    # Читаем новые параметры
-    duration = int(params.get("duration", 1))
-    delay = int(params.get("delay", 0))
+    unit_to_affect.add_status(status_name, stack, duration=duration, delay=delay)
+    context.log.add(STATUS, status_name, stack, duration, delay, unit_to_affect.name)
 
-    unit_to_affect = context.target if target_type == "target" else context.source
-    if not unit_to_affect: return
 
-    if unit_to_affect and status_name:
-        unit_to_affect.add_status(status_name, stack, duration=duration, delay=delay)
+def _restore_hp(amount, target_type, context: 'RollContext'):
+    unit = context.source if target_type == "self" else context.target
+    if unit:
+        actual_heal = unit.heal_hp(amount)
+        context.log.add(HEAL, actual_heal, unit.name)
 
-        # Формируем красивый лог
-        extras = []
-        if duration > 1: extras.append(f"{duration} turns")
-        if delay > 0: extras.append(f"in {delay} turns")
-        extra_str = f" ({', '.join(extras)})" if extras else ""
 
-        context.log.append(f"🧪 {status_name.capitalize()} +{stack}{extra_str} to {unit_to_affect.name}")
+# === РАЗБОР ПАРАМЕТРОВ (один раз при загрузке) ===
+def compile_apply_status(params: dict) -> Callable:
+    return partial(_apply_status, params.get("status"), params.get("stack", 1), params.get("target", "target"),
+                   int(params.get("duration", 1)), int(params.get("delay", 0)))
+
+
+def compile_restore_hp(params: dict) -> Callable:
+    return partial(_restore_hp, params.get("amount", 0), params.get("target", "self"))
+
+
+# === СТАРЫЙ ИНТЕРФЕЙС (context, params) ===
+def apply_status(context: 'RollContext', params: dict):
+    compile_apply_status(params)(context)
 
 
 def restore_hp(context: 'RollContext', params: dict):
-    amount = params.get("amount", 0)
-    target_type = params.get("target", "self")
-    unit = context.source if target_type == "self" else context.target
-    if unit:
-        actual_heal = unit.heal_hp(amount)
-        context.log.append(f"💚 Healed {actual_heal} HP ({unit.name})")
+    compile_restore_hp(params)(context)
 
 
 SCRIPTS_REGISTRY = {
     "apply_status": apply_status,
     "restore_hp": restore_hp
-}
\ No newline at end of file
+}
+
+# Скрипты с предразбором параметров. Для остальных из SCRIPTS_REGISTRY params просто привязываются
+SCRIPT_COMPILERS = {
+    "apply_status": compile_apply_status,
+    "restore_hp": compile_restore_hp,
+}
+
+
+# === КОМПИЛЯЦИЯ scripts -> кортежи вызываемых по триггерам ===
+SCRIPT_TRIGGERS = ("on_use", "on_roll", "on_hit", "on_clash_win", "on_clash_lose", "on_combat_end")
+
+CompiledScripts = namedtuple("CompiledScripts", SCRIPT_TRIGGERS, defaults=((),) * len(SCRIPT_TRIGGERS))
+NO_SCRIPTS = CompiledScripts()
+
+
+def compile_script(script_data: dict) -> Callable:
+    script_id = script_data.get("script_id")
+    params = script_data.get("params", {})
+    compiler = SCRIPT_COMPILERS.get(script_id)
+    if compiler: return compiler(params)
+    if script_id in SCRIPTS_REGISTRY: return partial(SCRIPTS_REGISTRY[script_id], params=dict(params))
+    raise ValueError(f"Неизвестный скрипт: {script_id!r}")
+
+
+def compile_scripts(scripts: Dict[str, List[Dict]]) -> CompiledScripts:
+    """
+    {"on_hit": [{"script_id", "params"}, ...]} -> CompiledScripts(on_hit=(callable(ctx), ...), ...).
+    Неизвестные триггеры и script_id - ValueError.
+    """
+    if not scripts: return NO_SCRIPTS
+    compiled = {}
+    for trigger, entries in scripts.items():
+        if trigger not in CompiledScripts._fields:
+            raise ValueError(f"Неизвестный триггер скрипта: {trigger!r}")
+        compiled[trigger] = tuple(compile_script(s) for s in entries)
+    return CompiledScripts(**compiled)
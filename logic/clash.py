@@ -1,18 +1,42 @@
+import heapq
 import random
+from typing import Optional, Sequence, Tuple
 from core.models import Unit
 from logic.clash_flow import ClashFlowMixin
+from logic.combat_log import make_log, LOG_FULL
+
+# Адрес слота в команде: (индекс юнита, индекс слота)
+SlotRef = Tuple[int, int]
+
+
+def target_ref(slot: dict, enemies: Sequence[Unit]) -> Optional[SlotRef]:
+    """
+    Цель слота как (юнит, слот) в команде противника или None, если цели нет/она вне диапазона.
+    target_unit не задан -> 0: в дуэли противник один.
+    """
+    j = slot.get('target_slot')
+    if j is None or j < 0: return None
+    v = slot.get('target_unit', 0)
+    if not 0 <= v < len(enemies) or j >= len(enemies[v].active_slots): return None
+    return v, j
 
 
 class ClashSystem(ClashFlowMixin):
     """
     Уровень 3: Управление боем (Дирижер).
     - Расчет инициативы и перенаправлений
-    - Сортировка действий
+    - Очередь действий (дуэль или команды N на N)
     - Запуск соответствующего сценария (Clash/One-Sided)
     """
 
-    def __init__(self):
-        self.logs = []
+    def __init__(self, rng=None, events=None, log_level=LOG_FULL):
+        # LOG_NONE - для пакетных прогонов: записи не копятся, отчет не собирается
+        self.log_level = log_level
+        self.logs = make_log(log_level)
+        # Поток случайных чисел (броски кубиков, тай-брейки). По умолчанию - глобальный random
+        self.rng = rng or random
+        # Необязательная шина событий (core.events.EventManager) для внешних подписчиков
+        self.events = events
 
     def log(self, message):
         self.logs.append(message)
@@ -23,139 +47,125 @@ class ClashSystem(ClashFlowMixin):
         Перенаправляет цель защитника на атакующего, если атакующий быстрее.
         Приоритет: 1. Aggro, 2. Самый медленный.
         """
-        interceptors = {}
-        for i, s1 in enumerate(attacker.active_slots):
-            target_idx = s1.get('target_slot', -1)
-            if target_idx != -1 and target_idx < len(defender.active_slots):
-                s2 = defender.active_slots[target_idx]
-                if s1['speed'] > s2['speed']:
-                    if target_idx not in interceptors: interceptors[target_idx] = []
-                    interceptors[target_idx].append(i)
-
-        for def_idx, atk_indices in interceptors.items():
-            s2 = defender.active_slots[def_idx]
-            aggro_indices = [idx for idx in atk_indices if attacker.active_slots[idx].get('is_aggro')]
-
-            chosen_idx = None
-            if aggro_indices:
-                # Если есть Aggro, берем самого медленного из них
-                chosen_idx = min(aggro_indices, key=lambda idx: attacker.active_slots[idx]['speed'])
-            else:
-                # Иначе берем самого медленного из всех (стандарт)
-                chosen_idx = min(atk_indices, key=lambda idx: attacker.active_slots[idx]['speed'])
+        ClashSystem.calculate_team_redirections([attacker], [defender])
 
-            s2['target_slot'] = chosen_idx
+    @staticmethod
+    def calculate_team_redirections(attackers: Sequence[Unit], defenders: Sequence[Unit]):
+        """
+        То же для команд: слот защитника перехватывает лучший из более быстрых слотов, целящихся в него.
+        Приоритет: 1. Aggro, 2. Самый медленный, 3. Первый по (юнит, слот).
+        Индекс "цель -> лучший перехватчик" собирается за один проход по слотам атакующих.
+        """
+        best = {}
+        for u, unit in enumerate(attackers):
+            for i, s1 in enumerate(unit.active_slots):
+                ref = target_ref(s1, defenders)
+                if ref is None: continue
+                s2 = defenders[ref[0]].active_slots[ref[1]]
+                if s1['speed'] <= s2['speed']: continue
+
+                key = (not s1.get('is_aggro'), s1['speed'])
+                if ref not in best or key < best[ref][0]:
+                    best[ref] = (key, (u, i))
+
+        for (v, j), (_, (u, i)) in best.items():
+            s2 = defenders[v].active_slots[j]
+            s2['target_unit'] = u
+            s2['target_slot'] = i
+
+    @staticmethod
+    def _slot_label(teams, side: int, u: int, i: int) -> str:
+        # В дуэли - как раньше "P1[2]", в командах с номером юнита "P1.3[2]"
+        unit_no = f".{u + 1}" if len(teams[side]) > 1 else ""
+        return f"P{side + 1}{unit_no}[{i + 1}]"
 
     def resolve_turn(self, p1: Unit, p2: Unit):
-        self.logs = []
+        return self.resolve_team_turn([p1], [p2])
+
+    def resolve_team_turn(self, team1: Sequence[Unit], team2: Sequence[Unit]):
+        """
+        Ход команда на команду. Цель слота - (target_unit, target_slot) в команде противника.
+        Действия идут из кучи по скорости; равные значения разводятся по (сторона, юнит, слот).
+        """
+        self.logs = make_log(self.log_level)
         battle_report = []
+        teams = (list(team1), list(team2))
 
         # 1. Start
-        self._trigger_unit_event("on_combat_start", p1, self.log)
-        self._trigger_unit_event("on_combat_start", p2, self.log)
+        for unit in teams[0] + teams[1]:
+            self._trigger_unit_event("on_combat_start", unit, self.log)
         if self.logs:
-            battle_report.append({"round": "Start", "rolls": "Events", "details": " | ".join(self.logs)})
-            self.logs = []
-
-        # 2. Redirects
-        ClashSystem.calculate_redirections(p1, p2)
-        ClashSystem.calculate_redirections(p2, p1)
-
-        # 3. Actions
-        actions = []
+            battle_report.append({"round": "Start", "rolls": "Events", "details": self.logs.render(" | ")})
+            self.logs = make_log(self.log_level)
 
-        def add_actions(unit, opponent, is_p1_flag):
-            for i, slot in enumerate(unit.active_slots):
-                if slot.get('card'):
-                    score = slot['speed'] + random.random()
-                    actions.append({
-                        'unit': unit, 'opponent': opponent,
-                        'slot_idx': i, 'slot_data': slot,
-                        'is_p1': is_p1_flag, 'score': score, 'speed': slot['speed']
-                    })
+        # 2. Redirects (первая команда перехватывает первой, вторая видит уже перенаправленные цели)
+        ClashSystem.calculate_team_redirections(teams[0], teams[1])
+        ClashSystem.calculate_team_redirections(teams[1], teams[0])
 
-        add_actions(p1, p2, True)
-        add_actions(p2, p1, False)
+        # 3. Actions: (-скорость с шумом, сторона, юнит, слот)
+        queue = []
+        for side, team in enumerate(teams):
+            for u, unit in enumerate(team):
+                for i, slot in enumerate(unit.active_slots):
+                    if slot.get('card'):
+                        queue.append((-(slot['speed'] + self.rng.random()), side, u, i))
+        heapq.heapify(queue)
 
-        # Сортировка по скорости (Desc)
-        actions.sort(key=lambda x: x['score'], reverse=True)
-
-        executed_p1 = set()
-        executed_p2 = set()
+        executed = set()
 
         # 4. Loop
-        for act in actions:
-            u = act['unit']
-            opp = act['opponent']
-            idx = act['slot_idx']
-            is_p1 = act['is_p1']
-
-            if is_p1:
-                if idx in executed_p1: continue
-            else:
-                if idx in executed_p2: continue
+        while queue:
+            _, side, u, i = heapq.heappop(queue)
+            if (side, u, i) in executed: continue
 
+            unit = teams[side][u]
             # Если юнит выбыл, он не начинает атаку
-            if u.is_dead() or u.is_staggered(): continue
+            if unit.is_dead() or unit.is_staggered(): continue
 
-            target_idx = act['slot_data'].get('target_slot', -1)
-            if target_idx == -1 or target_idx >= len(opp.active_slots):
-                continue
+            slot = unit.active_slots[i]
+            ref = target_ref(slot, teams[1 - side])
+            if ref is None: continue
 
-            target_slot = opp.active_slots[target_idx]
+            v, j = ref
+            opp = teams[1 - side][v]
+            target_slot = opp.active_slots[j]
+            is_p1 = side == 0
 
             # Проверка Clash:
             # 1. Оппонент свободен
             # 2. Оппонент целится в нас
-            opp_ready = False
-            if is_p1:
-                if target_idx not in executed_p2: opp_ready = True
-            else:
-                if target_idx not in executed_p1: opp_ready = True
+            is_clash = (1 - side, v, j) not in executed and target_ref(target_slot, teams[side]) == (u, i)
 
-            is_clash = (target_slot.get('target_slot') == idx) and opp_ready
-
-            u.current_card = act['slot_data']['card']
+            unit.current_card = slot['card']
+            executed.add((side, u, i))
 
             if is_clash:
                 # CLASH
-                if is_p1:
-                    executed_p1.add(idx);
-                    executed_p2.add(target_idx)
-                else:
-                    executed_p2.add(idx);
-                    executed_p1.add(target_idx)
-
+                executed.add((1 - side, v, j))
                 opp.current_card = target_slot['card']
 
                 if opp.is_staggered():
                     # Враг в стаггере -> One Sided
-                    logs = self._resolve_one_sided(u, opp, f"Hit (Stagger)")
+                    logs = self._resolve_one_sided(unit, opp, f"Hit (Stagger)")
                 else:
-                    p1_idx = idx if is_p1 else target_idx
-                    p2_idx = target_idx if is_p1 else idx
-                    self.log(f"⚔️ Clash: P1[{p1_idx + 1}] vs P2[{p2_idx + 1}]")
-
-                    logs = self._resolve_card_clash(u, opp, f"Clash", is_p1_attacker=is_p1)
-
-                battle_report.extend(logs)
+                    if self.log_level:
+                        mine = self._slot_label(teams, side, u, i)
+                        theirs = self._slot_label(teams, 1 - side, v, j)
+                        self.log(f"⚔️ Clash: {mine} vs {theirs}" if is_p1 else f"⚔️ Clash: {theirs} vs {mine}")
 
+                    logs = self._resolve_card_clash(unit, opp, f"Clash", is_p1_attacker=is_p1)
             else:
                 # ONE-SIDED
-                if is_p1:
-                    executed_p1.add(idx)
-                else:
-                    executed_p2.add(idx)
+                label = f"{self._slot_label(teams, side, u, i)}🏹Hit" if self.log_level else ""
+                logs = self._resolve_one_sided(unit, opp, label)
 
-                p_label = "P1" if is_p1 else "P2"
-                logs = self._resolve_one_sided(u, opp, f"{p_label}[{idx + 1}]🏹Hit")
-                battle_report.extend(logs)
+            battle_report.extend(logs)
 
         # 5. End
-        self.logs = []
-        self._trigger_unit_event("on_combat_end", p1, self.log)
-        self._trigger_unit_event("on_combat_end", p2, self.log)
+        self.logs = make_log(self.log_level)
+        for unit in teams[0] + teams[1]:
+            self._trigger_unit_event("on_combat_end", unit, self.log)
         if self.logs:
-            battle_report.append({"round": "End", "rolls": "Events", "details": " | ".join(self.logs)})
+            battle_report.append({"round": "End", "rolls": "Events", "details": self.logs.render(" | ")})
 
-        return battle_report
\ No newline at end of file
+        return battle_report
@@ -1,5 +1,6 @@
 from core.models import DiceType
 from logic.clash_mechanics import ClashMechanicsMixin
+from logic.combat_log import CombatLog, LOG_NONE, DODGE
 
 
 class ClashFlowMixin(ClashMechanicsMixin):
@@ -12,6 +13,7 @@ class ClashFlowMixin(ClashMechanicsMixin):
 
     def _resolve_card_clash(self, attacker, defender, round_label: str, is_p1_attacker: bool):
         report = []
+        logging = self.log_level != LOG_NONE
         ac = attacker.current_card
         dc = defender.current_card
 
@@ -41,23 +43,19 @@ class ClashFlowMixin(ClashMechanicsMixin):
             val_a = ctx_a.final_value if ctx_a else 0
             val_d = ctx_d.final_value if ctx_d else 0
 
-            # Форматируем лог (P1 всегда слева)
-            val_p1 = val_a if is_p1_attacker else val_d
-            val_p2 = val_d if is_p1_attacker else val_a
-            res_str = f"{val_p1} vs {val_p2}"
-
             detail = ""
+            winner = None
 
             if ctx_a and ctx_d:
                 # --- ПОЛНОЦЕННЫЙ КЛЕШ ---
                 if val_a > val_d:
-                    detail = f"{attacker.name} Win!"
+                    winner = attacker
                     self._handle_clash_win(ctx_a)
                     self._handle_clash_lose(ctx_d)
                     self._resolve_clash_interaction(ctx_a, ctx_d, val_a - val_d)
 
                 elif val_d > val_a:
-                    detail = f"{defender.name} Win!"
+                    winner = defender
                     self._handle_clash_win(ctx_d)
                     self._handle_clash_lose(ctx_a)
                     self._resolve_clash_interaction(ctx_d, ctx_a, val_d - val_a)
@@ -83,12 +81,19 @@ class ClashFlowMixin(ClashMechanicsMixin):
                 else:
                     detail = "Defensive (Skipped)"
 
-            round_logs = []
+            if not logging: continue
+
+            # Форматируем лог (P1 всегда слева)
+            val_p1 = val_a if is_p1_attacker else val_d
+            val_p2 = val_d if is_p1_attacker else val_a
+            if winner: detail = f"{winner.name} Win!"
+
+            round_logs = CombatLog()
             if ctx_a: round_logs.extend(ctx_a.log)
             if ctx_d: round_logs.extend(ctx_d.log)
-            if round_logs: detail += " | " + " ".join(round_logs)
+            if round_logs: detail += " | " + round_logs.render()
 
-            report.append({"round": f"{round_label} (D{j + 1})", "rolls": res_str, "details": detail})
+            report.append({"round": f"{round_label} (D{j + 1})", "rolls": f"{val_p1} vs {val_p2}", "details": detail})
         return report
 
     def _resolve_clash_interaction(self, winner_ctx, loser_ctx, diff: int):
@@ -134,7 +139,7 @@ class ClashFlowMixin(ClashMechanicsMixin):
 
         # 3. УКЛОНЕНИЕ ПОБЕДИЛО
         elif w_is_evd:
-            winner_ctx.log.append("💨 Dodged!")
+            winner_ctx.log.add(DODGE)
 
     def _resolve_one_sided(self, source, target, round_label: str):
         report = []
@@ -155,7 +160,8 @@ class ClashFlowMixin(ClashMechanicsMixin):
             else:
                 detail = "Defensive Die (Skipped)"
 
-            if ctx.log: detail += " | " + " ".join(ctx.log)
+            if self.log_level == LOG_NONE: continue
+            if ctx.log: detail += " | " + ctx.log.render()
             report.append({"round": f"{round_label} (D{j + 1})", "rolls": f"{val}", "details": detail})
 
         return report
\ No newline at end of file
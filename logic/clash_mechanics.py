@@ -1,11 +1,9 @@
 # logic/clash_mechanics.py
-import random
 from core.models import Dice, DiceType
 from logic.context import RollContext
-from logic.status_definitions import STATUS_REGISTRY
-from logic.card_scripts import SCRIPTS_REGISTRY
-from logic.passives import PASSIVE_REGISTRY
-from logic.talents import TALENT_REGISTRY
+from logic.hooks import get_hooks
+from core.events import ON_ROLL, ON_CLASH_WIN, ON_CLASH_LOSE, ON_HIT
+from logic.combat_log import make_log, HIT, STAGGER, BARRIER
 
 
 class ClashMechanicsMixin:
@@ -14,26 +12,23 @@ class ClashMechanicsMixin:
     """
 
     def _process_card_scripts(self, trigger: str, ctx: RollContext):
-        die = ctx.dice
-        if not die.scripts or trigger not in die.scripts: return
-        for script_data in die.scripts[trigger]:
-            script_id = script_data.get("script_id")
-            params = script_data.get("params", {})
-            if script_id in SCRIPTS_REGISTRY: SCRIPTS_REGISTRY[script_id](ctx, params)
+        # Скрипты уже скомпилированы при загрузке кубика (logic.card_scripts.compile_scripts)
+        for script in getattr(ctx.dice.compiled, trigger):
+            script(ctx)
 
     def _process_card_self_scripts(self, trigger: str, source, target):
         card = source.current_card
-        if not card or not card.scripts or trigger not in card.scripts: return
-        ctx = RollContext(source=source, target=target, dice=None, final_value=0, log=self.logs)
-        for script_data in card.scripts[trigger]:
-            script_id = script_data.get("script_id")
-            params = script_data.get("params", {})
-            if script_id in SCRIPTS_REGISTRY: SCRIPTS_REGISTRY[script_id](ctx, params)
+        if not card: return
+        scripts = getattr(card.compiled, trigger)
+        if not scripts: return
+        ctx = RollContext(source=source, target=target, dice=None, final_value=0, log=self.logs, rng=self.rng)
+        for script in scripts:
+            script(ctx)
 
     def _create_roll_context(self, source, target, die: Dice) -> RollContext:
         if not die: return None
-        roll = random.randint(die.min_val, die.max_val)
-        ctx = RollContext(source=source, target=target, dice=die, final_value=roll)
+        roll = self.rng.randint(die.min_val, die.max_val)
+        ctx = RollContext(source=source, target=target, dice=die, final_value=roll, log=make_log(self.log_level), rng=self.rng)
 
         # Stat bonuses
         if die.dtype in [DiceType.SLASH, DiceType.PIERCE, DiceType.BLUNT]:
@@ -44,59 +39,36 @@ class ClashMechanicsMixin:
         elif die.dtype == DiceType.EVADE:
             ctx.modify_power(source.modifiers.get("power_evade", 0), "Stats")
 
-        # Statuses
-        for status_id, stack in list(source.statuses.items()):
-            if status_id in STATUS_REGISTRY: STATUS_REGISTRY[status_id].on_roll(ctx, stack)
-
-        # Passives
-        for pid in source.passives:
-            if pid in PASSIVE_REGISTRY: PASSIVE_REGISTRY[pid].on_roll(ctx)
-
-        # Talents (NEW)
-        for pid in source.talents:
-            if pid in TALENT_REGISTRY: TALENT_REGISTRY[pid].on_roll(ctx)
+        # Statuses, Passives, Talents
+        self._dispatch(ON_ROLL, source, ctx)
 
         self._process_card_scripts("on_roll", ctx)
         return ctx
 
-    def _handle_clash_win(self, ctx: RollContext):
-        for status_id, stack in list(ctx.source.statuses.items()):
-            if status_id in STATUS_REGISTRY: STATUS_REGISTRY[status_id].on_clash_win(ctx, stack)
-
-        for pid in ctx.source.passives:
-            if pid in PASSIVE_REGISTRY: PASSIVE_REGISTRY[pid].on_clash_win(ctx)
-        for pid in ctx.source.talents:
-            if pid in TALENT_REGISTRY: TALENT_REGISTRY[pid].on_clash_win(ctx)
+    def _dispatch(self, hook: str, unit, ctx: RollContext):
+        """Хук по таблице юнита: статусы (с текущим стаком), затем пассивки и таланты, затем шина событий."""
+        hooks = get_hooks(unit)
+        for status_id, handler in hooks.status(hook):
+            stack = unit.get_status(status_id)
+            if stack: handler(ctx, stack)
+        for handler in hooks.ability(hook):
+            handler(ctx)
+        if self.events is not None: self.events.emit(hook, ctx)
 
+    def _handle_clash_win(self, ctx: RollContext):
+        self._dispatch(ON_CLASH_WIN, ctx.source, ctx)
         self._process_card_scripts("on_clash_win", ctx)
 
     def _handle_clash_lose(self, ctx: RollContext):
-        for status_id, stack in list(ctx.source.statuses.items()):
-            if status_id in STATUS_REGISTRY: STATUS_REGISTRY[status_id].on_clash_lose(ctx, stack)
-
-        for pid in ctx.source.passives:
-            if pid in PASSIVE_REGISTRY: PASSIVE_REGISTRY[pid].on_clash_lose(ctx)
-        for pid in ctx.source.talents:
-            if pid in TALENT_REGISTRY: TALENT_REGISTRY[pid].on_clash_lose(ctx)
+        self._dispatch(ON_CLASH_LOSE, ctx.source, ctx)
 
     def _trigger_unit_event(self, event_name, unit, *args):
-        # Statuses
-        for status_id, stack in list(unit.statuses.items()):
-            if status_id in STATUS_REGISTRY:
-                handler = getattr(STATUS_REGISTRY[status_id], event_name, None)
-                if handler: handler(unit, *args)
-
-        # Passives
-        for pid in unit.passives:
-            if pid in PASSIVE_REGISTRY:
-                handler = getattr(PASSIVE_REGISTRY[pid], event_name, None)
-                if handler: handler(unit, *args)
-
-        # Talents (NEW)
-        for pid in unit.talents:
-            if pid in TALENT_REGISTRY:
-                handler = getattr(TALENT_REGISTRY[pid], event_name, None)
-                if handler: handler(unit, *args)
+        hooks = get_hooks(unit)
+        for status_id, handler in hooks.status(event_name):
+            if unit.get_status(status_id): handler(unit, *args)
+        for handler in hooks.ability(event_name):
+            handler(unit, *args)
+        if self.events is not None: self.events.emit(event_name, unit)
 
     # === DAMAGE CALCULATIONS ===
 
@@ -120,14 +92,10 @@ class ClashMechanicsMixin:
                 absorbed = min(barrier, final_dmg)
                 target.remove_status("barrier", absorbed)
                 final_dmg -= absorbed
-                source_ctx.log.append(f"🛡️ Barrier -{absorbed}")
+                source_ctx.log.add(BARRIER, absorbed)
 
             target.current_hp -= final_dmg
-
-            hit_msg = f"💥 Hit {final_dmg} HP"
-            if is_stag_hit:
-                hit_msg += " (Stagger x2!)"
-            source_ctx.log.append(hit_msg)
+            source_ctx.log.add(HIT, final_dmg, is_stag_hit)
 
         elif dmg_type == "stagger":
             dtype_name = source_ctx.dice.dtype.value.lower()
@@ -135,7 +103,7 @@ class ClashMechanicsMixin:
             final_dmg = int(amount * res)
 
             target.current_stagger -= final_dmg
-            source_ctx.log.append(f"😵 Stagger Dmg {final_dmg}")
+            source_ctx.log.add(STAGGER, final_dmg)
 
     def _apply_damage(self, attacker_ctx: RollContext, defender_ctx: RollContext, dmg_type: str = "hp"):
         """Стандартный расчет урона от атаки."""
@@ -143,13 +111,7 @@ class ClashMechanicsMixin:
         defender = attacker_ctx.target or attacker_ctx.target
 
         # On Hit Events
-        for status_id, stack in list(attacker.statuses.items()):
-            if status_id in STATUS_REGISTRY: STATUS_REGISTRY[status_id].on_hit(attacker_ctx, stack)
-
-        for pid in attacker.passives:
-            if pid in PASSIVE_REGISTRY: PASSIVE_REGISTRY[pid].on_hit(attacker_ctx)
-        for pid in attacker.talents:
-            if pid in TALENT_REGISTRY: TALENT_REGISTRY[pid].on_hit(attacker_ctx)
+        self._dispatch(ON_HIT, attacker, attacker_ctx)
 
         self._process_card_scripts("on_hit", attacker_ctx)
 
@@ -0,0 +1,235 @@
+# logic/clash_odds.py
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union
+
+from core.models import Unit, Card, Dice, DiceType
+
+ATTACK_TYPES = (DiceType.SLASH, DiceType.PIERCE, DiceType.BLUNT)
+
+
+@dataclass
+class DieOdds:
+    """
+    Точный исход одной пары кубиков с точки зрения стороны A.
+    *_dealt - ожидаемый урон, который A наносит B; *_taken - который A получает.
+    """
+    p_win: float = 0.0
+    p_draw: float = 0.0
+    p_lose: float = 0.0
+    hp_dealt: float = 0.0
+    stagger_dealt: float = 0.0
+    hp_taken: float = 0.0
+    stagger_taken: float = 0.0
+
+
+@dataclass
+class DamageOdds:
+    """
+    Суммарный ожидаемый урон за карту (те же поля урона, что у DieOdds).
+    Вероятностей исхода здесь нет: у карты они свои на каждом кубике (CardOdds.dice).
+    """
+    hp_dealt: float = 0.0
+    stagger_dealt: float = 0.0
+    hp_taken: float = 0.0
+    stagger_taken: float = 0.0
+
+    def add(self, other: Union[DieOdds, 'DamageOdds']):
+        self.hp_dealt += other.hp_dealt
+        self.stagger_dealt += other.stagger_dealt
+        self.hp_taken += other.hp_taken
+        self.stagger_taken += other.stagger_taken
+
+
+@dataclass
+class CardOdds:
+    dice: List[DieOdds] = field(default_factory=list)
+    total: DamageOdds = field(default_factory=DamageOdds)
+
+
+@dataclass
+class RollState:
+    """Статусы, которые меняют бросок и расходуются по ходу карты."""
+    strength: int = 0
+    paralysis: int = 0
+    bleed: int = 0
+
+    @classmethod
+    def from_unit(cls, unit: Unit):
+        return cls(unit.get_status("strength"), unit.get_status("paralysis"), unit.get_status("bleed"))
+
+
+class ClashOdds:
+    """
+    Аналитический расчет клешей без сэмплирования.
+    Бросок = randint(min, max) + плоские модификаторы (статы, Сила, Паралич),
+    поэтому распределение - равномерное со сдвигом, а разность двух бросков
+    считается прямой сверткой.
+
+    Не учитываются: скрипты карт/кубиков, пассивки/таланты, криты Самообладания,
+    Барьер и смена стаггера посреди карты.
+    """
+
+    # === РАСПРЕДЕЛЕНИЕ ОДНОГО БРОСКА ===
+    @staticmethod
+    def roll_range(unit: Unit, die: Dice, state: RollState) -> Tuple[int, int, int]:
+        """
+        Возвращает (lo, hi, self_damage) и продвигает state так же,
+        как это делают on_roll статусов в _create_roll_context.
+        """
+        mods = unit.modifiers
+        shift = 0
+        self_dmg = 0
+
+        if die.dtype in ATTACK_TYPES:
+            shift += mods.get("power_attack", 0) + mods.get("power_medium", 0)
+            shift += state.strength
+            if state.bleed > 0:
+                self_dmg = state.bleed
+                state.bleed -= state.bleed // 2
+        elif die.dtype == DiceType.BLOCK:
+            shift += mods.get("power_block", 0)
+        elif die.dtype == DiceType.EVADE:
+            shift += mods.get("power_evade", 0)
+
+        if state.paralysis > 0:
+            shift -= 3
+            state.paralysis -= 1
+
+        return die.min_val + shift, die.max_val + shift, self_dmg
+
+    @staticmethod
+    def damage_bonus(attacker: Unit, defender: Unit) -> int:
+        """Плоская добавка к урону атаки (как в _apply_damage)."""
+        bonus = attacker.get_status("dmg_up") - attacker.get_status("dmg_down")
+        bonus += attacker.modifiers.get("damage_deal", 0)
+        bonus += defender.get_status("fragile") + defender.get_status("vulnerability") - defender.get_status(
+            "protection")
+        bonus -= defender.modifiers.get("damage_take", 0)
+        return bonus
+
+    @staticmethod
+    def _diff_pmf(a_lo: int, a_hi: int, b_lo: int, b_hi: int) -> List[Tuple[int, float]]:
+        """PMF разности A - B двух равномерных целых."""
+        total = (a_hi - a_lo + 1) * (b_hi - b_lo + 1)
+        pmf = []
+        for d in range(a_lo - b_hi, a_hi - b_lo + 1):
+            count = min(a_hi, b_hi + d) - max(a_lo, b_lo + d) + 1
+            if count > 0:
+                pmf.append((d, count / total))
+        return pmf
+
+    # === УРОН ПОБЕДИТЕЛЯ ===
+    @staticmethod
+    def _hit_damage(w_lo: int, w_hi: int, l_lo: int, l_hi: int, bonus: int,
+                    hp_res: float, stg_res: float, win_only: bool) -> Tuple[float, float]:
+        """
+        E[урон по HP], E[урон по выдержке] от полного попадания кубика атаки.
+        win_only=True - учитываются только исходы, где W > L (клеш),
+        иначе кубик безответный и попадает всегда.
+        """
+        n_w = w_hi - w_lo + 1
+        n_l = l_hi - l_lo + 1 if win_only else 1
+        hp = 0.0
+        stg = 0.0
+        for w in range(w_lo, w_hi + 1):
+            weight = max(0, min(w - l_lo, n_l)) if win_only else 1
+            if not weight: continue
+            amt = max(0, w + bonus)
+            hp += weight * int(amt * hp_res)
+            stg += weight * int(amt * stg_res)
+        norm = n_w * n_l
+        return hp / norm, stg / norm
+
+    @staticmethod
+    def _interaction(w_unit: Unit, w_die: Dice, w_range, l_unit: Unit, l_die: Dice, l_range,
+                     win_pmf: List[Tuple[int, float]]) -> Tuple[float, float]:
+        """Ожидаемый (урон по HP, урон по выдержке) проигравшему - зеркало _resolve_clash_interaction."""
+        w_type = w_die.dtype.value.lower()
+        hp_res = getattr(l_unit.hp_resists, w_type, 1.0)
+        stg_res = getattr(l_unit.stagger_resists, w_type, 1.0)
+
+        if w_die.dtype in ATTACK_TYPES:
+            if l_die.dtype == DiceType.BLOCK:
+                # Atk vs Block: урон = разница
+                return sum(p * int(d * hp_res) for d, p in win_pmf), 0.0
+            bonus = ClashOdds.damage_bonus(w_unit, l_unit)
+            return ClashOdds._hit_damage(w_range[0], w_range[1], l_range[0], l_range[1], bonus,
+                                         hp_res, stg_res, win_only=True)
+
+        if w_die.dtype == DiceType.BLOCK:
+            # Блок-победитель: урон по выдержке = разница
+            return 0.0, sum(p * int(d * stg_res) for d, p in win_pmf)
+
+        # Уклонение ничего не наносит
+        return 0.0, 0.0
+
+    # === ПАРА КУБИКОВ ===
+    @staticmethod
+    def die_vs_die(a: Unit, die_a: Optional[Dice], b: Unit, die_b: Optional[Dice],
+                   state_a: Optional[RollState] = None, state_b: Optional[RollState] = None) -> DieOdds:
+        if state_a is None: state_a = RollState.from_unit(a)
+        if state_b is None: state_b = RollState.from_unit(b)
+        res = DieOdds()
+
+        range_a = ClashOdds.roll_range(a, die_a, state_a) if die_a else None
+        range_b = ClashOdds.roll_range(b, die_b, state_b) if die_b else None
+        if range_a: res.hp_taken += range_a[2]
+        if range_b: res.hp_dealt += range_b[2]
+
+        # --- Безответный кубик ---
+        if not (range_a and range_b):
+            if range_a and die_a.dtype in ATTACK_TYPES:
+                t = die_a.dtype.value.lower()
+                hp, stg = ClashOdds._hit_damage(range_a[0], range_a[1], 0, 0, ClashOdds.damage_bonus(a, b),
+                                                getattr(b.hp_resists, t, 1.0), getattr(b.stagger_resists, t, 1.0),
+                                                win_only=False)
+                res.hp_dealt += hp
+                res.stagger_dealt += stg
+            elif range_b and die_b.dtype in ATTACK_TYPES:
+                t = die_b.dtype.value.lower()
+                hp, stg = ClashOdds._hit_damage(range_b[0], range_b[1], 0, 0, ClashOdds.damage_bonus(b, a),
+                                                getattr(a.hp_resists, t, 1.0), getattr(a.stagger_resists, t, 1.0),
+                                                win_only=False)
+                res.hp_taken += hp
+                res.stagger_taken += stg
+            return res
+
+        # --- Полноценный клеш ---
+        pmf = ClashOdds._diff_pmf(range_a[0], range_a[1], range_b[0], range_b[1])
+        a_wins = [(d, p) for d, p in pmf if d > 0]
+        b_wins = [(-d, p) for d, p in pmf if d < 0]
+        res.p_win = sum(p for _, p in a_wins)
+        res.p_lose = sum(p for _, p in b_wins)
+        res.p_draw = max(0.0, 1.0 - res.p_win - res.p_lose)
+
+        hp, stg = ClashOdds._interaction(a, die_a, range_a, b, die_b, range_b, a_wins)
+        res.hp_dealt += hp
+        res.stagger_dealt += stg
+
+        hp, stg = ClashOdds._interaction(b, die_b, range_b, a, die_a, range_a, b_wins)
+        res.hp_taken += hp
+        res.stagger_taken += stg
+        return res
+
+    # === КАРТЫ ===
+    @staticmethod
+    def card_vs_card(a: Unit, card_a: Card, b: Unit, card_b: Card) -> CardOdds:
+        """Клеш карта на карту: кубики идут парами по индексу, статусы расходуются по цепочке."""
+        state_a = RollState.from_unit(a)
+        state_b = RollState.from_unit(b)
+        out = CardOdds()
+
+        dice_a = card_a.dice_list if card_a else []
+        dice_b = card_b.dice_list if card_b else []
+        for j in range(max(len(dice_a), len(dice_b))):
+            die_a = dice_a[j] if j < len(dice_a) else None
+            die_b = dice_b[j] if j < len(dice_b) else None
+            odds = ClashOdds.die_vs_die(a, die_a, b, die_b, state_a, state_b)
+            out.dice.append(odds)
+            out.total.add(odds)
+        return out
+
+    @staticmethod
+    def one_sided(a: Unit, card_a: Card, b: Unit) -> CardOdds:
+        """Односторонняя атака: работают только атакующие кубики."""
+        return ClashOdds.card_vs_card(a, card_a, b, None)
@@ -0,0 +1,90 @@
+# logic/combat_log.py
+"""
+Структурированный лог боя.
+Записи хранятся как короткие кортежи (код, аргументы...) и превращаются в текст
+только в render(). Старый стиль log.append("строка") тоже поддерживается.
+"""
+
+# === УРОВНИ ЛОГА ===
+LOG_NONE = 0  # Пакетные прогоны: ничего не пишем, отчет не собираем
+LOG_FULL = 1  # UI: полный отчет с текстом
+
+# === КОДЫ ЗАПИСЕЙ ===
+POWER = 1         # (reason, amount)
+HIT = 2           # (damage, is_stagger_hit)
+STAGGER = 3       # (damage,)
+BARRIER = 4       # (absorbed,)
+STATUS = 5        # (status, stack, duration, delay, target_name)
+HEAL = 6          # (amount, unit_name)
+BLEED = 7         # (unit_name, damage)
+CRIT = 8          # (chance,)
+SELF_CONTROL = 9  # (source_name,)
+DODGE = 10        # ()
+
+
+def _power(reason, amount):
+    sign = "+" if amount > 0 else ""
+    return f"[{reason}] {sign}{amount}"
+
+
+def _hit(damage, is_stagger_hit):
+    return f"💥 Hit {damage} HP (Stagger x2!)" if is_stagger_hit else f"💥 Hit {damage} HP"
+
+
+def _status(status, stack, duration, delay, target_name):
+    extras = []
+    if duration > 1: extras.append(f"{duration} turns")
+    if delay > 0: extras.append(f"in {delay} turns")
+    extra_str = f" ({', '.join(extras)})" if extras else ""
+    return f"🧪 {status.capitalize()} +{stack}{extra_str} to {target_name}"
+
+
+_FORMATS = {
+    POWER: _power,
+    HIT: _hit,
+    STAGGER: lambda damage: f"😵 Stagger Dmg {damage}",
+    BARRIER: lambda absorbed: f"🛡️ Barrier -{absorbed}",
+    STATUS: _status,
+    HEAL: lambda amount, name: f"💚 Healed {amount} HP ({name})",
+    BLEED: lambda name, damage: f"🩸 Bleed: {name} takes {damage} dmg",
+    CRIT: lambda chance: f"💨 CRITICAL HIT! (Chance {chance}%) x2 DMG",
+    SELF_CONTROL: lambda name: f"💨 {name}: +1 Self-Control",
+    DODGE: lambda: "💨 Dodged!",
+}
+
+
+def render_entry(entry) -> str:
+    if isinstance(entry, str): return entry
+    return _FORMATS[entry[0]](*entry[1:])
+
+
+class CombatLog(list):
+    """Список записей лога. add() кладет кортеж, текст собирается только в lines()/render()."""
+    __slots__ = ()
+
+    def add(self, code: int, *args):
+        self.append((code,) + args)
+
+    def lines(self) -> list:
+        return [render_entry(e) for e in self]
+
+    def render(self, sep: str = " ") -> str:
+        return sep.join(render_entry(e) for e in self)
+
+
+class NullLog(CombatLog):
+    """Лог, который все выбрасывает (LOG_NONE). Всегда пустой, поэтому общий на всех."""
+    __slots__ = ()
+
+    def add(self, code: int, *args): pass
+
+    def append(self, entry): pass
+
+    def extend(self, entries): pass
+
+
+NULL_LOG = NullLog()
+
+
+def make_log(level: int) -> CombatLog:
+    return CombatLog() if level != LOG_NONE else NULL_LOG
@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
-from typing import List, Optional, TYPE_CHECKING
+from typing import Any, Optional, TYPE_CHECKING
+
+from logic.combat_log import CombatLog, POWER
 
 # TYPE_CHECKING нужен, чтобы не было ошибок импорта моделей при запуске
 if TYPE_CHECKING:
@@ -15,16 +17,18 @@ class RollContext:
     target: Optional['Unit']
     dice: Optional['Dice']
     final_value: int
-    log: List[str] = field(default_factory=list)
+    log: CombatLog = field(default_factory=CombatLog)
 
     # === НОВЫЕ ПОЛЯ ДЛЯ КРИТОВ ===
     damage_multiplier: float = 1.0  # Множитель урона (по умолчанию x1.0)
     is_critical: bool = False  # Флаг, был ли крит
 
+    # Поток случайных чисел боя (None -> глобальный random)
+    rng: Any = None
+
     def modify_power(self, amount: int, reason: str):
         """Изменяет значение кубика и записывает это в лог."""
         if amount == 0:
             return
         self.final_value += amount
-        sign = "+" if amount > 0 else ""
-        self.log.append(f"[{reason}] {sign}{amount}")
\ No newline at end of file
+        self.log.add(POWER, reason, amount)
\ No newline at end of file
@@ -0,0 +1,182 @@
+# logic/deck_optimizer.py
+"""
+Подбор колоды из N карт против ростера противников.
+Полный перебор C(пул, N) колод по фиксированному числу боев не влезает в бюджет,
+поэтому бюджет раздается последовательным делением (successive halving):
+все кандидаты получают min_fights боев, лучшая 1/eta часть - в eta раз больше, и так, пока не останется одна.
+Бой номер i против противника o у всех колод идет на потоке root.child(o).child(i) -
+колоды сравниваются на общих случайных числах, и слабые отсеиваются уже по первым сотням боев.
+"""
+import copy
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from core.models import Card, Unit
+from core.rng import RngStream
+from logic.battle import CardPolicy, RandomCardPolicy
+from logic.simulation import (Estimate, FightRow, MatchupStats, _resolve_unit, _run_chunk, fight_points, summarize,
+                              wilson_interval)
+
+Deck = Tuple[Card, ...]
+
+
+@dataclass
+class DeckScore:
+    """Накопленные бои одной колоды (против всего ростера)."""
+    deck: Deck
+    rows: List[FightRow] = field(default_factory=list, repr=False)
+    rung: int = 0  # до какой ступени деления дошла колода
+
+    @property
+    def fights(self) -> int:
+        return len(self.rows)
+
+    @property
+    def points(self) -> float:
+        return sum(map(fight_points, self.rows))
+
+    @property
+    def score(self) -> Estimate:
+        return wilson_interval(self.points, self.fights)
+
+    def stats(self) -> MatchupStats:
+        return summarize(self.rows)
+
+
+@dataclass
+class DeckSearchResult:
+    best: DeckScore
+    ranking: List[DeckScore]  # сначала дальше прошедшие, внутри ступени - по очкам
+    candidates: int
+    total_fights: int
+
+
+def candidate_decks(pool: Sequence[Card], deck_size: int, max_candidates: Optional[int] = None,
+                    rng=random) -> List[Deck]:
+    """
+    Все сочетания из пула, а если их больше max_candidates - случайная выборка без повторов.
+    Одинаковые экземпляры карт (общие объекты Library) в пуле считаются одной картой.
+    """
+    pool = list({id(c): c for c in pool}.values())
+    if not 0 < deck_size <= len(pool):
+        raise ValueError(f"deck_size должен быть от 1 до {len(pool)}")
+    total = math.comb(len(pool), deck_size)
+    if max_candidates is None or total <= max_candidates:
+        return list(itertools.combinations(pool, deck_size))
+
+    picked = set()
+    while len(picked) < max_candidates:
+        picked.add(tuple(sorted(rng.sample(range(len(pool)), deck_size))))
+    return [tuple(pool[i] for i in combo) for combo in sorted(picked)]
+
+
+def _run_deck(unit: Unit, deck: Deck, policy_factory: Callable[[Sequence[Card]], CardPolicy],
+              roster: Sequence[Unit], enemy_policy: CardPolicy, start: int, per_opponent: int,
+              max_rounds: int, root: RngStream) -> List[FightRow]:
+    """Бои [start; start + per_opponent) колоды против каждого противника."""
+    policy = policy_factory(deck)
+    rows = []
+    for o, opponent in enumerate(roster):
+        rows.extend(_run_chunk(unit, opponent, policy, enemy_policy, start, per_opponent, max_rounds, root.child(o)))
+    return rows
+
+
+def optimize_deck(unit: Union[Unit, str], pool: Sequence[Card], roster: Sequence[Union[Unit, str]],
+                  enemy_policy: CardPolicy, deck_size: int = 4,
+                  policy_factory: Callable[[Sequence[Card]], CardPolicy] = RandomCardPolicy,
+                  min_fights: int = 200, eta: int = 3, max_candidates: Optional[int] = 729,
+                  final_fights: Optional[int] = None, max_rounds: int = 100, workers: Optional[int] = None,
+                  seed: Optional[int] = None) -> DeckSearchResult:
+    """
+    Лучшая колода из deck_size карт пула для unit против ростера (очки: победа 1, ничья 0.5).
+    На ступени k каждая оставшаяся колода добирает боев до min_fights * eta^k (поровну на противника),
+    затем остается лучшая 1/eta часть. Как только осталась одна колода, поиск останавливается:
+    ее бои уже ничего не выбирают. final_fights - добрать победителю боев до этого числа
+    для более точной итоговой оценки (по умолчанию не добирается).
+    workers > 1 - колоды ступени считаются параллельно на ProcessPoolExecutor (None - по числу CPU).
+    Одинаковый seed дает одинаковый результат при любом числе воркеров.
+    """
+    if eta < 2: raise ValueError("eta должен быть >= 2")
+    unit = _resolve_unit(unit)
+    roster = [_resolve_unit(u) for u in roster]
+    if not roster: raise ValueError("Пустой ростер противников")
+
+    root = RngStream(seed)
+    decks = candidate_decks(pool, deck_size, max_candidates, random.Random(root.getrandbits(64)))
+    scores = [DeckScore(deck) for deck in decks]
+    # Бои идут на копиях: _run_chunk сбрасывает юнитов между боями
+    unit, roster = copy.deepcopy(unit), copy.deepcopy(roster)
+    workers = workers or os.cpu_count() or 1
+    pool_ex = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(scores) > 1 else None
+    total = 0
+
+    def top_up(group: List[DeckScore], done: int, target: int):
+        # Добор боев [done; target) на каждого противника
+        nonlocal total
+        args = (policy_factory, roster, enemy_policy, done, target - done, max_rounds, root)
+        if pool_ex is None or len(group) == 1:
+            results = [_run_deck(unit, s.deck, *args) for s in group]
+        else:
+            results = list(pool_ex.map(_run_deck, itertools.repeat(unit), [s.deck for s in group],
+                                       *(itertools.repeat(a) for a in args)))
+        for s, rows in zip(group, results):
+            s.rows.extend(rows)
+            total += len(rows)
+
+    alive = scores
+    rung, done = 0, 0
+    try:
+        while len(alive) > 1:
+            target = math.ceil(min_fights * eta ** rung / len(roster))
+            top_up(alive, done, target)
+            done = target
+            for s in alive: s.rung = rung
+            # Устойчивая сортировка: при равных очках остается более ранний кандидат
+            alive = sorted(alive, key=lambda s: -s.points)[:max(1, len(alive) // eta)]
+            rung += 1
+    finally:
+        if pool_ex is not None: pool_ex.shutdown()
+
+    best = alive[0]
+    best.rung = rung
+    if not best.fights:
+        # Единственный кандидат (колода = весь пул): отбора не было, но оценка все равно нужна
+        done = math.ceil(min_fights / len(roster))
+        top_up([best], 0, done)
+    if final_fights:
+        target = math.ceil(final_fights / len(roster))
+        if target > done: top_up([best], done, target)
+
+    ranking = sorted(scores, key=lambda s: (-s.rung, -s.points / max(1, s.fights)))
+    return DeckSearchResult(best=best, ranking=ranking, candidates=len(scores), total_fights=total)
+
+
+if __name__ == "__main__":
+    import argparse
+    from core.library import Library
+
+    parser = argparse.ArgumentParser(description="Deck optimizer (successive halving)")
+    parser.add_argument("unit")
+    parser.add_argument("roster", nargs="+")
+    parser.add_argument("-k", "--deck-size", type=int, default=4)
+    parser.add_argument("-n", "--min-fights", type=int, default=200)
+    parser.add_argument("-c", "--max-candidates", type=int, default=729)
+    parser.add_argument("-f", "--final-fights", type=int, default=None)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-s", "--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    Library.load_all()
+    cards = Library.get_all_cards()
+    result = optimize_deck(args.unit, cards, args.roster, RandomCardPolicy(cards), deck_size=args.deck_size,
+                           min_fights=args.min_fights, max_candidates=args.max_candidates,
+                           final_fights=args.final_fights, workers=args.workers, seed=args.seed)
+
+    print(f"Candidates: {result.candidates}, fights: {result.total_fights}")
+    for s in result.ranking[:10]:
+        print(f"{s.score} ({s.fights} fights): {', '.join(c.name for c in s.deck)}")
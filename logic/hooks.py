@@ -0,0 +1,70 @@
+# logic/hooks.py
+from typing import Callable, Dict, Tuple, TYPE_CHECKING
+
+from logic.passives import BasePassive, PASSIVE_REGISTRY
+from logic.status_definitions import StatusEffect, STATUS_REGISTRY
+from logic.talents import TALENT_REGISTRY
+
+if TYPE_CHECKING:
+    from core.unit import Unit
+
+
+def _overrides(obj, base: type, hook: str) -> bool:
+    """Есть ли у обработчика настоящая реализация хука (а не заглушка из базового класса)."""
+    impl = getattr(type(obj), hook, None)
+    if impl is None: return False
+    if not isinstance(obj, base): return True
+    return impl is not getattr(base, hook, None)
+
+
+class UnitHooks:
+    """
+    Скомпилированная таблица хуков юнита: имя хука -> только те обработчики,
+    которые его реально переопределяют.
+    - status(hook): кортеж (status_id, bound_method) - вызывать со стаком статуса
+    - ability(hook): кортеж bound_method пассивок и талантов (в таком порядке)
+    Таблицы по именам строятся лениво и живут, пока не поменялся состав.
+    """
+
+    __slots__ = ("key", "_status_ids", "_ability_objs", "_status", "_ability")
+
+    def __init__(self, key, status_ids: Tuple[str, ...], ability_objs: Tuple[object, ...]):
+        self.key = key
+        self._status_ids = status_ids
+        self._ability_objs = ability_objs
+        self._status: Dict[str, Tuple[Tuple[str, Callable], ...]] = {}
+        self._ability: Dict[str, Tuple[Callable, ...]] = {}
+
+    def status(self, hook: str) -> Tuple[Tuple[str, Callable], ...]:
+        table = self._status.get(hook)
+        if table is None:
+            table = tuple((sid, getattr(STATUS_REGISTRY[sid], hook)) for sid in self._status_ids
+                          if _overrides(STATUS_REGISTRY[sid], StatusEffect, hook))
+            self._status[hook] = table
+        return table
+
+    def ability(self, hook: str) -> Tuple[Callable, ...]:
+        table = self._ability.get(hook)
+        if table is None:
+            table = tuple(getattr(obj, hook) for obj in self._ability_objs if _overrides(obj, BasePassive, hook))
+            self._ability[hook] = table
+        return table
+
+
+def get_hooks(unit: 'Unit') -> UnitHooks:
+    """Таблица хуков юнита; пересобирается только при смене пассивок, талантов или состава статусов."""
+    store = unit._status_effects
+    hooks = unit.__dict__.get("_hooks")
+    if hooks is not None:
+        key = hooks.key
+        if key[0] == store.version and key[1] == unit.passives and key[2] == unit.talents:
+            return hooks
+
+    key = (store.version, list(unit.passives), list(unit.talents))
+    status_ids = tuple(sid for sid in store.keys() if sid in STATUS_REGISTRY)
+    abilities = tuple(PASSIVE_REGISTRY[pid] for pid in unit.passives if pid in PASSIVE_REGISTRY)
+    abilities += tuple(TALENT_REGISTRY[pid] for pid in unit.talents if pid in TALENT_REGISTRY)
+
+    hooks = UnitHooks(key, status_ids, abilities)
+    unit.__dict__["_hooks"] = hooks
+    return hooks
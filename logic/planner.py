@@ -0,0 +1,302 @@
+# logic/planner.py
+"""
+ИИ для выбора карт, целей и Aggro на один ход (например, за P2 в симуляторе).
+
+1. Аналитика: ClashOdds дает ожидаемый урон каждой пары "моя карта - слот врага"
+   с усреднением по картам, которые враг может поставить (expectimax по узлу случайности).
+   Покоординатный подъем по слотам собирает лучшие совместные планы.
+2. Проверка движком: лучшие планы проигрываются настоящим ClashSystem на снимках состояния
+   (Unit.snapshot/restore) с общими случайными числами, пока не кончится бюджет времени.
+"""
+import math
+import random
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from core.models import Card, Unit
+from core.rng import RngStream
+from core.zobrist import combine
+from logic.battle import CardPolicy
+from logic.clash import ClashSystem
+from logic.clash_odds import ClashOdds, DamageOdds
+from logic.combat_log import LOG_NONE
+from logic.transposition import TranspositionTable
+
+# Вес урона по выдержке относительно урона по HP (в долях от остатка)
+STAGGER_WEIGHT = 0.5
+
+
+class SlotPlan(NamedTuple):
+    card: Card
+    target_slot: int
+    is_aggro: bool
+
+
+Plan = Tuple[Optional[SlotPlan], ...]
+
+
+def plan_key(plan: Plan) -> tuple:
+    # Card - dataclass с eq, не хешируется: план различаем по экземплярам карт
+    return tuple(c and (id(c.card), c.target_slot, c.is_aggro) for c in plan)
+
+
+def apply_plan(unit: Unit, plan: Plan):
+    """Записывает план в слоты юнита (карта, цель, Aggro). None - слот не трогаем."""
+    for slot, choice in zip(unit.active_slots, plan):
+        if choice is None: continue
+        slot.update(card=choice.card, target_slot=choice.target_slot, target_unit=0, is_aggro=choice.is_aggro)
+
+
+def odds_value(odds: DamageOdds, me: Unit, enemy: Unit) -> float:
+    """Ожидаемый размен урона в долях от текущих HP/выдержки (плюс - в нашу пользу)."""
+    return (odds.hp_dealt / max(1, enemy.current_hp) - odds.hp_taken / max(1, me.current_hp)
+            + STAGGER_WEIGHT * (odds.stagger_dealt / max(1, enemy.current_stagger)
+                                - odds.stagger_taken / max(1, me.current_stagger)))
+
+
+def state_value(me: Unit, enemy: Unit, start: Tuple[int, int, int, int]) -> float:
+    """Итог хода для проверки движком: потерянные доли HP/выдержки и бонус за убийство."""
+    me_hp, me_stg, en_hp, en_stg = start
+    value = ((en_hp - enemy.current_hp) / max(1, enemy.max_hp) - (me_hp - me.current_hp) / max(1, me.max_hp)
+             + STAGGER_WEIGHT * ((en_stg - enemy.current_stagger) / max(1, enemy.max_stagger)
+                                 - (me_stg - me.current_stagger) / max(1, me.max_stagger)))
+    if enemy.is_dead(): value += 1.0
+    if me.is_dead(): value -= 1.0
+    return value
+
+
+class LookaheadPolicy(CardPolicy):
+    """
+    Политика с перебором: ставит карту, цель и Aggro на каждый слот.
+    Карты противника, которые еще не выставлены, считаются равновероятными из enemy_deck.
+    Планирует за вторую сторону (порядок перехвата как в resolve_turn(enemy, unit)).
+    """
+
+    def __init__(self, deck: Sequence[Card], enemy_deck: Optional[Sequence[Card]] = None,
+                 budget_ms: float = 200, top_k: int = 6, max_rollouts: Optional[int] = None):
+        # Одинаковые карты (общие экземпляры Library) перебираем один раз
+        self.deck = list({id(c): c for c in deck}.values())
+        self.enemy_deck = list({id(c): c for c in (enemy_deck or deck)}.values())
+        self.budget_ms = budget_ms
+        self.top_k = top_k
+        # Предел прогонов на план - для воспроизводимости (иначе только бюджет времени)
+        self.max_rollouts = max_rollouts
+        # Готовые планы по позиции (choose_card для каждого слота, повторный рендер UI)
+        self.table = TranspositionTable(capacity=1024)
+
+    # === ИНТЕРФЕЙС CardPolicy ===
+    def choose_card(self, unit: Unit, opponent: Unit, slot_idx: int, rng=random) -> Optional[Card]:
+        plan = self.plan(unit, opponent, rng)
+        return plan[slot_idx].card if slot_idx < len(plan) and plan[slot_idx] else None
+
+    def assign_cards(self, unit: Unit, opponent: Unit, rng=random):
+        # Сначала план: проверка движком откатывает юнита и заменяет словари слотов
+        apply_plan(unit, self.plan(unit, opponent, rng))
+
+    # === ПЛАН ===
+    def plan(self, unit: Unit, opponent: Unit, rng=random) -> Plan:
+        key = combine(unit.state_hash(), opponent.state_hash())
+        entry = self.table.get(key)
+        if entry is not None: return entry.best
+
+        deadline = time.perf_counter() + self.budget_ms / 1000.0
+        options = self._slot_options(unit, opponent)
+        if not any(options):
+            plan = tuple(None for _ in unit.active_slots)
+        else:
+            # Полбюджета на аналитику, остальное - на проверку движком
+            candidates = self._analytic_search(unit, opponent, options,
+                                               time.perf_counter() + self.budget_ms / 2000.0)
+            plan = candidates[0] if len(candidates) == 1 else \
+                self._rollout_search(unit, opponent, candidates, deadline, RngStream(rng.getrandbits(64)))
+        # Пустой слот с целью из roll_phase сыграл бы карту, которую ИИ не выбирал
+        assert all(choice is not None for choice, opts in zip(plan, options) if opts), "неполный план"
+
+        self.table.store(key, 0, 0.0, best=plan)
+        return plan
+
+    def _slot_options(self, unit: Unit, opponent: Unit) -> List[List[SlotPlan]]:
+        targets = [j for j, s in enumerate(opponent.active_slots) if not s.get('stunned')]
+        targets = targets or list(range(len(opponent.active_slots))) or [-1]
+        options = []
+        for slot in unit.active_slots:
+            if slot.get('stunned') or not self.deck:
+                options.append([])
+                continue
+            # Aggro работает только при перехвате, а перехватить можно лишь более медленный слот
+            options.append([SlotPlan(card, t, aggro) for card in self.deck for t in targets
+                            for aggro in ((False, True) if t >= 0 and not opponent.active_slots[t].get('stunned')
+                                          and slot['speed'] > opponent.active_slots[t]['speed'] else (False,))])
+        return options
+
+    # === 1. АНАЛИТИКА ===
+    def _analytic_search(self, unit: Unit, opponent: Unit, options: List[List[SlotPlan]],
+                         deadline: float) -> List[Plan]:
+        """
+        До top_k полных планов (карта на каждом слоте с вариантами), лучшие по аналитике.
+        Планы с одинаковыми картами и одинаковыми целями после перехватов считаются одним.
+        """
+        evaluator = _AnalyticEvaluator(unit, opponent, self.enemy_deck)
+        scores: Dict[tuple, Tuple[float, tuple, Plan]] = {}
+
+        def score(plan: Plan) -> float:
+            key = plan_key(plan)
+            if key not in scores: scores[key] = (*evaluator.evaluate(plan), plan)
+            return scores[key][0]
+
+        def best_option(i: int, base: Plan, until: float) -> SlotPlan:
+            # По сроку - лучший из уже просмотренных (хотя бы первый)
+            best, best_value = None, -math.inf
+            for o in options[i]:
+                value = score(base[:i] + (o,) + base[i + 1:])
+                if value > best_value: best, best_value = o, value
+                if time.perf_counter() >= until: break
+            return best
+
+        # Старт: каждый слот выбирает лучшее в одиночку (остальные пустые), на слот - равная доля
+        # оставшегося времени. Пары карт уже посчитаны предыдущими слотами, так что следующие идут быстрее.
+        # Пробные планы с пустыми слотами только ранжируют варианты и в кандидаты не попадают
+        empty = tuple(None for _ in options)
+        plan = list(empty)
+        open_slots = [i for i, opts in enumerate(options) if opts]
+        for n, i in enumerate(open_slots):
+            now = time.perf_counter()
+            plan[i] = best_option(i, empty, now + max(0.0, deadline - now) / (len(open_slots) - n))
+        plan = tuple(plan)
+        score(plan)
+
+        # Покоординатный подъем: меняем по одному слоту, пока есть улучшение и время
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for i, opts in enumerate(options):
+                if not opts: continue
+                changed = plan[:i] + (best_option(i, plan, deadline),) + plan[i + 1:]
+                if score(changed) > score(plan) + 1e-12:
+                    plan = changed
+                    improved = True
+                if time.perf_counter() >= deadline: break
+
+        # Соседи итогового плана: в один слот подставляются лучшие одиночные варианты из стартового прохода
+        # (их пары карт уже посчитаны). Так кандидатов хватает, даже если на подъем не осталось времени
+        probes = sorted((item for item in scores.values() if sum(c is not None for c in item[2]) == 1),
+                        key=lambda item: item[0], reverse=True)
+        for _, _, probe in probes[:self.top_k * len(open_slots)]:
+            i = next(k for k, choice in enumerate(probe) if choice is not None)
+            score(plan[:i] + (probe[i],) + plan[i + 1:])
+
+        complete = [item for item in scores.values()
+                    if all(choice is not None for choice, opts in zip(item[2], options) if opts)]
+        candidates, seen = [], set()
+        for _, effect, candidate in sorted(complete, key=lambda item: item[0], reverse=True):
+            if effect in seen: continue
+            seen.add(effect)
+            candidates.append(candidate)
+            if len(candidates) >= self.top_k: break
+        return candidates
+
+    # === 2. ПРОВЕРКА ДВИЖКОМ ===
+    def _rollout_search(self, unit: Unit, opponent: Unit, candidates: List[Plan],
+                        deadline: float, root: RngStream) -> Plan:
+        me_state, enemy_state = unit.snapshot(), opponent.snapshot()
+        start = (unit.current_hp, unit.current_stagger, opponent.current_hp, opponent.current_stagger)
+        open_slots = [j for j, s in enumerate(opponent.active_slots) if not s.get('stunned') and not s.get('card')]
+        totals = [0.0] * len(candidates)
+        rollouts = 0
+
+        try:
+            while True:
+                # Прогон r одинаков для всех планов: одни и те же карты врага и броски
+                for k, plan in enumerate(candidates):
+                    rng = root.child(rollouts)
+                    for j in open_slots:
+                        opponent.active_slots[j]['card'] = rng.choice(self.enemy_deck)
+                    apply_plan(unit, plan)
+                    ClashSystem(rng, log_level=LOG_NONE).resolve_turn(opponent, unit)
+                    totals[k] += state_value(unit, opponent, start)
+                    unit.restore(me_state)
+                    opponent.restore(enemy_state)
+
+                rollouts += 1
+                if self.max_rollouts is not None and rollouts >= self.max_rollouts: break
+                if self.max_rollouts is None and time.perf_counter() >= deadline: break
+        finally:
+            unit.restore(me_state)
+            opponent.restore(enemy_state)
+
+        return candidates[max(range(len(candidates)), key=totals.__getitem__)]
+
+
+class _AnalyticEvaluator:
+    """Ожидаемый размен за ход по ClashOdds. Пары карт считаются один раз на ход."""
+
+    def __init__(self, unit: Unit, opponent: Unit, enemy_deck: Sequence[Card]):
+        self.unit = unit
+        self.opponent = opponent
+        self.enemy_cards = [[s['card']] if s.get('card') else ([] if s.get('stunned') else list(enemy_deck))
+                            for s in opponent.active_slots]
+        # Свободные слоты врага усредняются по одной колоде: клеш с ними считается один раз на карту, а не на слот
+        self._enemy_keys = [tuple(map(id, cards)) for cards in self.enemy_cards]
+        self._clash: Dict[Tuple[int, tuple], float] = {}
+        self._one_sided: Dict[int, float] = {}
+        # Атаки врага в одну сторону - с его точки зрения (в evaluate вычитаются)
+        incoming = {key: self._mean((ClashOdds.one_sided(opponent, c, unit) for c in cards), opponent, unit)
+                    for key, cards in zip(self._enemy_keys, self.enemy_cards)}
+        self._incoming = [incoming[key] for key in self._enemy_keys]
+
+    @staticmethod
+    def _mean(odds_iter, me: Unit, enemy: Unit) -> float:
+        values = [odds_value(o.total, me, enemy) for o in odds_iter]
+        return sum(values) / len(values) if values else 0.0
+
+    def clash(self, card: Card, j: int) -> float:
+        key = (id(card), self._enemy_keys[j])
+        if key not in self._clash:
+            cards = self.enemy_cards[j]
+            self._clash[key] = self._mean((ClashOdds.card_vs_card(self.unit, card, self.opponent, c)
+                                           for c in cards), self.unit, self.opponent) if cards else self.one_sided(card)
+        return self._clash[key]
+
+    def one_sided(self, card: Card) -> float:
+        if id(card) not in self._one_sided:
+            self._one_sided[id(card)] = self._mean([ClashOdds.one_sided(self.unit, card, self.opponent)],
+                                                   self.unit, self.opponent)
+        return self._one_sided[id(card)]
+
+    def evaluate(self, plan: Plan) -> Tuple[float, tuple]:
+        """
+        (ожидаемый размен, ключ эффекта). Ключ - карты и цели обеих сторон после перехватов:
+        планы с одинаковым ключом разыгрываются движком одинаково (например, Aggro без соперника за цель).
+        """
+        unit, opponent = self.unit, self.opponent
+        saved = unit.active_slots, opponent.active_slots
+        unit.active_slots = [dict(s) for s in unit.active_slots]
+        opponent.active_slots = [dict(s) for s in opponent.active_slots]
+        try:
+            apply_plan(unit, plan)
+            ClashSystem.calculate_redirections(opponent, unit)
+            ClashSystem.calculate_redirections(unit, opponent)
+            effect = (tuple(choice and id(choice.card) for choice in plan),
+                      tuple(s.get('target_slot') for s in unit.active_slots),
+                      tuple(s.get('target_slot') for s in opponent.active_slots))
+
+            value = 0.0
+            clashed = set()
+            for i, choice in enumerate(plan):
+                if choice is None: continue
+                j = unit.active_slots[i].get('target_slot')
+                if j is None or not 0 <= j < len(opponent.active_slots): continue
+                if opponent.active_slots[j].get('target_slot') == i and self.enemy_cards[j] and j not in clashed:
+                    clashed.add(j)
+                    value += self.clash(choice.card, j)
+                else:
+                    value += self.one_sided(choice.card)
+
+            # Слоты врага без клеша бьют по нам в одну сторону
+            for j, slot in enumerate(opponent.active_slots):
+                t = slot.get('target_slot')
+                if j in clashed or t is None or not 0 <= t < len(unit.active_slots): continue
+                value -= self._incoming[j]
+            return value, effect
+        finally:
+            unit.active_slots, opponent.active_slots = saved
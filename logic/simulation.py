@@ -0,0 +1,465 @@
+# logic/simulation.py
+import copy
+import math
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+from core.models import Unit
+from core.rng import RngStream
+from core.unit_library import UnitLibrary
+from logic.battle import BattleSession, CardPolicy
+from logic.combat_log import LOG_NONE
+
+Z_95 = 1.959964
+
+
+# ==========================================
+# СТАТИСТИКА
+# ==========================================
+@dataclass
+class Estimate:
+    """Оценка со стандартным 95% доверительным интервалом."""
+    mean: float
+    low: float
+    high: float
+
+    def __str__(self):
+        return f"{self.mean:.3f} [{self.low:.3f}; {self.high:.3f}]"
+
+
+@dataclass
+class MatchupStats:
+    fights: int
+    p1_win_rate: Estimate
+    p2_win_rate: Estimate
+    draw_rate: Estimate
+    rounds: Estimate  # раундов до убийства (только бои с победителем)
+    rounds_percentiles: dict
+    p1_hp_left: Estimate
+    p2_hp_left: Estimate
+    p1_staggers: Estimate
+    p2_staggers: Estimate
+
+
+def wilson_interval(successes: int, n: int, z: float = Z_95) -> Estimate:
+    """Доверительный интервал Уилсона для доли (устойчив при p около 0 и 1)."""
+    if n == 0: return Estimate(0.0, 0.0, 0.0)
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return Estimate(p, max(0.0, center - half), min(1.0, center + half))
+
+
+def mean_interval(values: List[float], z: float = Z_95) -> Estimate:
+    n = len(values)
+    if n == 0: return Estimate(0.0, 0.0, 0.0)
+    mean = sum(values) / n
+    if n == 1: return Estimate(mean, mean, mean)
+    var = sum((v - mean) ** 2 for v in values) / (n - 1)
+    half = z * math.sqrt(var / n)
+    return Estimate(mean, mean - half, mean + half)
+
+
+def percentiles(values: List[float], qs=(5, 25, 50, 75, 95)) -> dict:
+    """Перцентили по методу ближайшего ранга."""
+    if not values: return {q: 0 for q in qs}
+    ordered = sorted(values)
+    n = len(ordered)
+    return {q: ordered[min(n - 1, max(0, math.ceil(q / 100 * n) - 1))] for q in qs}
+
+
+def histogram_percentiles(hist: Counter, qs=(5, 25, 50, 75, 95)) -> dict:
+    """То же по гистограмме значение -> частота (для целых значений вроде числа раундов)."""
+    n = sum(hist.values())
+    if not n: return {q: 0 for q in qs}
+    ordered = sorted(hist.items())
+    result = {}
+    for q in qs:
+        rank, seen = min(n - 1, max(0, math.ceil(q / 100 * n) - 1)), 0
+        for value, count in ordered:
+            seen += count
+            if seen > rank: break
+        result[q] = value
+    return result
+
+
+class RunningStats:
+    """
+    Потоковые среднее и дисперсия (Уэлфорд) без хранения значений.
+    Частичные итоги воркеров сливаются merge (формула Чана) - результат как у одного потока.
+    """
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, x: float):
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        if not other.n: return self
+        n = self.n + other.n
+        d = other.mean - self.mean
+        self.mean += d * other.n / n
+        self.m2 += other.m2 + d * d * self.n * other.n / n
+        self.n = n
+        return self
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def interval(self, z: float = Z_95) -> Estimate:
+        if self.n == 0: return Estimate(0.0, 0.0, 0.0)
+        half = z * math.sqrt(self.variance / self.n)
+        return Estimate(self.mean, self.mean - half, self.mean + half)
+
+
+# Компактный результат одного боя: (winner, rounds, p1_hp, p2_hp, p1_staggers, p2_staggers)
+FightRow = Tuple[int, int, int, int, int, int]
+
+
+def fight_points(row: FightRow) -> float:
+    """Очки P1 за бой: победа 1, ничья 0.5, поражение 0."""
+    return 1.0 if row[0] == 1 else 0.5 if row[0] == 0 else 0.0
+
+
+class MatchupAccumulator:
+    """Итоги серии боев без хранения строк: счетчики исходов, RunningStats и гистограмма раундов."""
+
+    def __init__(self):
+        self.fights = 0
+        self.outcomes = [0, 0, 0]  # по winner: ничья, P1, P2
+        self.rounds_hist: Counter = Counter()  # только бои с победителем
+        self.rounds = RunningStats()
+        self.p1_hp, self.p2_hp = RunningStats(), RunningStats()
+        self.p1_staggers, self.p2_staggers = RunningStats(), RunningStats()
+
+    def add(self, row: FightRow):
+        winner, rounds, p1_hp, p2_hp, p1_stg, p2_stg = row
+        self.fights += 1
+        self.outcomes[winner] += 1
+        if winner:
+            self.rounds.push(rounds)
+            self.rounds_hist[rounds] += 1
+        self.p1_hp.push(p1_hp)
+        self.p2_hp.push(p2_hp)
+        self.p1_staggers.push(p1_stg)
+        self.p2_staggers.push(p2_stg)
+
+    def merge(self, other: 'MatchupAccumulator') -> 'MatchupAccumulator':
+        self.fights += other.fights
+        self.outcomes = [a + b for a, b in zip(self.outcomes, other.outcomes)]
+        self.rounds_hist.update(other.rounds_hist)
+        for name in ("rounds", "p1_hp", "p2_hp", "p1_staggers", "p2_staggers"):
+            getattr(self, name).merge(getattr(other, name))
+        return self
+
+    def half_width(self, z: float = Z_95) -> float:
+        """Наибольшая полуширина интервала Уилсона по долям побед P1 и P2."""
+        if not self.fights: return math.inf
+        return max((e.high - e.low) / 2 for e in (wilson_interval(self.outcomes[1], self.fights, z),
+                                                   wilson_interval(self.outcomes[2], self.fights, z)))
+
+    def fights_needed(self, half_width: float, z: float = Z_95) -> int:
+        """Оценка общего числа боев для заданной полуширины (нормальное приближение по текущим долям)."""
+        n = max(1, self.fights)
+        p = max(self.outcomes[1], self.outcomes[2]) / n
+        return math.ceil(z * z * max(p * (1 - p), 1 / n) / (half_width * half_width))
+
+    def stats(self) -> MatchupStats:
+        n = self.fights
+        return MatchupStats(
+            fights=n,
+            p1_win_rate=wilson_interval(self.outcomes[1], n),
+            p2_win_rate=wilson_interval(self.outcomes[2], n),
+            draw_rate=wilson_interval(self.outcomes[0], n),
+            rounds=self.rounds.interval(),
+            rounds_percentiles=histogram_percentiles(self.rounds_hist),
+            p1_hp_left=self.p1_hp.interval(),
+            p2_hp_left=self.p2_hp.interval(),
+            p1_staggers=self.p1_staggers.interval(),
+            p2_staggers=self.p2_staggers.interval(),
+        )
+
+
+@dataclass
+class PairedComparison:
+    """
+    Сравнение вариантов A и B на общих случайных числах. Разность - B минус A (плюс - B сильнее).
+    variance_reduction - во сколько раз дисперсия парной разности меньше, чем у независимых выборок
+    (столько же раз меньше боев нужно для той же точности).
+    """
+    fights: int
+    a_score: Estimate  # очки P1: победа 1, ничья 0.5
+    b_score: Estimate
+    difference: Estimate
+    difference_variance: float
+    variance_reduction: float
+    hp_difference: Estimate  # остаток HP P1
+
+
+class PairedAccumulator:
+    """Потоковые итоги парных боев (строка A и строка B одного номера боя)."""
+
+    def __init__(self):
+        self.a, self.b = RunningStats(), RunningStats()
+        self.diff, self.hp_diff = RunningStats(), RunningStats()
+
+    def add(self, row_a: FightRow, row_b: FightRow):
+        a, b = fight_points(row_a), fight_points(row_b)
+        self.a.push(a)
+        self.b.push(b)
+        self.diff.push(b - a)
+        self.hp_diff.push(row_b[2] - row_a[2])
+
+    def merge(self, other: 'PairedAccumulator') -> 'PairedAccumulator':
+        for name in ("a", "b", "diff", "hp_diff"):
+            getattr(self, name).merge(getattr(other, name))
+        return self
+
+    def result(self) -> PairedComparison:
+        independent = self.a.variance + self.b.variance
+        paired = self.diff.variance
+        reduction = independent / paired if paired > 0 else (math.inf if independent > 0 else 1.0)
+        return PairedComparison(fights=self.diff.n, a_score=self.a.interval(), b_score=self.b.interval(),
+                                difference=self.diff.interval(), difference_variance=paired,
+                                variance_reduction=reduction, hp_difference=self.hp_diff.interval())
+
+
+# ==========================================
+# ВОРКЕР
+# ==========================================
+def _run_chunk(p1: Unit, p2: Unit, p1_policy: CardPolicy, p2_policy: CardPolicy,
+               start: int, n: int, max_rounds: int, root: RngStream, sync_rounds: bool = False) -> List[FightRow]:
+    """
+    Гоняет бои [start; start + n) на одних и тех же объектах юнитов (сброс между боями).
+    Бой номер i всегда получает поток root.child(i), так что результат не зависит
+    от числа воркеров и разбиения на чанки.
+    """
+    rows = []
+    for i in range(start, start + n):
+        BattleSession.reset_unit(p1)
+        BattleSession.reset_unit(p2)
+        res = BattleSession(p1, p2, p1_policy, p2_policy, rng=root.child(i), log_level=LOG_NONE,
+                            sync_rounds=sync_rounds).run(max_rounds)
+        rows.append((res.winner, res.rounds, max(0, res.p1_hp), max(0, res.p2_hp),
+                     res.p1_staggers, res.p2_staggers))
+    return rows
+
+
+def _run_chunk_stats(p1: Unit, p2: Unit, p1_policy: CardPolicy, p2_policy: CardPolicy,
+                     start: int, n: int, max_rounds: int, root: RngStream) -> MatchupAccumulator:
+    """То же, но воркер возвращает свернутые итоги, а не строки боев."""
+    acc = MatchupAccumulator()
+    for row in _run_chunk(p1, p2, p1_policy, p2_policy, start, n, max_rounds, root):
+        acc.add(row)
+    return acc
+
+
+def _run_paired_chunk(p1_a: Unit, p1_b: Unit, p2: Unit, policy_a: CardPolicy, policy_b: CardPolicy,
+                      p2_policy: CardPolicy, start: int, n: int, max_rounds: int,
+                      root: RngStream) -> PairedAccumulator:
+    """
+    Бои [start; start + n) обоих вариантов: бой i у A и B идет на одном и том же потоке root.child(i),
+    раунд r - на root.child(i).child(r).
+    """
+    rows_a = _run_chunk(p1_a, p2, policy_a, p2_policy, start, n, max_rounds, root, sync_rounds=True)
+    rows_b = _run_chunk(p1_b, p2, policy_b, p2_policy, start, n, max_rounds, root, sync_rounds=True)
+    acc = PairedAccumulator()
+    for row_a, row_b in zip(rows_a, rows_b):
+        acc.add(row_a, row_b)
+    return acc
+
+
+def _split(n: int, parts: int) -> List[int]:
+    base, extra = divmod(n, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts) if base or i < extra]
+
+
+def _resolve_unit(unit: Union[Unit, str]) -> Unit:
+    if isinstance(unit, Unit): return unit
+    roster = UnitLibrary.get_roster() or UnitLibrary.load_all()
+    if unit not in roster:
+        raise KeyError(f"Unit '{unit}' not found in {UnitLibrary.DATA_PATH}")
+    return roster[unit]
+
+
+def summarize(rows: List[FightRow]) -> MatchupStats:
+    n = len(rows)
+    decided = [r[1] for r in rows if r[0] != 0]
+    return MatchupStats(
+        fights=n,
+        p1_win_rate=wilson_interval(sum(1 for r in rows if r[0] == 1), n),
+        p2_win_rate=wilson_interval(sum(1 for r in rows if r[0] == 2), n),
+        draw_rate=wilson_interval(sum(1 for r in rows if r[0] == 0), n),
+        rounds=mean_interval(decided),
+        rounds_percentiles=percentiles(decided),
+        p1_hp_left=mean_interval([r[2] for r in rows]),
+        p2_hp_left=mean_interval([r[3] for r in rows]),
+        p1_staggers=mean_interval([r[4] for r in rows]),
+        p2_staggers=mean_interval([r[5] for r in rows]),
+    )
+
+
+# ==========================================
+# ЗАПУСК
+# ==========================================
+def simulate_matchup(p1: Union[Unit, str], p2: Union[Unit, str],
+                     p1_policy: CardPolicy, p2_policy: Optional[CardPolicy] = None,
+                     n_fights: int = 1000, workers: Optional[int] = None,
+                     max_rounds: int = 100, chunks_per_worker: int = 4,
+                     seed: Optional[int] = None) -> MatchupStats:
+    """
+    Монте-Карло: n_fights полных боев p1 vs p2 на ProcessPoolExecutor.
+    Юниты можно передать объектом или именем из UnitLibrary.
+    Исходные объекты не меняются - воркеры получают копии.
+    Одинаковый seed дает одинаковые бои (в т.ч. для сравнения билдов на общих случайных числах).
+    """
+    p1 = _resolve_unit(p1)
+    p2 = _resolve_unit(p2)
+    if p2_policy is None: p2_policy = p1_policy
+
+    root = RngStream(seed)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or n_fights < 2 * chunks_per_worker:
+        rows = _run_chunk(copy.deepcopy(p1), copy.deepcopy(p2), p1_policy, p2_policy,
+                          0, n_fights, max_rounds, root)
+        return summarize(rows)
+
+    rows = []
+    futures = []
+    start = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for size in _split(n_fights, workers * chunks_per_worker):
+            futures.append(pool.submit(_run_chunk, p1, p2, p1_policy, p2_policy, start, size, max_rounds, root))
+            start += size
+        for fut in futures:
+            rows.extend(fut.result())
+
+    return summarize(rows)
+
+
+def simulate_until(p1: Union[Unit, str], p2: Union[Unit, str],
+                   p1_policy: CardPolicy, p2_policy: Optional[CardPolicy] = None,
+                   half_width: float = 0.01, min_fights: int = 200, max_fights: int = 100_000,
+                   chunk_size: int = 100, workers: Optional[int] = None,
+                   max_rounds: int = 100, seed: Optional[int] = None) -> MatchupStats:
+    """
+    Последовательная выборка: бои идут волнами, пока полуширина 95% интервала долей побед
+    не станет <= half_width (или не кончится max_fights). Легкий матчап останавливается
+    через несколько сотен боев, равный (p около 0.5, +-1%) - примерно через 10 тысяч.
+    Первая волна - min_fights, следующие - по оценке недостающих боев (не больше уже сыгранного).
+    Волна режется на чанки по chunk_size независимо от числа воркеров, итоги чанков сливаются по порядку,
+    поэтому одинаковый seed дает одинаковый результат при любом workers.
+    """
+    if half_width <= 0: raise ValueError("half_width должна быть > 0")
+    p1 = _resolve_unit(p1)
+    p2 = _resolve_unit(p2)
+    if p2_policy is None: p2_policy = p1_policy
+
+    root = RngStream(seed)
+    workers = workers or os.cpu_count() or 1
+    acc = MatchupAccumulator()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    local = None if pool else (copy.deepcopy(p1), copy.deepcopy(p2))
+
+    start, wave = 0, min_fights
+    try:
+        while True:
+            wave = max(1, min(wave, max_fights - start))
+            chunks = [(s, min(chunk_size, start + wave - s)) for s in range(start, start + wave, chunk_size)]
+            if pool is None:
+                parts = [_run_chunk_stats(*local, p1_policy, p2_policy, s, n, max_rounds, root) for s, n in chunks]
+            else:
+                futures = [pool.submit(_run_chunk_stats, p1, p2, p1_policy, p2_policy, s, n, max_rounds, root)
+                           for s, n in chunks]
+                parts = [f.result() for f in futures]
+            for part in parts:
+                acc.merge(part)
+            start += wave
+
+            if start >= max_fights or acc.half_width() <= half_width: break
+            wave = min(max(acc.fights_needed(half_width) - start, chunk_size), start)
+    finally:
+        if pool is not None: pool.shutdown()
+
+    return acc.stats()
+
+
+def compare_variants(p1_a: Union[Unit, str], p1_b: Union[Unit, str], p2: Union[Unit, str],
+                     policy_a: CardPolicy, policy_b: Optional[CardPolicy] = None,
+                     p2_policy: Optional[CardPolicy] = None, n_fights: int = 1000,
+                     chunk_size: int = 100, workers: Optional[int] = None,
+                     max_rounds: int = 100, seed: Optional[int] = None) -> PairedComparison:
+    """
+    Парное сравнение двух вариантов P1 против одного P2 на общих случайных числах.
+    Два билда: разные p1_a/p1_b, одна политика. Две версии карты: один юнит, колоды в policy_a/policy_b.
+    Бой номер i у обоих вариантов получает один и тот же поток, поэтому общий шум (скорости, броски)
+    вычитается, и для той же точности нужно в variance_reduction раз меньше боев, чем при независимых сериях.
+    Поток пересинхронизируется в начале каждого раунда: если варианты разошлись по числу бросков,
+    следующие раунды все равно идут на общих случайных числах.
+    """
+    p1_a, p1_b, p2 = _resolve_unit(p1_a), _resolve_unit(p1_b), _resolve_unit(p2)
+    if policy_b is None: policy_b = policy_a
+    if p2_policy is None: p2_policy = policy_a
+
+    root = RngStream(seed)
+    workers = workers or os.cpu_count() or 1
+    chunks = [(s, min(chunk_size, n_fights - s)) for s in range(0, n_fights, chunk_size)]
+    if workers == 1 or len(chunks) < 2:
+        # B - отдельная копия, даже если варианты отличаются только политикой
+        units = (copy.deepcopy(p1_a), copy.deepcopy(p1_b), copy.deepcopy(p2))
+        parts = [_run_paired_chunk(*units, policy_a, policy_b, p2_policy, s, n, max_rounds, root) for s, n in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_paired_chunk, p1_a, p1_b, p2, policy_a, policy_b, p2_policy,
+                                   s, n, max_rounds, root) for s, n in chunks]
+            parts = [f.result() for f in futures]
+
+    acc = PairedAccumulator()
+    for part in parts:
+        acc.merge(part)
+    return acc.result()
+
+
+if __name__ == "__main__":
+    import argparse
+    from core.library import Library
+    from logic.battle import RandomCardPolicy
+
+    parser = argparse.ArgumentParser(description="Monte Carlo fight runner")
+    parser.add_argument("p1")
+    parser.add_argument("p2")
+    parser.add_argument("-n", "--fights", type=int, default=1000)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-s", "--seed", type=int, default=None)
+    parser.add_argument("--half-width", type=float, default=None,
+                        help="adaptive mode: stop once the win-rate CI half-width is below this (up to -n fights)")
+    args = parser.parse_args()
+
+    policy = RandomCardPolicy(Library.get_all_cards())
+    if args.half_width:
+        stats = simulate_until(args.p1, args.p2, policy, half_width=args.half_width, max_fights=args.fights,
+                               workers=args.workers, seed=args.seed)
+    else:
+        stats = simulate_matchup(args.p1, args.p2, policy, n_fights=args.fights, workers=args.workers,
+                                 seed=args.seed)
+
+    print(f"Fights: {stats.fights}")
+    print(f"P1 win: {stats.p1_win_rate}")
+    print(f"P2 win: {stats.p2_win_rate}")
+    print(f"Draw:   {stats.draw_rate}")
+    print(f"Rounds: {stats.rounds} {stats.rounds_percentiles}")
+    print(f"HP left: P1 {stats.p1_hp_left} | P2 {stats.p2_hp_left}")
+    print(f"Staggers: P1 {stats.p1_staggers} | P2 {stats.p2_staggers}")
@@ -0,0 +1,257 @@
+# logic/solver.py
+"""
+Решатель одного хода: оптимальные карты/цели/Aggro для обеих сторон по брошенным слотам.
+
+Модель хода аддитивна: после перехвата (семантика ClashSystem.calculate_team_redirections,
+P1 перехватывает первым) каждый слот либо клешится с тем, в кого целится и кто целится в него,
+либо бьет в одну сторону. Значение хода (для P1) = сумма odds_value по этим парам,
+точные вероятности кубиков - из ClashOdds, по одному разу на пару карт.
+
+Игра - минимакс: первая сторона выбирает план целиком, вторая отвечает, зная его
+(гарантированный результат первой стороны в чистых стратегиях).
+Карта влияет ровно на одно слагаемое суммы, отсюда:
+- слабо доминируемые карты выбрасываются заранее (итеративно) - минимакс не меняется;
+- карты отвечающей стороны выбираются в замкнутом виде (лучшая против каждой карты / для атаки в одну
+  сторону), а ее цели и Aggro важны только через итоговую схему пар ("сигнатуру");
+- карты первой стороны ищутся ветвями и границами (альфа-бета: мин-узел - худшая сигнатура),
+  целые схемы первой стороны отсекаются по верхней оценке.
+"""
+import itertools
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from core.models import Card, Unit
+from core.zobrist import combine
+from logic.clash_odds import ClashOdds
+from logic.planner import Plan, SlotPlan, apply_plan, odds_value
+from logic.transposition import TranspositionTable
+
+
+class TurnSolution(NamedTuple):
+    value: float  # с точки зрения P1
+    p1_plan: Plan
+    p2_plan: Plan
+    exact: bool  # False - поиск остановлен по node_limit, план - лучший найденный
+    nodes: int
+
+# Что происходит со слотом первой стороны при данной схеме пар
+NONE, CLASH, ONE_SIDED = 0, 1, 2
+
+
+def redirect(att_speed: Sequence[int], att_target: Sequence[int], att_aggro: Sequence[bool],
+             def_speed: Sequence[int], def_target: Sequence[int]) -> List[int]:
+    """
+    calculate_redirections на списках: новые цели защитника.
+    Слот защитника перехватывает более быстрый слот, целящийся в него: 1. Aggro, 2. самый медленный, 3. первый.
+    """
+    best = {}
+    for i, j in enumerate(att_target):
+        if not 0 <= j < len(def_speed) or att_speed[i] <= def_speed[j]: continue
+        key = (not att_aggro[i], att_speed[i])
+        if j not in best or key < best[j][0]:
+            best[j] = (key, i)
+    out = list(def_target)
+    for j, (_, i) in best.items():
+        out[j] = i
+    return out
+
+
+class TurnSolver:
+    """
+    solve(p1, p2) -> TurnSolution. first=1: P1 выбирает первым (максимизирует), P2 отвечает;
+    first=2 - наоборот (P2 минимизирует значение P1).
+    """
+
+    def __init__(self, p1_cards: Sequence[Card], p2_cards: Sequence[Card],
+                 node_limit: Optional[int] = None, table_size: int = 1024):
+        self.cards = (list({id(c): c for c in p1_cards}.values()),
+                      list({id(c): c for c in p2_cards}.values()))
+        self.node_limit = node_limit
+        # Решенные позиции: повторный запрос того же хода не пересчитывается
+        self.table = TranspositionTable(capacity=table_size)
+
+    # === ЗНАЧЕНИЯ ПАР (memo на ход) ===
+    def _pair_values(self, p1: Unit, p2: Unit, cards1: List[Card], cards2: List[Card]):
+        clash = [[odds_value(ClashOdds.card_vs_card(p1, a, p2, b).total, p1, p2) for b in cards2] for a in cards1]
+        os1 = [odds_value(ClashOdds.one_sided(p1, a, p2).total, p1, p2) for a in cards1]
+        os2 = [-odds_value(ClashOdds.one_sided(p2, b, p1).total, p2, p1) for b in cards2]
+        return clash, os1, os2
+
+    @staticmethod
+    def _undominated(clash, os1, os2) -> Tuple[List[int], List[int]]:
+        """Итеративное удаление слабо доминируемых карт (P1 максимизирует, P2 минимизирует)."""
+        alive1, alive2 = list(range(len(os1))), list(range(len(os2)))
+
+        def prune(alive, vector, better):
+            keep = []
+            for a in alive:
+                va = vector(a)
+                dominated = any(
+                    all(better(x, y) for x, y in zip(vector(b), va)) and (vector(b) != va or b < a)
+                    for b in alive if b != a)
+                if not dominated: keep.append(a)
+            return keep
+
+        while True:
+            new1 = prune(alive1, lambda a: [os1[a]] + [clash[a][b] for b in alive2], lambda x, y: x >= y)
+            new2 = prune(alive2, lambda b: [os2[b]] + [clash[a][b] for a in new1], lambda x, y: x <= y)
+            if (new1, new2) == (alive1, alive2): return alive1, alive2
+            alive1, alive2 = new1, new2
+
+    # === ПОИСК ===
+    def solve(self, p1: Unit, p2: Unit, first: int = 1) -> TurnSolution:
+        key = combine(first, p1.state_hash(), p2.state_hash())
+        entry = self.table.get(key)
+        if entry is not None: return entry.best
+
+        units = (p1, p2)
+        clash, os1, os2 = self._pair_values(p1, p2, *self.cards)
+        alive = self._undominated(clash, os1, os2)
+
+        # Все в терминах первой стороны F (максимизирует) и отвечающей R
+        f_side = 0 if first == 1 else 1
+        r_side = 1 - f_side
+        sign = 1.0 if f_side == 0 else -1.0
+        pair = (lambda f, r: clash[f][r]) if f_side == 0 else (lambda f, r: -clash[r][f])
+        os_f = {f: sign * (os1, os2)[f_side][f] for f in alive[f_side]}
+        os_r = {r: sign * (os1, os2)[r_side][r] for r in alive[r_side]}
+
+        # Лучший ответ R на каждую карту F в клеше и лучшая атака R в одну сторону
+        reply_clash = {f: min(alive[r_side], key=lambda r: pair(f, r)) for f in alive[f_side]}
+        vs_clash = {f: pair(f, reply_clash[f]) for f in alive[f_side]}
+        reply_os = min(alive[r_side], key=os_r.get)
+        best_os_r = os_r[reply_os]
+        gain = {NONE: {f: 0.0 for f in alive[f_side]}, CLASH: vs_clash, ONE_SIDED: os_f}
+        max_gain = {kind: max(vals.values()) for kind, vals in gain.items()}
+
+        speeds = tuple([s['speed'] for s in u.active_slots] for u in units)
+        active = tuple([not s.get('stunned') for s in u.active_slots] for u in units)
+        f_slots = [i for i, ok in enumerate(active[f_side]) if ok]
+        f_cards_order = sorted(alive[f_side], key=lambda f: vs_clash[f] + os_f[f], reverse=True)
+
+        nodes = 0
+        stopped = False
+        best = (float("-inf"), None, None, None)  # value, схема F, карты F, сигнатура-ответ
+
+        for s_f in self._structures(f_side, speeds, active):
+            if stopped: break
+            sigs = {}
+            for s_r in self._structures(r_side, speeds, active):
+                nodes += 1
+                sig = self._signature(f_side, s_f, s_r, speeds, active)
+                if sig[0] not in sigs: sigs[sig[0]] = (sig, s_r)
+                if self.node_limit is not None and nodes >= self.node_limit:
+                    stopped = True
+                    break
+            if not sigs: continue
+
+            kinds = list(sigs)
+            base = [k[1] * best_os_r for k in kinds]
+            # Верхняя оценка схемы: каждый слот берет лучшую карту для своей роли в каждой сигнатуре
+            ub = min(b + sum(max_gain[k[0][i]] for i in f_slots) for k, b in zip(kinds, base))
+            if ub <= best[0]: continue
+
+            n = len(f_slots)
+            rem = [[sum(max_gain[k[0][f_slots[d]]] for d in range(depth, n)) for k in kinds]
+                   for depth in range(n + 1)]
+            picks = [None] * n
+
+            def branch(depth: int, partial: List[float]):
+                nonlocal best, nodes
+                nodes += 1
+                if depth == n:
+                    v = min(partial)
+                    if v > best[0]:
+                        worst = min(range(len(partial)), key=partial.__getitem__)
+                        best = (v, s_f, list(picks), sigs[kinds[worst]])
+                    return
+                # Отсечение: даже лучшие оставшиеся карты не поднимут худшую сигнатуру выше найденного
+                if min(p + r for p, r in zip(partial, rem[depth])) <= best[0]: return
+                slot = f_slots[depth]
+                for f in f_cards_order:
+                    picks[depth] = f
+                    branch(depth + 1, [p + gain[k[0][slot]][f] for p, k in zip(partial, kinds)])
+
+            branch(0, base)
+
+        solution = self._solution(best, f_side, speeds, active, f_slots, reply_clash, reply_os,
+                                  sign, not stopped, nodes)
+        if not stopped: self.table.store(key, 0, solution.value, best=solution)
+        return solution
+
+    @staticmethod
+    def _structures(side: int, speeds, active):
+        """
+        Схемы стороны: (цель, aggro) на каждый слот, оглушенные - (-1, False).
+        Aggro перебирается только там, где он может решить спор за перехват
+        (есть еще свой слот, который тоже быстрее какой-то цели).
+        """
+        mine, theirs = speeds[side], speeds[1 - side]
+        per_slot = []
+        for i, ok in enumerate(active[side]):
+            if not ok:
+                per_slot.append([(-1, False)])
+                continue
+            contested = any(mine[i] > theirs[t] and
+                            any(k != i and active[side][k] and mine[k] > theirs[t] for k in range(len(mine)))
+                            for t in range(len(theirs)))
+            aggros = (False, True) if contested else (False,)
+            per_slot.append([(t, ag) for t in range(len(theirs)) for ag in aggros] or [(-1, False)])
+        return itertools.product(*per_slot)
+
+    @staticmethod
+    def _signature(f_side: int, s_f, s_r, speeds, active):
+        """
+        Схема пар после перехвата (P1 перехватывает первым, как в resolve_turn).
+        Возвращает ((роли слотов F, число атак R в одну сторону), цели F, цели R) - цели после перехвата.
+        """
+        s1, s2 = (s_f, s_r) if f_side == 0 else (s_r, s_f)
+        t1 = [t for t, _ in s1]
+        t2 = [t for t, _ in s2]
+        t2 = redirect(speeds[0], t1, [ag for _, ag in s1], speeds[1], t2)
+        t1 = redirect(speeds[1], t2, [ag for _, ag in s2], speeds[0], t1)
+        t_f, t_r = (t1, t2) if f_side == 0 else (t2, t1)
+        act_f, act_r = active[f_side], active[1 - f_side]
+
+        roles = []
+        for i, j in enumerate(t_f):
+            if not act_f[i] or j < 0: roles.append(NONE)
+            elif act_r[j] and t_r[j] == i: roles.append(CLASH)
+            else: roles.append(ONE_SIDED)
+        n_os_r = sum(1 for j, i in enumerate(t_r)
+                     if act_r[j] and i >= 0 and not (act_f[i] and t_f[i] == j))
+        return (tuple(roles), n_os_r), t_f, t_r
+
+    def _solution(self, best, f_side, speeds, active, f_slots, reply_clash, reply_os,
+                  sign, exact, nodes) -> TurnSolution:
+        value, s_f, picks, reply = best
+        plans = [None, None]
+        if s_f is None:
+            plans[0] = tuple(None for _ in speeds[0])
+            plans[1] = tuple(None for _ in speeds[1])
+            return TurnSolution(0.0, plans[0], plans[1], exact, nodes)
+
+        (_, t_f, t_r), s_r = reply
+        r_side = 1 - f_side
+        f_cards, r_cards = self.cards[f_side], self.cards[r_side]
+        card_of = dict(zip(f_slots, picks))
+
+        plans[f_side] = tuple(SlotPlan(f_cards[card_of[i]], t, ag) if i in card_of else None
+                              for i, (t, ag) in enumerate(s_f))
+        r_plan = []
+        for j, (t, ag) in enumerate(s_r):
+            if not active[r_side][j]:
+                r_plan.append(None)
+                continue
+            i = t_r[j]
+            clashing = i >= 0 and i in card_of and t_f[i] == j
+            r = reply_clash[card_of[i]] if clashing else reply_os
+            r_plan.append(SlotPlan(r_cards[r], t, ag))
+        plans[r_side] = tuple(r_plan)
+        return TurnSolution(sign * value, plans[0], plans[1], exact, nodes)
+
+    def apply(self, p1: Unit, p2: Unit, first: int = 1) -> TurnSolution:
+        """Решает ход и записывает оба плана в слоты."""
+        solution = self.solve(p1, p2, first)
+        apply_plan(p1, solution.p1_plan)
+        apply_plan(p2, solution.p2_plan)
+        return solution
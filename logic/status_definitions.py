@@ -1,5 +1,6 @@
 import random
 from logic.context import RollContext
+from logic.combat_log import BLEED, CRIT
 from core.models import DiceType
 
 
@@ -41,7 +42,7 @@ class BleedStatus(StatusEffect):
             ctx.source.current_hp -= dmg
             remove_amt = stack // 2
             ctx.source.remove_status("bleed", remove_amt)
-            ctx.log.append(f"🩸 Bleed: {ctx.source.name} takes {dmg} dmg")
+            ctx.log.add(BLEED, ctx.source.name, dmg)
 
 
 class ParalysisStatus(StatusEffect):
@@ -62,14 +63,14 @@ class SelfControlStatus(StatusEffect):
         # Ограничиваем шанс 100% (на всякий случай, хотя стаков макс 100)
         chance = min(100, chance)
 
-        roll = random.randint(1, 100)
+        roll = (ctx.rng or random).randint(1, 100)
 
         if roll <= chance:
             # КРИТИЧЕСКИЙ УДАР
             ctx.damage_multiplier *= 2.0
             ctx.is_critical = True
 
-            ctx.log.append(f"💨 CRITICAL HIT! (Chance {chance}%) x2 DMG")
+            ctx.log.add(CRIT, chance)
 
             # Теряем 20 зарядов при успешном крите
             ctx.source.remove_status("self_control", 20)
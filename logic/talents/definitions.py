@@ -1,6 +1,7 @@
 # logic/talents/definitions.py
 from logic.passives import BasePassive
 from logic.context import RollContext
+from logic.combat_log import SELF_CONTROL
 from core.enums import DiceType
 
 # ==========================================
@@ -77,4 +78,4 @@ class TalentCalmMind(BasePassive):
         # Максимум 100 зарядов
         if current_stacks < 100:
             ctx.source.add_status("self_control", 1)
-            ctx.log.append(f"💨 {self.name}: +1 Self-Control")
\ No newline at end of file
+            ctx.log.add(SELF_CONTROL, self.name)
\ No newline at end of file
@@ -0,0 +1,74 @@
+# logic/transposition.py
+"""
+Таблица транспозиций: результат оценки позиции по ее Zobrist-ключу
+(Unit.state_hash / BattleSession.state_hash), чтобы повторные позиции не считались заново.
+Размер ограничен; при переполнении вытесняется самая мелкая по глубине запись
+среди нескольких давно не использованных (LRU + предпочтение глубины).
+"""
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+# Тип оценки (для альфа-бета): точная, нижняя или верхняя граница
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TTEntry(NamedTuple):
+    depth: int
+    value: float
+    flag: int = EXACT
+    best: Any = None
+
+
+class TranspositionTable:
+    """
+    key -> TTEntry. get() освежает запись (LRU), store() не затирает более глубокую оценку той же позиции.
+    Вытеснение: из evict_window самых старых записей удаляется самая мелкая.
+    """
+
+    def __init__(self, capacity: int = 100_000, evict_window: int = 4):
+        if capacity < 1: raise ValueError("capacity должна быть >= 1")
+        self.capacity = capacity
+        self.evict_window = max(1, evict_window)
+        self._entries: "OrderedDict[int, TTEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._entries
+
+    def get(self, key: int, depth: int = 0) -> Optional[TTEntry]:
+        """Запись, посчитанная на глубину не меньше depth (иначе None)."""
+        entry = self._entries.get(key)
+        if entry is None or entry.depth < depth:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store(self, key: int, depth: int, value: float, flag: int = EXACT, best: Any = None):
+        entries = self._entries
+        old = entries.get(key)
+        if old is not None:
+            entries.move_to_end(key)
+            # Мелкая оценка не заменяет глубокую (кроме точной поверх границы той же глубины)
+            if old.depth > depth or (old.depth == depth and old.flag == EXACT and flag != EXACT):
+                return
+        elif len(entries) >= self.capacity:
+            self._evict()
+        entries[key] = TTEntry(depth, value, flag, best)
+
+    def _evict(self):
+        victim, victim_depth = None, None
+        for i, (key, entry) in enumerate(self._entries.items()):
+            if i >= self.evict_window: break
+            if victim is None or entry.depth < victim_depth:
+                victim, victim_depth = key, entry.depth
+        del self._entries[victim]
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
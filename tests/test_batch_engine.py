@@ -0,0 +1,68 @@
+import unittest
+from core.models import Unit, Card, Dice, DiceType
+from logic.battle import RandomCardPolicy, CardPolicy
+from logic.batch_engine import simulate_matchup_batched, unsupported_reason, BatchBattle, np
+from logic.simulation import simulate_matchup
+
+
+def make_deck():
+    bleed = {"on_hit": [{"script_id": "apply_status", "params": {"status": "bleed", "stack": 2, "duration": 3}}]}
+    return [
+        Card("Strike", dice_list=[Dice(4, 8, DiceType.SLASH, scripts=bleed), Dice(3, 6, DiceType.PIERCE)]),
+        Card("Guard", dice_list=[Dice(3, 7, DiceType.BLOCK), Dice(2, 5, DiceType.EVADE)]),
+    ]
+
+
+class FirstCard(CardPolicy):
+    """Всегда первая карта колоды (уровень модуля - пул процессов должен ее пиклить)"""
+
+    def __init__(self, deck):
+        self.deck = deck
+
+    def choose_card(self, unit, opponent, slot_idx, rng=None):
+        return self.deck[0]
+
+
+@unittest.skipIf(np is None, "numpy не установлен")
+class TestBatchEngine(unittest.TestCase):
+
+    def test_unsupported_falls_back(self):
+        """Неподдерживаемое (талант, своя политика) считается скалярным движком с тем же seed"""
+        deck = make_deck()
+        p1 = Unit("P1", talents=["unknown_talent"])
+        self.assertIsNotNone(unsupported_reason(p1, Unit("P2"), deck, deck))
+        args = (Unit("P1"), Unit("P2"), FirstCard(deck))
+        self.assertEqual(simulate_matchup_batched(*args, n_fights=20, seed=3),
+                         simulate_matchup(*args, n_fights=20, workers=1, seed=3))
+
+    def test_rows_and_seed(self):
+        deck = make_deck()
+        rows = BatchBattle(Unit("P1"), Unit("P2"), deck, deck, 200, np.random.default_rng(1)).rows(100)
+        self.assertEqual(len(rows), 200)
+        for winner, rounds, hp1, hp2, *_ in rows:
+            self.assertIn(winner, (0, 1, 2))
+            self.assertGreater(rounds, 0)
+            if winner == 1: self.assertEqual(hp2, 0)
+            if winner == 2: self.assertEqual(hp1, 0)
+
+        policy = RandomCardPolicy(deck)
+        a = simulate_matchup_batched(Unit("P1"), Unit("P2"), policy, n_fights=300, seed=5, batch_size=128)
+        b = simulate_matchup_batched(Unit("P1"), Unit("P2"), policy, n_fights=300, seed=5, batch_size=128)
+        self.assertEqual(a, b)
+
+    def test_matches_scalar_distribution(self):
+        """Исходы совпадают со скалярным движком по распределению (асимметричный бой)"""
+        deck = make_deck()
+        weak = [Card("Jab", dice_list=[Dice(2, 5, DiceType.BLUNT)])]
+        p1, p2 = Unit("P1"), Unit("P2")
+        batched = simulate_matchup_batched(p1, p2, RandomCardPolicy(deck), RandomCardPolicy(weak),
+                                           n_fights=2000, seed=11)
+        scalar = simulate_matchup(p1, p2, RandomCardPolicy(deck), RandomCardPolicy(weak),
+                                  n_fights=400, workers=1, seed=11)
+        self.assertAlmostEqual(batched.p1_win_rate.mean, scalar.p1_win_rate.mean, delta=0.08)
+        self.assertAlmostEqual(batched.rounds.mean, scalar.rounds.mean,
+                               delta=4 * (scalar.rounds.high - scalar.rounds.mean) + 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
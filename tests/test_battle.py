@@ -0,0 +1,69 @@
+import random
+import unittest
+from core.models import Unit, Card, Dice, DiceType
+from core.rng import RngStream
+from logic.battle import BattleSession, RandomCardPolicy
+
+
+def make_deck():
+    return [
+        Card("Strike", dice_list=[Dice(4, 8, DiceType.SLASH), Dice(3, 6, DiceType.PIERCE)]),
+        Card("Guard", dice_list=[Dice(3, 7, DiceType.BLOCK), Dice(2, 5, DiceType.BLUNT)]),
+    ]
+
+
+class TestBattleSession(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(42)
+        self.p1 = Unit("P1")
+        self.p2 = Unit("P2")
+        BattleSession.reset_unit(self.p1)
+        BattleSession.reset_unit(self.p2)
+
+    def test_fight_runs_to_completion(self):
+        """Бой без UI доходит до смерти одного из бойцов"""
+        deck = make_deck()
+        session = BattleSession(self.p1, self.p2, RandomCardPolicy(deck), RandomCardPolicy(deck))
+        result = session.run(max_rounds=200)
+
+        self.assertIn(result.winner, (1, 2))
+        self.assertTrue(self.p1.is_dead() or self.p2.is_dead())
+        self.assertEqual(result.rounds, session.round)
+        self.assertEqual(self.p1.active_slots, [])
+
+    def test_staggered_unit_skips_and_recovers(self):
+        """Юнит в стаггере получает пустой слот и восстанавливается в конце хода"""
+        self.p1.current_stagger = 0
+        session = BattleSession(self.p1, self.p2)
+        session.roll_phase()
+
+        self.assertEqual(len(self.p1.active_slots), 1)
+        self.assertTrue(self.p1.active_slots[0]['stunned'])
+
+        session.execute_turn()
+        self.assertEqual(self.p1.current_stagger, self.p1.max_stagger)
+
+    def test_without_policies_nothing_happens(self):
+        """Без политик (ручной режим) карты не назначаются и урона нет"""
+        session = BattleSession(self.p1, self.p2)
+        result = session.run(max_rounds=3)
+
+        self.assertEqual(result.winner, 0)
+        self.assertEqual(result.rounds, 3)
+        self.assertEqual(self.p1.current_hp, self.p1.max_hp)
+
+    def test_sync_rounds_requires_rng_stream(self):
+        """Пересинхронизация по раундам работает только с RngStream"""
+        for rng in (None, random.Random(1)):
+            with self.assertRaises(ValueError):
+                BattleSession(self.p1, self.p2, rng=rng, sync_rounds=True)
+
+        deck = make_deck()
+        session = BattleSession(self.p1, self.p2, RandomCardPolicy(deck), RandomCardPolicy(deck),
+                                rng=RngStream(3), sync_rounds=True)
+        self.assertGreater(session.run(max_rounds=5).rounds, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from core.models import Unit
+from core.calculations import compute_stats, explain_unit_stats
+from core.batch_stats import evaluate_builds, np
+
+
+class TestRecalculateStats(unittest.TestCase):
+
+    def test_cached_by_fingerprint(self):
+        a, b = Unit("A"), Unit("B")
+        a.attributes["endurance"] = 9
+        b.attributes["endurance"] = 9
+        a.recalculate_stats()
+        hits = compute_stats.cache_info().hits
+        b.recalculate_stats()
+        self.assertEqual(compute_stats.cache_info().hits, hits + 1)
+        self.assertEqual(a.max_hp, b.max_hp)
+
+        # Результат общий, но словари у юнитов свои
+        b.modifiers["power_attack"] = 100
+        self.assertNotEqual(a.modifiers["power_attack"], 100)
+
+    def test_changes_invalidate(self):
+        unit = Unit("A")
+        unit.recalculate_stats()
+        hp, dice = unit.max_hp, len(unit.computed_speed_dice)
+
+        unit.skills["speed"] = 10
+        unit.level_rolls["1"] = {"hp": 3, "sp": 2}
+        unit.recalculate_stats()
+        self.assertEqual(len(unit.computed_speed_dice), dice + 1)
+        self.assertEqual(unit.max_hp, hp + 8)
+
+    def test_explain_is_separate(self):
+        unit = Unit("A")
+        unit.attributes["strength"] = 5
+        self.assertIsNotNone(unit.recalculate_stats())
+        self.assertIn("Повышает значение куба ⬆ атаки на 1", explain_unit_stats(unit))
+
+
+@unittest.skipIf(np is None, "numpy не установлен")
+class TestBatchStats(unittest.TestCase):
+
+    def test_matches_scalar_formulas(self):
+        rng = np.random.default_rng(3)
+        n = 500
+        attrs = {k: rng.integers(0, 31, n) for k in ("strength", "endurance", "agility", "psych")}
+        skills = {k: rng.integers(0, 31, n) for k in ("speed", "acrobatics", "shields", "tough_skin", "willpower",
+                                                      "medicine", "strike_power", "heavy_weapon")}
+        res = evaluate_builds(attrs, skills, rolls_hp=25, rolls_sp=30, talents_hp_pct=10)
+
+        for i in range(n):
+            unit = Unit("U", talents_hp_pct=10)
+            unit.attributes.update({k: int(v[i]) for k, v in attrs.items()})
+            unit.skills.update({k: int(v[i]) for k, v in skills.items()})
+            unit.level_rolls = {str(lvl): {"hp": 0, "sp": 1} for lvl in range(5)}
+            unit.recalculate_stats()
+
+            self.assertEqual((unit.max_hp, unit.max_sp, unit.max_stagger),
+                             (res["max_hp"][i], res["max_sp"][i], res["max_stagger"][i]))
+            self.assertEqual(unit.computed_speed_dice,
+                             list(zip(res["speed_min"][i], res["speed_max"][i]))[:unit.speed_dice_count])
+            for k, v in unit.modifiers.items():
+                self.assertEqual(v, res[k][i], k)
+
+    def test_rejects_unknown_names(self):
+        with self.assertRaises(ValueError):
+            evaluate_builds(skills={"flying": 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
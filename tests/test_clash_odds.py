@@ -0,0 +1,47 @@
+import unittest
+from core.models import Unit, Card, Dice, DiceType
+from logic.clash_odds import ClashOdds
+
+
+class TestClashOdds(unittest.TestCase):
+
+    def setUp(self):
+        self.a = Unit("A")
+        self.b = Unit("B")
+
+    def test_fixed_dice(self):
+        """10 против 2: гарантированная победа и полный урон"""
+        odds = ClashOdds.die_vs_die(self.a, Dice(10, 10, DiceType.SLASH), self.b, Dice(2, 2, DiceType.SLASH))
+        self.assertEqual(odds.p_win, 1.0)
+        self.assertEqual(odds.hp_dealt, 10)
+        self.assertEqual(odds.stagger_dealt, 10)
+        self.assertEqual(odds.hp_taken, 0)
+
+    def test_symmetric_dice(self):
+        """Одинаковые кубики: P(win) == P(lose), P(draw) = 1/n"""
+        odds = ClashOdds.die_vs_die(self.a, Dice(1, 4, DiceType.SLASH), self.b, Dice(1, 4, DiceType.SLASH))
+        self.assertAlmostEqual(odds.p_win, odds.p_lose)
+        self.assertAlmostEqual(odds.p_draw, 0.25)
+        self.assertAlmostEqual(odds.hp_dealt, odds.hp_taken)
+
+    def test_block_wins_deal_stagger(self):
+        """Блок 8 против атаки 3: урон по выдержке = разница"""
+        odds = ClashOdds.die_vs_die(self.a, Dice(8, 8, DiceType.BLOCK), self.b, Dice(3, 3, DiceType.SLASH))
+        self.assertEqual(odds.stagger_dealt, 5)
+        self.assertEqual(odds.hp_dealt, 0)
+
+    def test_strength_and_paralysis_chain(self):
+        """Сила сдвигает каждый кубик, Паралич расходуется по одному на бросок"""
+        self.a.add_status("strength", 2)
+        self.a.add_status("paralysis", 1)
+        card = Card("X", dice_list=[Dice(5, 5, DiceType.SLASH), Dice(5, 5, DiceType.SLASH)])
+        odds = ClashOdds.one_sided(self.a, card, self.b)
+        # 5 + 2 - 3 = 4, затем 5 + 2 = 7
+        self.assertEqual([d.hp_dealt for d in odds.dice], [4, 7])
+        self.assertEqual(odds.total.hp_dealt, 11)
+        # Итог карты - только урон: вероятности исхода есть лишь у кубиков
+        self.assertFalse(hasattr(odds.total, "p_win"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -67,5 +67,41 @@ class TestClashSystem(unittest.TestCase):
         self.assertEqual(self.defender.current_hp, 90)
 
 
+def make_slot(speed, card=None, target_unit=0, target_slot=0, is_aggro=False):
+    return {'speed': speed, 'card': card, 'target_unit': target_unit, 'target_slot': target_slot,
+            'is_aggro': is_aggro}
+
+
+class TestTeamTurn(unittest.TestCase):
+
+    def test_team_redirection_picks_aggro_then_slowest(self):
+        """Перехват считается по всей команде атакующих: сначала Aggro, затем самый медленный"""
+        a1, a2 = Unit("A1"), Unit("A2")
+        d = Unit("D")
+        d.active_slots = [make_slot(3, target_unit=1, target_slot=0)]
+        a1.active_slots = [make_slot(9), make_slot(5)]
+        a2.active_slots = [make_slot(2), make_slot(7, is_aggro=True)]
+        ClashSystem.calculate_team_redirections([a1, a2], [d])
+        self.assertEqual((d.active_slots[0]['target_unit'], d.active_slots[0]['target_slot']), (1, 1))
+
+        a2.active_slots[1]['is_aggro'] = False
+        ClashSystem.calculate_team_redirections([a1, a2], [d])
+        self.assertEqual((d.active_slots[0]['target_unit'], d.active_slots[0]['target_slot']), (0, 1))
+
+    def test_two_on_one(self):
+        """Оба юнита первой команды бьют одного: клэш с тем, в кого он целится, второй - односторонне"""
+        hit = Card("Hit", dice_list=[Dice(4, 4, DiceType.SLASH)])
+        a1, a2, d = Unit("A1"), Unit("A2"), Unit("D")
+        a1.active_slots = [make_slot(5, hit)]
+        a2.active_slots = [make_slot(4, hit)]
+        d.active_slots = [make_slot(1, hit, target_unit=1)]
+
+        report = ClashSystem().resolve_team_turn([a1, a2], [d])
+        rounds = [r['round'] for r in report]
+        self.assertEqual(rounds, ["P1.1[1]🏹Hit (D1)", "Clash (D1)"])
+        self.assertLess(d.current_hp, d.max_hp)
+        self.assertEqual(a1.current_hp, a1.max_hp)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,47 @@
+import unittest
+from core.models import Unit
+from core.rng import RngStream
+from logic.battle import BattleSession, RandomCardPolicy
+from logic.combat_log import CombatLog, NULL_LOG, make_log, LOG_NONE, LOG_FULL, POWER, HIT, STATUS
+from tests.test_battle import make_deck
+
+
+class TestCombatLog(unittest.TestCase):
+
+    def test_render_matches_old_text(self):
+        log = CombatLog()
+        log.add(POWER, "Strength", 2)
+        log.add(POWER, "Paralysis", -3)
+        log.add(HIT, 7, True)
+        log.add(STATUS, "bleed", 3, 2, 1, "Roland")
+        log.append("legacy")
+        self.assertEqual(log.lines(), [
+            "[Strength] +2", "[Paralysis] -3", "💥 Hit 7 HP (Stagger x2!)",
+            "🧪 Bleed +3 (2 turns, in 1 turns) to Roland", "legacy",
+        ])
+
+    def test_null_log_drops_everything(self):
+        self.assertIs(make_log(LOG_NONE), NULL_LOG)
+        NULL_LOG.add(HIT, 5, False)
+        NULL_LOG.append("text")
+        self.assertEqual(len(NULL_LOG), 0)
+
+    def test_log_level_does_not_change_outcome(self):
+        deck = make_deck()
+        results, reports = [], []
+        for level in (LOG_FULL, LOG_NONE):
+            p1, p2 = Unit("P1"), Unit("P2")
+            BattleSession.reset_unit(p1)
+            BattleSession.reset_unit(p2)
+            session = BattleSession(p1, p2, RandomCardPolicy(deck), RandomCardPolicy(deck),
+                                    rng=RngStream(7), log_level=level)
+            reports.append([r for r in session.play_round() if "(D" in r["round"]])
+            results.append(session.run(max_rounds=200))
+
+        self.assertEqual(results[0], results[1])
+        self.assertTrue(reports[0])
+        self.assertEqual(reports[1], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from core.models import Unit, Card, Dice, DiceType
+from logic.battle import RandomCardPolicy
+from logic.deck_optimizer import candidate_decks, optimize_deck
+
+
+def strike(name, lo, hi):
+    return Card(name, dice_list=[Dice(lo, hi, DiceType.SLASH)])
+
+
+class TestDeckOptimizer(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = [strike("Weak", 1, 2), strike("Poor", 1, 4), strike("Fair", 3, 6),
+                     strike("Good", 5, 9), strike("Best", 7, 12)]
+        self.enemy = RandomCardPolicy([strike("Enemy", 4, 8)])
+
+    def test_candidate_sampling(self):
+        """Все сочетания, пока их не больше лимита; иначе - выборка без повторов"""
+        self.assertEqual(len(candidate_decks(self.pool, 2)), 10)
+        sample = candidate_decks(self.pool, 2, max_candidates=4)
+        self.assertEqual(len({tuple(map(id, d)) for d in sample}), 4)
+
+    def test_halving_finds_strong_deck(self):
+        """Сильнейшие карты доживают до последней ступени, слабые колоды получают меньше боев"""
+        result = optimize_deck(Unit("P1"), self.pool, [Unit("E1"), Unit("E2")], self.enemy, deck_size=2,
+                               min_fights=20, eta=3, workers=1, seed=3)
+
+        self.assertEqual(result.candidates, 10)
+        self.assertEqual({c.name for c in result.best.deck}, {"Good", "Best"})
+        self.assertIs(result.ranking[0], result.best)
+        self.assertGreater(result.best.fights, result.ranking[-1].fights)
+        self.assertEqual(result.total_fights, sum(s.fights for s in result.ranking))
+        # 10 колод x 20 боев, 3 x 60; последняя оставшаяся лишнюю ступень не играет
+        self.assertEqual(result.total_fights, 320)
+
+        final = optimize_deck(Unit("P1"), self.pool, [Unit("E1"), Unit("E2")], self.enemy, deck_size=2,
+                              min_fights=20, eta=3, final_fights=200, workers=1, seed=3)
+        self.assertEqual(final.best.deck, result.best.deck)
+        self.assertEqual(final.best.fights, 200)
+        self.assertEqual(final.total_fights, 320 + 140)
+
+    def test_single_candidate_still_evaluated(self):
+        """Колода = весь пул: отбора нет, но колода получает min_fights боев"""
+        result = optimize_deck(Unit("P1"), self.pool[:2], [Unit("E1"), Unit("E2")], self.enemy, deck_size=2,
+                               min_fights=30, workers=1, seed=1)
+        self.assertEqual(result.candidates, 1)
+        self.assertEqual(result.best.fights, 30)
+        self.assertEqual(result.total_fights, 30)
+        self.assertGreater(result.best.score.high, 0.0)
+
+    def test_seed_reproducible_across_workers(self):
+        kwargs = dict(deck_size=2, min_fights=10, eta=2, seed=5)
+        inline = optimize_deck(Unit("P1"), self.pool, [Unit("E1")], self.enemy, workers=1, **kwargs)
+        pooled = optimize_deck(Unit("P1"), self.pool, [Unit("E1")], self.enemy, workers=2, **kwargs)
+        self.assertEqual([[c.name for c in s.deck] for s in inline.ranking],
+                         [[c.name for c in s.deck] for s in pooled.ranking])
+        self.assertEqual(inline.best.rows, pooled.best.rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from core.events import EventManager, ON_HIT, BEFORE_ROLL
+from core.models import Unit
+from engine import CombatEngine
+
+
+class TestEventManager(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = EventManager()
+        self.calls = []
+
+    def test_priority_then_subscription_order(self):
+        self.bus.subscribe(ON_HIT, lambda ctx: self.calls.append("late"), priority=200)
+        self.bus.subscribe(ON_HIT, lambda ctx: self.calls.append("a"))
+        self.bus.subscribe(ON_HIT, lambda ctx: self.calls.append("b"))
+        self.bus.subscribe(ON_HIT, lambda ctx: self.calls.append("early"), priority=1)
+        self.bus.emit(ON_HIT, None)
+        self.assertEqual(self.calls, ["early", "a", "b", "late"])
+
+    def test_unsubscribe_and_once(self):
+        sub = self.bus.subscribe(ON_HIT, self.calls.append)
+        self.bus.once(ON_HIT, lambda ctx: self.calls.append("once"))
+        self.bus.emit(ON_HIT, 1)
+        self.bus.emit(ON_HIT, 2)
+        self.assertEqual(self.calls, [1, "once", 2])
+
+        self.assertTrue(self.bus.unsubscribe(sub))
+        self.assertFalse(self.bus.unsubscribe(sub))
+        self.bus.emit(ON_HIT, 3)
+        self.assertEqual(self.calls, [1, "once", 2])
+        self.assertFalse(self.bus.has_listeners(ON_HIT))
+
+    def test_unsubscribe_during_emit_is_safe(self):
+        subs = []
+        subs.append(self.bus.subscribe(ON_HIT, lambda ctx: self.bus.unsubscribe(subs[1])))
+        subs.append(self.bus.subscribe(ON_HIT, self.calls.append))
+        self.bus.emit(ON_HIT, 1)  # снимок уже взят - второй еще срабатывает
+        self.bus.emit(ON_HIT, 2)
+        self.assertEqual(self.calls, [1])
+
+    def test_rejects_non_callable(self):
+        with self.assertRaises(TypeError):
+            self.bus.subscribe(ON_HIT, object())
+
+    def test_engine_subscribes_bound_handlers(self):
+        engine = CombatEngine(seed=1)
+        subs = engine.initialize_unit(Unit("Tester", talents=["calm_mind", "berserker_rage"]))
+        self.assertEqual(len(subs), 2)
+        self.assertEqual(len(engine.events.listeners[BEFORE_ROLL]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
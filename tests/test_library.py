@@ -0,0 +1,179 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+from core.models import Card, Dice, DiceType
+from core.library import Library
+from core.card_cache import CardCache
+from core.card_journal import CardJournal
+
+
+def make_card(card_id, name, tier=1, dtype=DiceType.SLASH, status=None):
+    scripts = {}
+    if status:
+        scripts = {"on_hit": [{"script_id": "apply_status", "params": {"status": status, "stack": 1}}]}
+    return Card(name, id=card_id, tier=tier, dice_list=[Dice(2, 5, dtype, scripts=scripts)])
+
+
+class TestLibrary(unittest.TestCase):
+
+    def setUp(self):
+        self._backup = {k: dict(getattr(Library, k)) for k in
+                        ("_cards", "_by_name", "_by_tier", "_by_type", "_by_dice_type", "_by_status")}
+        Library.clear()
+
+    def tearDown(self):
+        for k, v in self._backup.items():
+            getattr(Library, k).clear()
+            getattr(Library, k).update(v)
+
+    def test_lookup_by_id_and_name_is_shared(self):
+        """get_card по id и по имени отдает один и тот же неизменяемый экземпляр"""
+        Library.register(make_card("cut_1", "Cut"))
+        by_id = Library.get_card("cut_1")
+        by_name = Library.get_card("Cut")
+
+        self.assertIs(by_id, by_name)
+        with self.assertRaises(AttributeError):
+            by_id.name = "Other"
+        with self.assertRaises(AttributeError):
+            by_id.dice_list[0].max_val = 99
+
+    def test_scripts_frozen_deep(self):
+        """scripts общей карты и ее кубиков не правятся; register не замораживает карту вызывающего"""
+        original = make_card("bleed_1", "Bleeder", status="bleed")
+        original.scripts = {"on_use": [{"script_id": "restore_hp", "params": {"amount": 2}}]}
+        Library.register(original)
+        shared = Library.get_card("bleed_1")
+
+        self.assertFalse(original.is_frozen)
+        original.name = "Edited"
+        self.assertEqual(shared.name, "Bleeder")
+        with self.assertRaises(TypeError):
+            shared.scripts["on_use"] = []
+        with self.assertRaises(TypeError):
+            shared.dice_list[0].scripts["on_hit"][0]["params"]["stack"] = 5
+
+        clone = pickle.loads(pickle.dumps(shared))
+        self.assertTrue(clone.is_frozen)
+        with self.assertRaises(TypeError):
+            clone.dice_list[0].scripts["on_hit"] = []
+        self.assertEqual(json.loads(json.dumps(shared.to_dict()))["scripts"], original.to_dict()["scripts"])
+
+        editable = Library.get_card("bleed_1", mutable=True)
+        editable.scripts["on_use"] = []
+        self.assertEqual(len(shared.compiled.on_use), 1)
+
+    def test_mutable_copy(self):
+        Library.register(make_card("cut_1", "Cut"))
+        card = Library.get_card("cut_1", mutable=True)
+        card.dice_list[0].max_val = 99
+        card.dice_list.append(Dice(1, 1, DiceType.BLOCK))
+
+        self.assertEqual(Library.get_card("cut_1").dice_list[0].max_val, 5)
+        self.assertEqual(len(Library.get_card("cut_1").dice_list), 1)
+
+    def test_card_without_id_keyed_by_name(self):
+        Library.register(Card("Nameless", dice_list=[Dice(1, 2, DiceType.BLOCK)]))
+        self.assertEqual(Library.get_card("Nameless").id, "Nameless")
+
+    def test_indexes_follow_reregister(self):
+        """Перерегистрация карты с тем же id обновляет все индексы"""
+        Library.register(make_card("c1", "Bleeder", tier=2, status="bleed"))
+        Library.register(make_card("c2", "Blocker", tier=2, dtype=DiceType.BLOCK))
+
+        self.assertEqual([c.id for c in Library.find(tier=2)], ["c1", "c2"])
+        self.assertEqual([c.id for c in Library.find(status="bleed")], ["c1"])
+        self.assertEqual([c.id for c in Library.find(tier=2, dice_type=DiceType.BLOCK)], ["c2"])
+
+        Library.register(make_card("c1", "Renamed", tier=3))
+        self.assertEqual(Library.find(status="bleed"), [])
+        self.assertEqual([c.id for c in Library.find(tier=2)], ["c2"])
+        self.assertEqual(Library.get_card("Bleeder").name, "Unknown")
+        self.assertEqual(Library.get_card("Renamed").id, "c1")
+
+
+class TestCompiledScripts(unittest.TestCase):
+
+    def test_scripts_compiled_on_construction_and_assignment(self):
+        die = make_card("c", "C", status="bleed").dice_list[0]
+        self.assertEqual(len(die.compiled.on_hit), 1)
+        self.assertEqual(die.compiled.on_roll, ())
+
+        # Редактор присваивает scripts уже после создания кубика
+        die = Dice(1, 4, DiceType.BLOCK)
+        die.scripts = {"on_clash_win": [{"script_id": "restore_hp", "params": {"amount": 2}}]}
+        self.assertEqual(len(die.compiled.on_clash_win), 1)
+
+        clone = pickle.loads(pickle.dumps(die))
+        self.assertEqual(clone.compiled.on_clash_win[0].args, (2, "self"))
+
+    def test_unknown_script_rejected(self):
+        with self.assertRaises(ValueError):
+            Dice(1, 4, DiceType.SLASH, scripts={"on_hit": [{"script_id": "nope"}]})
+        with self.assertRaises(ValueError):
+            Card("Bad", scripts={"on_teleport": []})
+
+    def test_bad_card_skipped_on_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pack.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"cards": [make_card("ok", "Ok").to_dict(),
+                                     {"id": "bad", "name": "Bad", "dice": [
+                                         {"type": "slash", "scripts": {"on_hit": [{"script_id": "nope"}]}}]}]}, f)
+            cards = Library._load_single_file(path)
+        self.assertEqual([c.id for c in cards], ["ok"])
+
+
+class TestCardCache(unittest.TestCase):
+
+    def test_cache_roundtrip_and_invalidation(self):
+        """Кэш отдает карты, пока у файла не поменялись mtime/размер"""
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "pack.json")
+            with open(src, "w", encoding="utf-8") as f:
+                f.write('{"cards": []}')
+
+            cache = CardCache(os.path.join(tmp, "cache", "cards.pickle"))
+            cache.put(src, os.stat(src), [make_card("c1", "Cut").freeze()])
+            cache.save()
+
+            loaded = CardCache(cache.path).load()
+            cards = loaded.get(src, os.stat(src))
+            self.assertEqual([c.id for c in cards], ["c1"])
+            self.assertTrue(cards[0].is_frozen)
+
+            with open(src, "w", encoding="utf-8") as f:
+                f.write('{"cards": [ ]}')
+            self.assertIsNone(loaded.get(src, os.stat(src)))
+
+            loaded.prune(tmp, [])
+            self.assertEqual(loaded.entries, {})
+
+
+class TestCardJournal(unittest.TestCase):
+
+    def test_append_and_compact(self):
+        """Правки копятся в журнале, свертка переносит их в канонический JSON"""
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "custom_cards.json")
+            CardJournal.write_canonical(src, {"cards": [make_card("c1", "Old").to_dict()]})
+
+            journal = CardJournal(src)
+            journal.append(make_card("c1", "New").to_dict())
+            journal.append(make_card("c2", "Extra").to_dict())
+            with open(journal.path, "a", encoding="utf-8") as f:
+                f.write('{"id": "broken"')  # недописанная строка после падения
+
+            journal.append(make_card("c3", "After").to_dict())
+            self.assertEqual([e["name"] for e in journal.read()], ["New", "Extra", "After"])
+
+            journal.compact()
+            self.assertFalse(os.path.exists(journal.path))
+            cards = CardJournal.read_canonical(src)["cards"]
+            self.assertEqual([(c["id"], c["name"]) for c in cards], [("c1", "New"), ("c2", "Extra"), ("c3", "After")])
+
+
+if __name__ == '__main__':
+    unittest.main()
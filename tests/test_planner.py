@@ -0,0 +1,86 @@
+import random
+import time
+import unittest
+from core.models import Unit, Card, Dice, DiceType
+from core.rng import RngStream
+from logic.battle import BattleSession
+from logic.clash import ClashSystem
+from logic.combat_log import LOG_NONE
+from logic.planner import LookaheadPolicy, _AnalyticEvaluator
+
+TYPES = [DiceType.SLASH, DiceType.PIERCE, DiceType.BLUNT, DiceType.BLOCK, DiceType.EVADE]
+
+
+def random_deck(rng, n):
+    deck = []
+    for i in range(n):
+        dice = []
+        for _ in range(rng.randint(1, 3)):
+            lo = rng.randint(1, 6)
+            dice.append(Dice(lo, lo + rng.randint(0, 5), rng.choice(TYPES)))
+        deck.append(Card(f"C{i}", dice_list=dice))
+    return deck
+
+
+class TestLookaheadPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.p1, self.p2 = Unit("P1"), Unit("P2")
+        self.p2.skills["speed"] = 10
+        BattleSession.reset_unit(self.p1)
+        BattleSession.reset_unit(self.p2)
+        self.session = BattleSession(self.p1, self.p2, rng=RngStream(4))
+        self.session.roll_phase()
+
+    def test_prefers_stronger_card(self):
+        weak = Card("Weak", dice_list=[Dice(1, 1, DiceType.SLASH)])
+        strong = Card("Strong", dice_list=[Dice(9, 9, DiceType.SLASH)])
+        LookaheadPolicy([weak, strong], budget_ms=50, max_rollouts=3).assign_cards(self.p2, self.p1, RngStream(1))
+
+        for slot in self.p2.active_slots:
+            self.assertIs(slot['card'], strong)
+            self.assertIn(slot['target_slot'], range(len(self.p1.active_slots)))
+
+    def test_planning_leaves_state_untouched(self):
+        deck = [Card("Strike", dice_list=[Dice(4, 8, DiceType.SLASH)]),
+                Card("Guard", dice_list=[Dice(3, 7, DiceType.BLOCK)])]
+        self.p1.add_status("bleed", 2, duration=3)
+        before = (self.p1.current_hp, self.p2.current_hp, dict(self.p1.statuses),
+                  [s['speed'] for s in self.p1.active_slots])
+
+        plan = LookaheadPolicy(deck, budget_ms=50, max_rollouts=2).plan(self.p2, self.p1, RngStream(2))
+        self.assertEqual(len(plan), len(self.p2.active_slots))
+        self.assertEqual(before, (self.p1.current_hp, self.p2.current_hp, dict(self.p1.statuses),
+                                  [s['speed'] for s in self.p1.active_slots]))
+        self.assertTrue(all(s.get('card') is None for s in self.p1.active_slots))
+
+    def test_large_deck_full_plans_within_budget(self):
+        """40 карт и 4 слота на сторону: только полные планы, без дублей по Aggro, в пределах бюджета"""
+        rng = random.Random(0)
+        deck = random_deck(rng, 40)
+        p1, p2 = Unit("P1"), Unit("P2")
+        p1.skills["speed"] = p2.skills["speed"] = 30
+        for unit in (p1, p2): BattleSession.reset_unit(unit)
+        BattleSession(p1, p2, rng=RngStream(5)).roll_phase()
+        self.assertEqual((len(p1.active_slots), len(p2.active_slots)), (4, 4))
+
+        policy = LookaheadPolicy(deck, budget_ms=100)
+        options = policy._slot_options(p2, p1)
+        candidates = policy._analytic_search(p2, p1, options, time.perf_counter() + 0.05)
+        self.assertGreater(len(candidates), 1)
+        for plan in candidates:
+            self.assertTrue(all(choice is not None for choice in plan))
+        evaluator = _AnalyticEvaluator(p2, p1, deck)
+        self.assertEqual(len({evaluator.evaluate(plan)[1] for plan in candidates}), len(candidates))
+
+        start = time.perf_counter()
+        policy.assign_cards(p2, p1, RngStream(1))
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertTrue(all(slot['card'] is not None for slot in p2.active_slots))
+
+        for slot in p1.active_slots: slot['card'] = rng.choice(deck)
+        ClashSystem(RngStream(2), log_level=LOG_NONE).resolve_turn(p1, p2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+from core.models import Unit, Card, Dice, DiceType
+from logic.battle import RandomCardPolicy
+import random
+from core.rng import RngStream
+from logic.simulation import (simulate_matchup, simulate_until, compare_variants, summarize, wilson_interval,
+                              percentiles, RunningStats, MatchupAccumulator, _run_chunk)
+
+
+class TestSimulation(unittest.TestCase):
+
+    def test_wilson_interval_bounds(self):
+        """Интервал Уилсона не выходит за [0; 1] и содержит оценку"""
+        est = wilson_interval(0, 50)
+        self.assertEqual(est.low, 0.0)
+        self.assertGreater(est.high, 0.0)
+
+        est = wilson_interval(30, 100)
+        self.assertLess(est.low, 0.3)
+        self.assertGreater(est.high, 0.3)
+
+    def test_percentiles_nearest_rank(self):
+        self.assertEqual(percentiles(list(range(1, 101)), qs=(50, 95)), {50: 50, 95: 95})
+
+    def test_matchup_inline(self):
+        """Серия боев в одном процессе: доли исходов складываются в 1, исходники не меняются"""
+        deck = [Card("Strike", dice_list=[Dice(4, 8, DiceType.SLASH)])]
+        p1, p2 = Unit("P1"), Unit("P2")
+        stats = simulate_matchup(p1, p2, RandomCardPolicy(deck), n_fights=50, workers=1)
+
+        self.assertEqual(stats.fights, 50)
+        total = stats.p1_win_rate.mean + stats.p2_win_rate.mean + stats.draw_rate.mean
+        self.assertAlmostEqual(total, 1.0)
+        self.assertEqual(p1.current_hp, p1.max_hp)
+
+    def test_seed_reproducible_across_workers(self):
+        """Один seed - одни и те же бои, независимо от числа воркеров"""
+        deck = [Card("Strike", dice_list=[Dice(2, 9, DiceType.SLASH)])]
+        policy = RandomCardPolicy(deck)
+        inline = simulate_matchup(Unit("P1"), Unit("P2"), policy, n_fights=40, workers=1, seed=7)
+        pooled = simulate_matchup(Unit("P1"), Unit("P2"), policy, n_fights=40, workers=2, seed=7)
+        self.assertEqual(inline, pooled)
+
+    def test_running_stats_merge(self):
+        """Слияние частичных итогов (Чан) совпадает с одним проходом Уэлфорда"""
+        rng = random.Random(1)
+        values = [rng.gauss(10, 3) for _ in range(1000)]
+        whole, parts = RunningStats(), [RunningStats() for _ in range(3)]
+        for i, v in enumerate(values):
+            whole.push(v)
+            parts[i % 3].push(v)
+        merged = parts[0].merge(parts[1]).merge(parts[2]).merge(RunningStats())
+        self.assertEqual(merged.n, 1000)
+        self.assertAlmostEqual(merged.mean, whole.mean, places=9)
+        self.assertAlmostEqual(merged.variance, whole.variance, places=7)
+
+    def test_accumulator_matches_summarize(self):
+        deck = [Card("Strike", dice_list=[Dice(2, 9, DiceType.SLASH)])]
+        policy = RandomCardPolicy(deck)
+        rows = _run_chunk(Unit("P1"), Unit("P2"), policy, policy, 0, 60, 100, RngStream(4))
+        acc = MatchupAccumulator()
+        for row in rows[:25]: acc.add(row)
+        rest = MatchupAccumulator()
+        for row in rows[25:]: rest.add(row)
+        stats, expected = acc.merge(rest).stats(), summarize(rows)
+
+        self.assertEqual(stats.p1_win_rate, expected.p1_win_rate)
+        self.assertEqual(stats.rounds_percentiles, expected.rounds_percentiles)
+        self.assertAlmostEqual(stats.rounds.high, expected.rounds.high)
+        self.assertAlmostEqual(stats.p2_hp_left.mean, expected.p2_hp_left.mean)
+
+    def test_until_stops_early(self):
+        """Неравный матчап останавливается на первой волне, итог не зависит от числа воркеров"""
+        strong = RandomCardPolicy([Card("Strong", dice_list=[Dice(8, 12, DiceType.SLASH)])])
+        weak = RandomCardPolicy([Card("Weak", dice_list=[Dice(1, 4, DiceType.SLASH)])])
+        stats = simulate_until(Unit("P1"), Unit("P2"), strong, weak, half_width=0.02, workers=1, seed=2)
+        self.assertEqual(stats.fights, 200)
+        self.assertLessEqual((stats.p1_win_rate.high - stats.p1_win_rate.low) / 2, 0.02)
+
+        even = RandomCardPolicy([Card("Strike", dice_list=[Dice(2, 9, DiceType.SLASH)])])
+        inline = simulate_until(Unit("P1"), Unit("P2"), even, half_width=0.05, min_fights=50, workers=1, seed=3)
+        pooled = simulate_until(Unit("P1"), Unit("P2"), even, half_width=0.05, min_fights=50, workers=2, seed=3)
+        self.assertGreater(inline.fights, 50)
+        self.assertEqual(inline, pooled)
+
+    def test_compare_identical_variants(self):
+        """Одинаковые варианты на общих случайных числах дают нулевую разность без шума"""
+        policy = RandomCardPolicy([Card("Strike", dice_list=[Dice(2, 9, DiceType.SLASH)])])
+        res = compare_variants(Unit("P1"), Unit("P1"), Unit("P2"), policy, n_fights=60, workers=1, seed=1)
+        self.assertEqual(res.fights, 60)
+        self.assertEqual(res.difference.mean, 0.0)
+        self.assertEqual(res.difference_variance, 0.0)
+        self.assertEqual(res.a_score, res.b_score)
+
+    def test_compare_cards_paired(self):
+        """Усиленная карта: разность положительна, парная дисперсия меньше независимой"""
+        base = RandomCardPolicy([Card("Strike", dice_list=[Dice(2, 9, DiceType.SLASH)])])
+        buffed = RandomCardPolicy([Card("Strike", dice_list=[Dice(4, 9, DiceType.SLASH)])])
+        kwargs = dict(p2_policy=base, n_fights=400, seed=2)
+        res = compare_variants(Unit("P1"), Unit("P1"), Unit("P2"), base, buffed, workers=1, **kwargs)
+        self.assertGreater(res.difference.low, 0.0)
+        self.assertGreater(res.variance_reduction, 1.0)
+        self.assertEqual(res, compare_variants(Unit("P1"), Unit("P1"), Unit("P2"), base, buffed, workers=2,
+                                               **kwargs))
+
+
+if __name__ == '__main__':
+    unittest.main()
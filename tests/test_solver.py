@@ -0,0 +1,112 @@
+import itertools
+import random
+import unittest
+from types import SimpleNamespace
+from core.models import Unit, Card, Dice, DiceType
+from logic.clash import ClashSystem
+from logic.planner import odds_value
+from logic.clash_odds import ClashOdds
+from logic.solver import TurnSolver, redirect
+
+TYPES = [DiceType.SLASH, DiceType.PIERCE, DiceType.BLUNT, DiceType.BLOCK, DiceType.EVADE]
+
+
+def random_card(rng, name):
+    dice = []
+    for _ in range(rng.randint(1, 2)):
+        lo = rng.randint(1, 6)
+        dice.append(Dice(lo, lo + rng.randint(0, 5), rng.choice(TYPES)))
+    return Card(name, dice_list=dice)
+
+
+def make_slots(rng, n, stunned=()):
+    return [{'speed': 0 if i in stunned else rng.randint(1, 8), 'card': None,
+             'target_slot': -1, 'is_aggro': False, **({'stunned': True} if i in stunned else {})}
+            for i in range(n)]
+
+
+def brute_force(p1, p2, cards1, cards2, first):
+    """Полный перебор тех же правил: все планы первой стороны, на каждый - все ответы."""
+    units, cards = (p1, p2), (cards1, cards2)
+    v = {(a, b): odds_value(ClashOdds.card_vs_card(p1, ca, p2, cb).total, p1, p2)
+         for a, ca in enumerate(cards1) for b, cb in enumerate(cards2)}
+    os1 = [odds_value(ClashOdds.one_sided(p1, c, p2).total, p1, p2) for c in cards1]
+    os2 = [-odds_value(ClashOdds.one_sided(p2, c, p1).total, p2, p1) for c in cards2]
+
+    def plans(side):
+        per_slot = [[None] if s.get('stunned') else
+                    [(c, t, ag) for c in range(len(cards[side])) for t in range(len(units[1 - side].active_slots))
+                     for ag in (False, True)] for s in units[side].active_slots]
+        return list(itertools.product(*per_slot))
+
+    def value(a_plan, b_plan):
+        sp1 = [s['speed'] for s in p1.active_slots]
+        sp2 = [s['speed'] for s in p2.active_slots]
+        t1 = [x[1] if x else -1 for x in a_plan]
+        t2 = [x[1] if x else -1 for x in b_plan]
+        t2 = redirect(sp1, t1, [bool(x and x[2]) for x in a_plan], sp2, t2)
+        t1 = redirect(sp2, t2, [bool(x and x[2]) for x in b_plan], sp1, t1)
+        total = 0.0
+        for i, x in enumerate(a_plan):
+            if x is None: continue
+            j = t1[i]
+            total += v[x[0], b_plan[j][0]] if b_plan[j] and t2[j] == i else os1[x[0]]
+        for j, y in enumerate(b_plan):
+            if y is None: continue
+            i = t2[j]
+            if not (a_plan[i] and t1[i] == j): total += os2[y[0]]
+        return total
+
+    if first == 1:
+        return max(min(value(a, b) for b in plans(1)) for a in plans(0))
+    return min(max(value(a, b) for a in plans(0)) for b in plans(1))
+
+
+class TestTurnSolver(unittest.TestCase):
+
+    def test_redirect_matches_clash_system(self):
+        rng = random.Random(5)
+        for _ in range(200):
+            att = SimpleNamespace(active_slots=[{'speed': rng.randint(1, 6), 'target_slot': rng.randint(-1, 2),
+                                                 'is_aggro': rng.random() < 0.3} for _ in range(3)])
+            dfn = SimpleNamespace(active_slots=[{'speed': rng.randint(1, 6), 'target_slot': rng.randint(0, 2)}
+                                                for _ in range(3)])
+            expected = redirect([s['speed'] for s in att.active_slots], [s['target_slot'] for s in att.active_slots],
+                                [s['is_aggro'] for s in att.active_slots], [s['speed'] for s in dfn.active_slots],
+                                [s['target_slot'] for s in dfn.active_slots])
+            ClashSystem.calculate_redirections(att, dfn)
+            self.assertEqual([s['target_slot'] for s in dfn.active_slots], expected)
+
+    def test_matches_brute_force(self):
+        rng = random.Random(11)
+        for case in range(12):
+            cards1 = [random_card(rng, f"A{i}") for i in range(3)]
+            cards2 = [random_card(rng, f"B{i}") for i in range(3)]
+            p1, p2 = Unit("P1"), Unit("P2")
+            p1.active_slots = make_slots(rng, 2)
+            p2.active_slots = make_slots(rng, 2, stunned=(1,) if case % 4 == 3 else ())
+            first = 1 + case % 2
+
+            solution = TurnSolver(cards1, cards2).solve(p1, p2, first=first)
+            self.assertTrue(solution.exact)
+            self.assertAlmostEqual(solution.value, brute_force(p1, p2, cards1, cards2, first), places=9)
+            if case % 4 == 3: self.assertIsNone(solution.p2_plan[1])
+
+    def test_apply_writes_plans_and_caches(self):
+        strong = Card("Strong", dice_list=[Dice(9, 9, DiceType.SLASH)])
+        weak = Card("Weak", dice_list=[Dice(1, 1, DiceType.SLASH)])
+        p1, p2 = Unit("P1"), Unit("P2")
+        p1.active_slots = [{'speed': 5, 'card': None, 'target_slot': -1, 'is_aggro': False}]
+        p2.active_slots = [{'speed': 3, 'card': None, 'target_slot': -1, 'is_aggro': False}]
+        solver = TurnSolver([weak, strong], [weak, strong])
+        solution = solver.solve(p1, p2)
+        self.assertIs(solver.solve(p1, p2), solution)
+
+        solver.apply(p1, p2)
+        self.assertIs(p1.active_slots[0]['card'], strong)
+        self.assertIs(p2.active_slots[0]['card'], strong)
+        self.assertEqual(p1.active_slots[0]['target_slot'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
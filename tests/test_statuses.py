@@ -0,0 +1,147 @@
+import copy
+import pickle
+import unittest
+from core.models import Unit
+from logic.hooks import get_hooks
+from logic.statuses import StatusManager
+
+
+class TestStatusStore(unittest.TestCase):
+
+    def setUp(self):
+        self.unit = Unit("Tester")
+
+    def test_totals_follow_add_and_remove(self):
+        self.unit.add_status("strength", 3, duration=1)
+        self.unit.add_status("strength", 2, duration=3)
+        self.assertEqual(self.unit.get_status("strength"), 5)
+
+        # Сначала съедаются самые короткие наложения
+        self.unit.remove_status("strength", 4)
+        self.assertEqual(self.unit.get_status("strength"), 1)
+        self.assertEqual(self.unit._status_effects.instances("strength"), [{"amount": 1, "duration": 3}])
+
+        self.unit.remove_status("strength")
+        self.assertEqual(self.unit.get_status("strength"), 0)
+        self.assertNotIn("strength", self.unit.statuses)
+
+    def test_same_duration_coalesces(self):
+        """100 наложений с одной длительностью - одна корзина"""
+        for _ in range(100):
+            self.unit.add_status("self_control", 1)
+        self.assertEqual(self.unit._status_effects.instances("self_control"), [{"amount": 100, "duration": 1}])
+
+        self.unit.add_status("self_control", 5, duration=3)
+        self.unit.remove_status("self_control", 101)
+        self.assertEqual(self.unit._status_effects.instances("self_control"), [{"amount": 4, "duration": 3}])
+        self.assertEqual(self.unit.get_status("self_control"), 4)
+
+    def test_view_is_read_only(self):
+        self.unit.add_status("bleed", 2)
+        view = self.unit.statuses
+        with self.assertRaises(TypeError):
+            view["bleed"] = 10
+        self.unit.add_status("bleed", 1)
+        self.assertEqual(view["bleed"], 3)
+
+    def test_turn_end_expires_by_duration(self):
+        self.unit.add_status("strength", 2, duration=1)
+        self.unit.add_status("strength", 1, duration=2)
+        self.unit.add_status("bleed", 4, delay=1)
+
+        StatusManager.process_turn_end(self.unit)
+        self.assertEqual(dict(self.unit.statuses), {"strength": 1, "bleed": 4})
+
+        StatusManager.process_turn_end(self.unit)
+        self.assertEqual(dict(self.unit.statuses), {})
+
+    def test_self_control_decay_uses_cached_total(self):
+        self.unit.add_status("self_control", 30, duration=5)
+        StatusManager.process_turn_end(self.unit)
+        self.assertEqual(self.unit.get_status("self_control"), 10)
+
+    def test_copy_and_pickle(self):
+        self.unit.add_status("strength", 2, duration=2)
+        for clone in (copy.deepcopy(self.unit), pickle.loads(pickle.dumps(self.unit))):
+            clone.add_status("strength", 1)
+            self.assertEqual(clone.get_status("strength"), 3)
+            self.assertEqual(clone.statuses["strength"], 3)
+        self.assertEqual(self.unit.get_status("strength"), 2)
+
+    def test_snapshot_restore(self):
+        """Откат к снимку возвращает статусы, отложенные эффекты и память; снимок переиспользуем"""
+        self.unit.add_status("bleed", 3, duration=2)
+        self.unit.add_status("paralysis", 1, delay=1)
+        self.unit.memory["hits"] = 1
+        state = self.unit.snapshot()
+
+        for _ in range(2):
+            StatusManager.process_turn_end(self.unit)
+            self.unit.add_status("strength", 4)
+            self.unit.memory["hits"] = 5
+            get_hooks(self.unit)
+            self.unit.restore(state)
+
+            self.assertEqual(dict(self.unit.statuses), {"bleed": 3})
+            self.assertEqual(self.unit.delayed_queue[0]["delay"], 1)
+            self.assertEqual(self.unit.memory, {"hits": 1})
+            self.assertEqual([sid for sid, _ in get_hooks(self.unit).status("on_roll")], ["bleed"])
+
+    def test_state_hash_tracks_changes(self):
+        """Хеш зависит только от состояния: одинаковые состояния - одинаковый ключ, любое изменение - другой"""
+        other = Unit("Other")
+        self.assertEqual(self.unit.state_hash(), other.state_hash())
+
+        h0 = self.unit.state_hash()
+        self.unit.current_hp -= 3
+        self.unit.add_status("bleed", 2, duration=2)
+        self.unit.cooldowns["berserker_rage"] = 2
+        h1 = self.unit.state_hash()
+        self.assertNotEqual(h0, h1)
+
+        other.add_status("bleed", 1, duration=2)
+        other.add_status("bleed", 1, duration=2)
+        other.cooldowns = {"berserker_rage": 3}
+        other.tick_cooldowns()
+        other.current_hp = self.unit.current_hp
+        self.assertEqual(other.state_hash(), h1)
+        self.assertEqual(pickle.loads(pickle.dumps(other)).state_hash(), h1)
+
+        self.unit.remove_status("bleed")
+        self.unit.current_hp += 3
+        self.unit.tick_cooldowns()
+        self.unit.tick_cooldowns()
+        self.assertEqual(self.unit.state_hash(), h0)
+
+
+class TestUnitHooks(unittest.TestCase):
+
+    def test_table_keeps_only_overridden_handlers(self):
+        unit = Unit("Tester", talents=["calm_mind"])
+        unit.add_status("strength", 2)
+        unit.add_status("self_control", 5)
+        hooks = get_hooks(unit)
+
+        self.assertEqual([sid for sid, _ in hooks.status("on_roll")], ["strength"])
+        self.assertEqual([sid for sid, _ in hooks.status("on_hit")], ["self_control"])
+        self.assertEqual(hooks.status("on_clash_win"), ())
+        self.assertIs(get_hooks(unit), hooks)
+
+    def test_table_rebuilt_on_composition_change(self):
+        unit = Unit("Tester")
+        hooks = get_hooks(unit)
+        unit.add_status("strength", 1)
+        self.assertIsNot(get_hooks(unit), hooks)
+
+        # Изменение стака без смены состава таблицу не трогает
+        hooks = get_hooks(unit)
+        unit.add_status("strength", 3)
+        self.assertIs(get_hooks(unit), hooks)
+
+        unit.talents.append("berserker_rage")
+        self.assertIsNot(get_hooks(unit), hooks)
+        self.assertNotIn("_hooks", copy.deepcopy(unit).__dict__)
+
+
+if __name__ == '__main__':
+    unittest.main()
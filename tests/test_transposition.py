@@ -0,0 +1,40 @@
+import unittest
+from logic.transposition import TranspositionTable, EXACT, LOWER
+
+
+class TestTranspositionTable(unittest.TestCase):
+
+    def test_depth_preferred_store(self):
+        table = TranspositionTable(capacity=8)
+        table.store(1, depth=3, value=0.5)
+        table.store(1, depth=1, value=-1.0)
+        self.assertEqual(table.get(1).value, 0.5)
+        self.assertIsNone(table.get(1, depth=4))
+
+        # Граница той же глубины не затирает точную оценку, а точная заменяет границу
+        table.store(2, depth=2, value=1.0, flag=EXACT)
+        table.store(2, depth=2, value=3.0, flag=LOWER)
+        self.assertEqual(table.get(2).value, 1.0)
+        table.store(3, depth=2, value=3.0, flag=LOWER)
+        table.store(3, depth=2, value=2.0, flag=EXACT)
+        self.assertEqual(table.get(3).flag, EXACT)
+
+    def test_eviction_is_bounded_and_keeps_deep_entries(self):
+        table = TranspositionTable(capacity=3, evict_window=2)
+        table.store(1, depth=5, value=0)
+        table.store(2, depth=0, value=0)
+        table.store(3, depth=1, value=0)
+        table.store(4, depth=1, value=0)
+        self.assertEqual(len(table), 3)
+        self.assertIn(1, table)
+        self.assertNotIn(2, table)
+
+        # Запрошенная запись становится свежей и не вытесняется первой
+        table.get(3)
+        table.store(5, depth=0, value=0)
+        self.assertIn(3, table)
+        self.assertEqual(len(table), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
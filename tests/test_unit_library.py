@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from core.models import Unit
+from core.unit_library import UnitLibrary
+
+
+class TestUnitLibrary(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._old_path = UnitLibrary.DATA_PATH
+        UnitLibrary.DATA_PATH = self._tmp.name
+
+        u = Unit("Roland", level=6)
+        u.passives = ["some_passive"]
+        UnitLibrary.save_unit(u)
+
+    def tearDown(self):
+        UnitLibrary.DATA_PATH = self._old_path
+        self._tmp.cleanup()
+
+    def test_roster_is_lazy(self):
+        """Шапки читаются сразу, Unit собирается только при обращении"""
+        roster = UnitLibrary.load_all()
+        self.assertEqual(list(roster.keys()), ["Roland"])
+        self.assertEqual(UnitLibrary.get_headers()["Roland"].level, 6)
+        self.assertFalse(roster.is_loaded("Roland"))
+
+        unit = roster["Roland"]
+        self.assertEqual(unit.level, 6)
+        self.assertTrue(roster.is_loaded("Roland"))
+        self.assertIs(roster.get("Roland"), unit)
+        self.assertIsNone(roster.get("Nobody"))
+
+    def test_sessions_do_not_share_units(self):
+        """Два ростера (две сессии) получают разные объекты и не делят списки"""
+        a = UnitLibrary.load_all()["Roland"]
+        b = UnitLibrary.load_all()["Roland"]
+        self.assertIsNot(a, b)
+
+        a.passives.append("extra")
+        self.assertEqual(b.passives, ["some_passive"])
+        self.assertEqual(UnitLibrary.load_all()["Roland"].passives, ["some_passive"])
+
+    def test_changed_file_is_reparsed(self):
+        UnitLibrary.load_all()
+        path = os.path.join(self._tmp.name, "Roland.json")
+        UnitLibrary.save_unit(Unit("Roland", level=9))
+
+        self.assertEqual(UnitLibrary.load_all()["Roland"].level, 9)
+        self.assertEqual(UnitLibrary._files[path][3].level, 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
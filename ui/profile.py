@@ -3,6 +3,7 @@ import streamlit as st
 import random
 import os
 from core.models import Unit
+from core.calculations import explain_unit_stats
 from core.unit_library import UnitLibrary
 # ИМПОРТИРУЕМ ОБА РЕЕСТРА
 from logic.passives import PASSIVE_REGISTRY
@@ -147,7 +148,8 @@ def render_profile_page():
             for i, k in enumerate(SKILL_LABELS.keys()):
                 unit.skills[k] = scols[i % 3].number_input(SKILL_LABELS[k], 0, 30, unit.skills[k])
 
-    logs = unit.recalculate_stats()
+    unit.recalculate_stats()
+    logs = explain_unit_stats(unit)
 
     st.markdown("---")
 
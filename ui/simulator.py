@@ -1,6 +1,5 @@
 import streamlit as st
 import sys
-import random
 import os
 from io import StringIO
 from contextlib import contextmanager
@@ -8,7 +7,8 @@ from contextlib import contextmanager
 from core.models import Card, Unit, DiceType
 from core.library import Library
 from logic.clash import ClashSystem
-from logic.statuses import StatusManager
+from logic.battle import BattleSession
+from logic.planner import LookaheadPolicy
 # === ИМПОРТ ОБОИХ РЕЕСТРОВ ===
 from logic.passives import PASSIVE_REGISTRY
 from logic.talents import TALENT_REGISTRY
@@ -30,124 +30,56 @@ def capture_output():
 
 def roll_phase():
     """Бросок кубиков скорости. Если юнит в стаггере - он пропускает ход."""
-    p1 = st.session_state['attacker']
-    p2 = st.session_state['defender']
+    session = BattleSession(st.session_state['attacker'], st.session_state['defender'])
+    session.roll_phase()
 
-    p1.recalculate_stats()
-    p2.recalculate_stats()
+    if st.session_state.get('p2_ai'):
+        plan_ai_turn(session.p2, session.p1, "p2")
 
-    # --- ЛОГИКА СТАГГЕРА ПРИ БРОСКЕ ---
-    def process_roll(unit):
-        if unit.is_staggered():
-            # Если юнит в стаггере, он получает "пустой" слот и метку stunned
-            # Скорость 0, чтобы враги всегда были быстрее
-            unit.active_slots = [{
-                'speed': 0,
-                'card': None,
-                'target_slot': -1,
-                'is_aggro': False,
-                'stunned': True  # Метка: этот ход пропущен из-за стаггера
-            }]
-        else:
-            unit.roll_speed_dice()
+    st.session_state['phase'] = 'planning'
+    st.session_state['turn_message'] = "🎲 Speed Rolled!"
 
-    process_roll(p1)
-    process_roll(p2)
 
-    # Авто-назначение целей (если не стаггер)
-    max_len = max(len(p1.active_slots), len(p2.active_slots))
-    for i in range(max_len):
-        if i < len(p1.active_slots) and not p1.active_slots[i].get('stunned'):
-            target = i if i < len(p2.active_slots) else -1
-            p1.active_slots[i]['target_slot'] = target
+def plan_ai_turn(unit: Unit, opponent: Unit, key_prefix: str):
+    """
+    ИИ выбирает карты/цели/Aggro прямо в слотах юнита. Старые значения виджетов сбрасываются,
+    чтобы render_slot_strip построил их заново из слота (index=/value=), а не из session_state.
+    """
+    get_ai_policy().assign_cards(unit, opponent)
 
-        if i < len(p2.active_slots) and not p2.active_slots[i].get('stunned'):
-            target = i if i < len(p1.active_slots) else -1
-            p2.active_slots[i]['target_slot'] = target
+    for i in range(len(unit.active_slots)):
+        for kind in ("lib", "tgt", "aggro"):
+            st.session_state.pop(f"{key_prefix}_{kind}_{i}", None)
 
-    st.session_state['phase'] = 'planning'
-    st.session_state['turn_message'] = "🎲 Speed Rolled!"
+
+def get_ai_policy() -> LookaheadPolicy:
+    """Одна политика на сессию, чтобы ее таблица транспозиций переживала ходы (новая - если сменилась библиотека)."""
+    cards = Library.get_all_cards()
+    deck_key = tuple(id(c) for c in cards)
+    cached = st.session_state.get('ai_policy')
+    if cached is None or cached[0] != deck_key:
+        cached = (deck_key, LookaheadPolicy(cards, budget_ms=200))
+        st.session_state['ai_policy'] = cached
+    return cached[1]
 
 
 def execute_combat():
     """Запуск боя"""
-    p1 = st.session_state['attacker']
-    p2 = st.session_state['defender']
-
-    sys_clash = ClashSystem()
+    session = BattleSession(st.session_state['attacker'], st.session_state['defender'])
 
     with capture_output() as captured:
-        logs = sys_clash.resolve_turn(p1, p2)
+        logs = session.execute_turn()
 
     st.session_state['battle_logs'] = logs
     st.session_state['script_logs'] = captured.getvalue()
-
-    msg = []
-
-    # --- ИСПРАВЛЕННАЯ ЛОГИКА ВОССТАНОВЛЕНИЯ ---
-    # Мы восстанавливаем стаггер ТОЛЬКО если юнит провел ЭТОТ ход в состоянии оглушения.
-    if p1.active_slots and p1.active_slots[0].get('stunned'):
-        p1.current_stagger = p1.max_stagger
-        msg.append(f"✨ {p1.name} recovered from Stagger!")
-
-    if p2.active_slots and p2.active_slots[0].get('stunned'):
-        p2.current_stagger = p2.max_stagger
-        msg.append(f"✨ {p2.name} recovered from Stagger!")
-
-    # Обычное сообщение, если никто не восстанавливался
-    if not msg:
-        if p1.is_staggered(): msg.append(f"{p1.name} is Staggered!")
-        if p2.is_staggered(): msg.append(f"{p2.name} is Staggered!")
-
-    st.session_state['turn_message'] = " ".join(msg) if msg else "Turn Complete."
-
-    def trigger_end(unit, prefix):
-        logs = []
-
-        # 1. Passives Round End
-        for pid in unit.passives:
-            if pid in PASSIVE_REGISTRY:
-                PASSIVE_REGISTRY[pid].on_round_end(unit, lambda m: logs.append(m))
-
-        # 2. Talents Round End (NEW)
-        for pid in unit.talents:
-            if pid in TALENT_REGISTRY:
-                TALENT_REGISTRY[pid].on_round_end(unit, lambda m: logs.append(m))
-
-        # 3. Statuses Round End
-        status_logs = StatusManager.process_turn_end(unit)
-        logs.extend(status_logs)
-
-        # === ОБНОВЛЕНИЕ КУЛДАУНОВ ===
-        unit.tick_cooldowns()
-
-        if logs:
-            st.session_state['battle_logs'].append(
-                {"round": "End", "rolls": f"{prefix} End", "details": ", ".join(logs)})
-
-    trigger_end(p1, "P1")
-    trigger_end(p2, "P2")
-
-    p1.active_slots = []
-    p2.active_slots = []
+    st.session_state['turn_message'] = session.turn_message
     st.session_state['phase'] = 'roll'
 
 
 def reset_game():
     for key in ['attacker', 'defender']:
         if key in st.session_state:
-            u = st.session_state[key]
-            u.recalculate_stats()
-            u.current_hp = u.max_hp
-            u.current_stagger = u.max_stagger
-            u.current_sp = u.max_sp
-            u._status_effects = {}
-            u.delayed_queue = []
-            u.memory = {}
-            u.active_slots = []
-            # Сброс кулдаунов
-            u.cooldowns = {}
-            u.active_buffs = {}
+            BattleSession.reset_unit(st.session_state[key])
 
     st.session_state['battle_logs'] = []
     st.session_state['script_logs'] = ""
@@ -376,6 +308,7 @@ def render_simulator_page():
     with st.sidebar:
         st.divider()
         st.button("🔄 Reset & Heal", on_click=reset_game, type="secondary")
+        st.checkbox("🤖 AI P2", key="p2_ai", help="После броска скорости P2 сам выбирает карты, цели и Aggro")
 
     p1 = st.session_state['attacker']
     p2 = st.session_state['defender']